@@ -2,5 +2,12 @@ from .math_tools import MathTools
 from .exercise_prescription import ExercisePrescription
 from .exercise_progress_estimator import ExerciseProgressEstimator
 from .weight_converter import WeightConverter
+from .group_by import GroupBy
+from .forecaster import Forecaster
+from .downsampler import Downsampler
+from .timestamps import Timestamps
+from .workload import Workload
+from .fast_estimators import FastEstimators
+from .progress_simulator import ProgressSimulator
 
-__all__ = ["MathTools", "ExercisePrescription", "ExerciseProgressEstimator", "WeightConverter"]
+__all__ = ["MathTools", "ExercisePrescription", "ExerciseProgressEstimator", "WeightConverter", "GroupBy", "Forecaster", "Downsampler", "Timestamps", "Workload", "FastEstimators", "ProgressSimulator"]
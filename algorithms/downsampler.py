@@ -0,0 +1,76 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+class Downsampler:
+    """Largest-Triangle-Three-Buckets downsampling for chart series.
+
+    The first and last points are always kept and every bucket in between
+    contributes the point spanning the largest triangle with its neighbours,
+    so spikes survive while flat stretches collapse. The global maximum is
+    forced into the sample so personal records never disappear.
+    """
+
+    MIN_POINTS = 3
+
+    @classmethod
+    def lttb(cls, x: Sequence[float], y: Sequence[float], max_points: int) -> np.ndarray:
+        """Return sorted indices of at most ``max_points`` representative points."""
+        if max_points < cls.MIN_POINTS:
+            raise ValueError(f"max_points must be at least {cls.MIN_POINTS}")
+        xs = np.asarray(x, dtype=float)
+        ys = np.asarray(y, dtype=float)
+        n = len(ys)
+        if n <= max_points:
+            return np.arange(n)
+        edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+        picked = np.empty(max_points, dtype=int)
+        picked[0] = 0
+        picked[-1] = n - 1
+        prev = 0
+        for b in range(max_points - 2):
+            lo, hi = edges[b], edges[b + 1]
+            nlo = hi
+            nhi = edges[b + 2] if b + 2 < len(edges) else n
+            avg_x = xs[nlo:nhi].mean()
+            avg_y = ys[nlo:nhi].mean()
+            area = np.abs(
+                (xs[prev] - avg_x) * (ys[lo:hi] - ys[prev])
+                - (xs[prev] - xs[lo:hi]) * (avg_y - ys[prev])
+            )
+            prev = lo + int(np.argmax(area))
+            picked[b + 1] = prev
+        peak = int(np.argmax(ys))
+        if peak not in picked:
+            bucket = int(np.searchsorted(edges, peak, side="right"))
+            picked[bucket] = peak
+        return picked
+
+    @staticmethod
+    def positions(values: Sequence[str]) -> np.ndarray:
+        """Return numeric x positions for ISO dates or timestamps."""
+        try:
+            stamps = np.asarray(values, dtype="datetime64[s]")
+        except ValueError:
+            return np.arange(len(values), dtype=float)
+        return stamps.astype(np.int64).astype(float)
+
+    @classmethod
+    def sample(
+        cls,
+        rows: List[Dict[str, object]],
+        x_key: str,
+        y_key: str,
+        max_points: int | None,
+    ) -> Tuple[List[Dict[str, object]], bool]:
+        """Return ``rows`` reduced to ``max_points`` and whether any were dropped."""
+        if max_points is None:
+            return rows, False
+        if max_points < cls.MIN_POINTS:
+            raise ValueError(f"max_points must be at least {cls.MIN_POINTS}")
+        if len(rows) <= max_points:
+            return rows, False
+        xs = cls.positions([str(r[x_key]) for r in rows])
+        ys = [float(r[y_key]) for r in rows]
+        return [rows[i] for i in cls.lttb(xs, ys, max_points)], True
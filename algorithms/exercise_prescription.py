@@ -1,6 +1,8 @@
 import math
 import datetime
-from typing import Iterable, List, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Iterator, List, Tuple
 import numpy as np
 import pandas as pd
 from statsmodels.tsa.ar_model import AutoReg
@@ -9,17 +11,52 @@ from statsmodels.tsa.vector_ar.var_model import VAR
 from statsmodels.tsa.arima.model import ARIMA
 import pywt
 import warnings
-from db import PyramidTestRepository, PyramidEntryRepository
 from .math_tools import MathTools
+from .fast_estimators import FastEstimators
+from .workload import Workload
 
 class ExercisePrescription(MathTools):
-    """Advanced utilities for generating detailed workout prescriptions."""
+    """Advanced utilities for generating detailed workout prescriptions.
+
+    Time series helpers use statsmodels and pywt by default. Inside
+    :meth:`estimator_backend` with ``"fast"`` they use the closed-form
+    :class:`FastEstimators` instead.
+    """
 
     ALPHA_MIN: float = -0.20
     ALPHA_MAX: float = 0.07
     FFM_FRACTION: float = 0.85
     EA_BASELINE: float = 40.0
     EPSILON: float = 0.0001
+    ESTIMATORS = ("full", "fast")
+
+    _estimator: ContextVar[str] = ContextVar("prescription_estimator", default="full")
+
+    @classmethod
+    @contextmanager
+    def estimator_backend(cls, name: str) -> Iterator[None]:
+        """Use the ``name`` estimator backend in the current context."""
+        if name not in cls.ESTIMATORS:
+            raise ValueError(f"unknown estimator backend: {name}")
+        token = cls._estimator.set(name)
+        try:
+            yield
+        finally:
+            cls._estimator.reset(token)
+
+    @classmethod
+    def prescribe(cls, estimator: str, kwargs: dict) -> dict:
+        """Run :meth:`exercise_prescription` with the ``estimator`` backend.
+
+        Takes plain data only, so batches can be fanned out to worker
+        processes.
+        """
+        with cls.estimator_backend(estimator):
+            return cls.exercise_prescription(**kwargs)
+
+    @classmethod
+    def _fast(cls) -> bool:
+        return cls._estimator.get() == "fast"
 
     @classmethod
     def _current_1rm(cls, weights: list[float], reps: list[int]) -> float:
@@ -47,8 +84,11 @@ class ExercisePrescription(MathTools):
         data = list(values)
         if len(data) < 5 or np.std(data) == 0:
             return 1.0
+        if ExercisePrescription._fast():
+            phi = FastEstimators.ar1(data)
+            return 1.0 if phi is None else MathTools.clamp(phi, 0.5, 1.5)
         try:
-            model = AutoReg(data, lags=1, old_names=False).fit()
+            model = AutoReg(data, lags=1).fit()
         except Exception:
             return 1.0
         if len(model.params) < 2:
@@ -119,14 +159,15 @@ class ExercisePrescription(MathTools):
     @staticmethod
     def _process_pyramid_tests(
         exercise_name: str | None = None,
+        tests: List[tuple] | None = None,
     ) -> Tuple[List[float], List[float], List[List[float]], List[dict[str, float]]]:
-        """Load pyramid tests and convert to timestamps filtered by exercise.
+        """Convert pyramid test rows to timestamps filtered by exercise.
 
+        ``tests`` are rows as returned by
+        :meth:`PyramidTestRepository.fetch_full_for_exercise`.
         Returns timestamps, max 1RM values, list of weight series for each test,
         and progression metrics for every test."""
-        repo_t = PyramidTestRepository()
-        repo_e = PyramidEntryRepository()
-        rows = repo_t.fetch_full_with_weights(repo_e)
+        rows = tests or []
         history = [r for r in rows if not exercise_name or r[1] == exercise_name]
         history.sort(key=lambda r: r[2])
         if not history:
@@ -184,6 +225,18 @@ class ExercisePrescription(MathTools):
             if weights
             else 0.0
         )
+        return cls._blend_pyramid_1rm(
+            epley, pyramid_timestamps, pyramid_1rms, current_timestamp
+        )
+
+    @staticmethod
+    def _blend_pyramid_1rm(
+        epley: float,
+        pyramid_timestamps: List[float],
+        pyramid_1rms: List[float],
+        current_timestamp: float,
+    ) -> float:
+        """Blend an Epley 1RM with pyramid test results by their recency."""
         if not pyramid_1rms:
             return epley
         if len(pyramid_1rms) >= 2:
@@ -204,6 +257,25 @@ class ExercisePrescription(MathTools):
         influence = math.exp(-days_since / 21)
         return influence * last + (1 - influence) * epley
 
+    @classmethod
+    def _pyramid_weighted_1rm(
+        cls,
+        pyramid_timestamps: List[float],
+        pyramid_1rms: List[float],
+        current_1rm: float,
+        fatigue_ratio: float,
+        days_since: float,
+    ) -> float:
+        """Weight the last pyramid 1RM by recency, consistency, sample size and fatigue."""
+        cv_slice = pyramid_1rms[-min(5, len(pyramid_1rms)) :]
+        cv_pyr = np.std(cv_slice) / (np.mean(cv_slice) + cls.EPSILON)
+        recency = 1 / (1 + math.exp((days_since - 7) / 3))
+        reliab = cls.clamp(1 - cv_pyr, 0.6, 1.0)
+        sample = cls.clamp(math.log1p(len(pyramid_1rms)) / math.log1p(10), 0.3, 1.0)
+        fatigue_corr = 1 / cls.clamp(fatigue_ratio, 0.6, 1.4)
+        w_pyr = cls.clamp(0.8 * recency * reliab * sample * fatigue_corr, 0.2, 0.8)
+        return w_pyr * pyramid_1rms[-1] + (1 - w_pyr) * current_1rm
+
     @staticmethod
     def _pyramid_enhanced_progression(
         pyramid_timestamps: List[float],
@@ -399,6 +471,13 @@ class ExercisePrescription(MathTools):
 
     @staticmethod
     def _seasonal_components(values: Iterable[float], period: int) -> tuple[list[float], list[float]]:
+        if ExercisePrescription._fast():
+            data = list(values)
+            try:
+                trend, seasonal = FastEstimators.decompose(data, period)
+            except ValueError:
+                return [float(v) for v in data], [0.0 for _ in data]
+            return trend.tolist(), seasonal.tolist()
         series = pd.Series(list(values))
         try:
             res = seasonal_decompose(series, period=period, model="additive", two_sided=False, extrapolate_trend="freq")
@@ -426,6 +505,8 @@ class ExercisePrescription(MathTools):
         if len(weights) < 3 or len(weights) != len(reps):
             return weights[-1] if weights else 0.0
         data = [[w, r] for w, r in zip(weights, reps)]
+        if ExercisePrescription._fast():
+            return float(FastEstimators.var1(data, steps)[0])
         try:
             model = VAR(data)
             res = model.fit(maxlags=1, trend="n")
@@ -453,6 +534,10 @@ class ExercisePrescription(MathTools):
     def _wavelet_energy(values: list[float]) -> tuple[float, float, float]:
         if len(values) < 2:
             return 0.0, 0.0, 0.0
+        if ExercisePrescription._fast():
+            level = min(2, len(values).bit_length() - 1)
+            energies = FastEstimators.haar_energy(values, level)
+            return tuple((energies + [0.0, 0.0])[:3])
         wave = pywt.Wavelet("db1")
         max_level = pywt.dwt_max_level(len(values), wave.dec_len)
         level = min(2, max_level)
@@ -468,6 +553,8 @@ class ExercisePrescription(MathTools):
     def _arima_forecast(values: list[float], steps: int = 1) -> float:
         if len(values) < 3:
             return values[-1] if values else 0.0
+        if ExercisePrescription._fast():
+            return FastEstimators.holt(values, steps)
         try:
             with warnings.catch_warnings():
                 warnings.simplefilter("ignore")
@@ -633,14 +720,10 @@ class ExercisePrescription(MathTools):
 
     @staticmethod
     def _ac_ratio(weights: list[float], reps: list[int]) -> float:
-        w = np.array(weights)
-        r = np.array(reps)
-        vol = w * r
+        vol = np.array(weights, dtype=float) * np.array(reps, dtype=float)
         if len(vol) == 0:
             return 1.0
-        recent = ExercisePrescription._ewma(vol, span=7)[-1]
-        chronic = ExercisePrescription._ewma(vol, span=28)[-1]
-        return float(recent / chronic) if chronic != 0 else 1.0
+        return float(Workload().timeline(vol)["acwr"][-1])
 
     @staticmethod
     def _training_stress_balance(
@@ -651,23 +734,12 @@ class ExercisePrescription(MathTools):
         current_1rm: float,
     ) -> tuple[list[int], list[float]]:
         """Return Training Stress Balance values per day."""
-        tss_list: list[float] = []
-        for w, r, d in zip(weights, reps, durations):
-            tss_val = ExercisePrescription._calculate_exercise_tss(
-                [w],
-                [r],
-                [d],
-                current_1rm,
-            )
-            tss_list.append(tss_val)
-
-        daily: dict[int, float] = {}
-        for t, val in zip(timestamps, tss_list):
-            day = int(t)
-            daily[day] = daily.get(day, 0.0) + val
-
-        days = sorted(daily)
-        loads = [daily[d] for d in days]
+        tss = ExercisePrescription._set_tss(weights, reps, durations, current_1rm)
+        day_arr, codes = np.unique(
+            np.asarray(timestamps, dtype=float).astype(np.int64), return_inverse=True
+        )
+        days = [int(d) for d in day_arr]
+        loads = np.bincount(codes.reshape(-1), weights=tss, minlength=len(days)).tolist()
         tsb: list[float] = []
         for i, _ in enumerate(days):
             acute = np.mean(loads[max(0, i - 6) : i + 1])
@@ -811,11 +883,10 @@ class ExercisePrescription(MathTools):
 
     @staticmethod
     def _weekly_monotony(weights: list[float], reps: list[int]) -> float:
-        w = np.array(weights)
-        r = np.array(reps)
-        loads = w * r
-        std = np.std(loads)
-        return float(np.mean(loads) / std) if std != 0 else 1.0
+        loads = np.array(weights, dtype=float) * np.array(reps, dtype=float)
+        if len(loads) == 0:
+            return 1.0
+        return float(Workload(window=len(loads)).timeline(loads)["monotony"][-1])
 
     @staticmethod
     def _weekly_load_variability(weights: list[float], reps: list[int], times: list[float]) -> float:
@@ -968,20 +1039,29 @@ class ExercisePrescription(MathTools):
         current_1rm: float,
     ) -> float:
         """Training Stress Score for resistance exercise."""
-        tss_vals: list[float] = []
-        for w, r, d in zip(weights, reps, durations):
-            intensity_factor = w / current_1rm if current_1rm else 0.0
-            if r <= 5:
-                rep_factor = 1.0
-            elif r <= 12:
-                rep_factor = 0.8
-            else:
-                rep_factor = 0.6
-            nl = intensity_factor * rep_factor
-            dur_min = d / 60 if d else 1.0
-            set_tss = (dur_min * nl * intensity_factor) / 60 * 100
-            tss_vals.append(set_tss)
-        return float(np.sum(tss_vals))
+        return float(
+            np.sum(
+                ExercisePrescription._set_tss(weights, reps, durations, current_1rm)
+            )
+        )
+
+    @staticmethod
+    def _set_tss(
+        weights: Iterable[float],
+        reps: Iterable[int],
+        durations: Iterable[float],
+        current_1rm: float | np.ndarray,
+    ) -> np.ndarray:
+        """Per-set Training Stress Score; ``current_1rm`` may vary per set."""
+        w = np.asarray(weights, dtype=float)
+        r = np.asarray(reps, dtype=float)
+        d = np.asarray(durations, dtype=float)
+        rm = np.broadcast_to(np.asarray(current_1rm, dtype=float), w.shape)
+        intensity = np.divide(w, rm, out=np.zeros_like(w), where=rm != 0)
+        rep_factor = np.where(r <= 5, 1.0, np.where(r <= 12, 0.8, 0.6))
+        nl = intensity * rep_factor
+        dur_min = np.where(d != 0, d / 60, 1.0)
+        return (dur_min * nl * intensity) / 60 * 100
 
     @staticmethod
     def _tss_adjusted_fatigue(
@@ -991,15 +1071,55 @@ class ExercisePrescription(MathTools):
         durations: list[float],
         current_1rm: float,
     ) -> float:
-        tss_values: list[float] = []
-        if not weights:
+        if not len(weights) or not len(timestamps):
             return 0.0
-        t_current = timestamps[-1] if timestamps else 0
-        for w, r, t, d in zip(weights, reps, timestamps, durations):
-            set_tss = ExercisePrescription._calculate_exercise_tss([w], [r], [d], current_1rm)
-            days_ago = t_current - t
-            tss_values.append(set_tss * (0.9 ** days_ago))
-        return float(np.sum(tss_values))
+        t = np.asarray(timestamps, dtype=float)
+        set_tss = ExercisePrescription._set_tss(weights, reps, durations, current_1rm)
+        ago, idx = np.unique(t[-1] - t, return_inverse=True)
+        decay = np.array([0.9 ** float(a) for a in ago])[idx.reshape(-1)]
+        return float(np.sum(set_tss * decay))
+
+    @classmethod
+    def _daily_tss_fatigue(
+        cls,
+        weights: list[float],
+        reps: list[int],
+        durations: list[float],
+        timestamps: list[float],
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return day offsets, daily TSS and fatigue in one pass.
+
+        Daily TSS scores each set against its own 1RM. Fatigue on a day equals
+        :meth:`_tss_adjusted_fatigue` over every set up to that day scored
+        against the best 1RM so far. Set TSS is ``load / 1rm ** 2``, so a
+        decayed load sum is carried forward and rescaled per day.
+        """
+        w = np.asarray(weights, dtype=float)
+        r = np.asarray(reps, dtype=float)
+        d = np.asarray(durations, dtype=float)
+        days, codes = np.unique(
+            np.asarray(timestamps, dtype=float).astype(np.int64), return_inverse=True
+        )
+        codes = codes.reshape(-1)
+        est = w * (1 + cls.EPL_COEFF * np.minimum(r, 8))
+        stress = np.bincount(
+            codes, weights=cls._set_tss(w, r, d, est), minlength=len(days)
+        )
+        best = np.full(len(days), -np.inf)
+        np.maximum.at(best, codes, est)
+        best = np.maximum.accumulate(best)
+        loads = np.bincount(
+            codes, weights=cls._set_tss(w, r, d, 1.0), minlength=len(days)
+        )
+        fatigue = np.zeros(len(days))
+        acc = 0.0
+        for i in range(len(days)):
+            if i:
+                acc *= 0.9 ** float(days[i] - days[i - 1])
+            acc += loads[i]
+            if best[i]:
+                fatigue[i] = acc / best[i] ** 2
+        return days, stress, fatigue
 
     @staticmethod
     def _session_rpe_adjustment(rpe_history: list[float], target_rpe_range: tuple = (7, 8)) -> float:
@@ -1214,17 +1334,22 @@ class ExercisePrescription(MathTools):
         phase_factor: float = 0.7,
         target_velocity_loss: float | None = None,
         exercise_name: str | None = None,
+        pyramid_tests: List[tuple] | None = None,
     ) -> dict:
-        """Return a detailed workout prescription."""
+        """Return a detailed workout prescription.
+
+        ``pyramid_tests`` supplies the exercise's pyramid test rows; without
+        them the 1RM estimate relies on set history alone.
+        """
 
         series_w = cls._prepare_series(weights, timestamps)
         series_r = cls._prepare_series(reps, timestamps)
         series_rpe = cls._prepare_series(rpe_scores, timestamps)
 
         current_1rm_calc = cls._current_1rm(list(series_w), list(series_r))
-        ts_list = [(t - series_w.index[0]).days for t in series_w.index]
+        ts_list = (series_w.index - series_w.index[0]).days.tolist()
         pyr_ts, pyr_vals, pyr_weights, pyr_metrics = cls._process_pyramid_tests(
-            exercise_name
+            exercise_name, pyramid_tests
         )
         current_1rm = cls._enhanced_1rm_calculation(
             list(series_w),
@@ -1234,7 +1359,7 @@ class ExercisePrescription(MathTools):
             ts_list[-1] if ts_list else 0,
         )
         total_volume = cls._total_volume(list(series_w), list(series_r))
-        t_mean = cls._means(list(series_w.index.map(lambda t: (t - series_w.index[0]).days)))
+        t_mean = cls._means(ts_list)
         y_mean = cls._means(list(series_w))
         slope = cls._weighted_slope(ts_list, list(series_w))
         recent_load = cls._recent_load(list(series_w), list(series_r))
@@ -1364,17 +1489,13 @@ class ExercisePrescription(MathTools):
             urgency_mod = 1.0
 
         if pyr_vals:
-            pyr_1rm_last = pyr_vals[-1]
-            days_since_pyr = (ts_list[-1] - pyr_ts[-1]) if ts_list else 0
-            cv_slice = pyr_vals[-min(5, len(pyr_vals)) :]
-            cv_pyr = np.std(cv_slice) / (np.mean(cv_slice) + cls.EPSILON)
-            recency = 1 / (1 + math.exp((days_since_pyr - 7) / 3))
-            reliab = cls.clamp(1 - cv_pyr, 0.6, 1.0)
-            sample = cls.clamp(math.log1p(len(pyr_vals)) / math.log1p(10), 0.3, 1.0)
-            fatigue_ratio = cls.clamp(base_fatigue / (adj_mrv + cls.EPSILON), 0.6, 1.4)
-            fatigue_corr = 1 / fatigue_ratio
-            w_pyr = cls.clamp(0.8 * recency * reliab * sample * fatigue_corr, 0.2, 0.8)
-            current_1rm = w_pyr * pyr_1rm_last + (1 - w_pyr) * current_1rm_calc
+            current_1rm = cls._pyramid_weighted_1rm(
+                pyr_ts,
+                pyr_vals,
+                current_1rm_calc,
+                base_fatigue / (adj_mrv + cls.EPSILON),
+                (ts_list[-1] - pyr_ts[-1]) if ts_list else 0,
+            )
 
         urgency = cls._urgency(target_1rm, current_1rm) * urgency_mod
         delta_1rm, delta_vol = cls._deltas(current_1rm, y_mean, recent_load, prev_load)
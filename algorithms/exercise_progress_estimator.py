@@ -1,4 +1,5 @@
 from .exercise_prescription import ExercisePrescription
+from .progress_simulator import ProgressSimulator
 
 class ExerciseProgressEstimator(ExercisePrescription):
     """Utility for forecasting 1RM progression using prescription logic."""
@@ -16,35 +17,34 @@ class ExerciseProgressEstimator(ExercisePrescription):
         body_weight: float,
         months_active: float,
         workouts_per_month: float,
+        exercise_name: str | None = None,
+        pyramid_tests: list[tuple] | None = None,
     ) -> list[dict]:
-        """Predict future 1RM values for several weeks."""
+        """Predict future 1RM values for several weeks.
 
-        w_hist = list(weights)
-        r_hist = list(reps)
-        t_hist = list(timestamps)
-        rpe_hist = list(rpe_scores)
-        current_time = t_hist[-1] if t_hist else 0.0
+        Each workout performs the first prescribed set one day after the
+        previous one; :class:`ProgressSimulator` keeps the cost per workout
+        independent of the history length. ``pyramid_tests`` are the
+        exercise's pyramid test rows as passed to
+        :meth:`exercise_prescription`.
+        """
+
+        simulator = ProgressSimulator(
+            weights,
+            reps,
+            timestamps,
+            rpe_scores,
+            body_weight=body_weight,
+            months_active=months_active,
+            workouts_per_month=workouts_per_month,
+            exercise_name=exercise_name,
+            pyramid_tests=pyramid_tests,
+        )
         forecast: list[dict] = []
 
         for week in range(1, weeks + 1):
             for _ in range(workouts_per_week):
-                presc = cls.exercise_prescription(
-                    w_hist,
-                    r_hist,
-                    t_hist,
-                    rpe_hist,
-                    body_weight=body_weight,
-                    months_active=months_active,
-                    workouts_per_month=workouts_per_month,
-                )
-                data = presc["prescription"][0]
-                current_time += 1
-                t_hist.append(current_time)
-                w_hist.append(float(data["weight"]))
-                r_hist.append(int(data["reps"]))
-                rpe_hist.append(int(round(data["target_rpe"])))
-
-            est = cls._current_1rm(w_hist, r_hist)
-            forecast.append({"week": week, "est_1rm": round(est, 2)})
+                simulator.step()
+            forecast.append({"week": week, "est_1rm": round(simulator.one_rm, 2)})
 
         return forecast
@@ -0,0 +1,97 @@
+import numpy as np
+
+
+class FastEstimators:
+    """Closed-form NumPy stand-ins for the statsmodels fits in prescriptions.
+
+    ``ar1`` and ``var1`` solve the same least-squares problems as
+    ``AutoReg(lags=1)`` and ``VAR(maxlags=1, trend="n")``, ``decompose``
+    reproduces the one-sided additive ``seasonal_decompose`` with linear
+    trend extrapolation and ``haar_energy`` is the ``db1`` wavelet energy,
+    so these agree with the full backend to rounding. ``holt`` replaces
+    the ARIMA(1,1,1) fit with Holt linear smoothing and is the only
+    approximation.
+    """
+
+    @staticmethod
+    def ar1(values: np.ndarray) -> float | None:
+        """Return the lag-1 coefficient of an AR(1) with intercept."""
+        y = np.asarray(values, dtype=float)
+        x = y[:-1]
+        x_c = x - x.mean()
+        den = float(np.dot(x_c, x_c))
+        if den == 0:
+            return None
+        return float(np.dot(x_c, y[1:] - y[1:].mean()) / den)
+
+    @staticmethod
+    def var1(data: np.ndarray, steps: int = 1) -> np.ndarray:
+        """Return the ``steps`` ahead forecast of a VAR(1) without trend."""
+        y = np.asarray(data, dtype=float)
+        coef = np.linalg.lstsq(y[:-1], y[1:], rcond=None)[0]
+        state = y[-1]
+        for _ in range(steps):
+            state = state @ coef
+        return state
+
+    @staticmethod
+    def holt(
+        values: np.ndarray, steps: int = 1, alpha: float = 0.5, beta: float = 0.3
+    ) -> float:
+        """Return the Holt linear smoothing forecast ``steps`` ahead."""
+        y = np.asarray(values, dtype=float)
+        level = y[0]
+        trend = y[1] - y[0]
+        for value in y[1:]:
+            prev = level
+            level = alpha * value + (1 - alpha) * (level + trend)
+            trend = beta * (level - prev) + (1 - beta) * trend
+        return float(level + steps * trend)
+
+    @staticmethod
+    def _extend_line(trend: np.ndarray, lo: int, hi: int, at: np.ndarray) -> np.ndarray:
+        slope, intercept = np.polyfit(np.arange(lo, hi), trend[lo:hi], 1)
+        return at * slope + intercept
+
+    @classmethod
+    def decompose(cls, values: np.ndarray, period: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return the one-sided additive trend and seasonal components.
+
+        Raises ``ValueError`` for fewer than two full periods.
+        """
+        x = np.asarray(values, dtype=float)
+        n = len(x)
+        if n < 2 * period:
+            raise ValueError("decomposition needs two complete periods")
+        if period % 2 == 0:
+            filt = np.r_[0.5, np.ones(period - 1), 0.5] / period
+        else:
+            filt = np.full(period, 1.0 / period)
+        trend = np.full(n, np.nan)
+        front = len(filt) - 1
+        trend[front:] = np.convolve(x, filt, mode="valid")
+        front_last = min(front + period, n - 1)
+        trend[:front] = cls._extend_line(trend, front, front_last, np.arange(front))
+        detrended = x - trend
+        averages = np.array([detrended[i::period].mean() for i in range(period)])
+        averages -= averages.mean()
+        seasonal = np.tile(averages, n // period + 1)[:n]
+        return trend, seasonal
+
+    @staticmethod
+    def haar_energy(values: np.ndarray, level: int) -> list[float]:
+        """Return coefficient energies of a ``level`` deep Haar transform.
+
+        The order matches ``pywt.wavedec``: approximation first, then
+        details from the coarsest level down. Odd lengths are padded
+        symmetrically as in pywt's default mode.
+        """
+        approx = np.asarray(values, dtype=float)
+        details = []
+        for _ in range(level):
+            if len(approx) % 2:
+                approx = np.r_[approx, approx[-1]]
+            even, odd = approx[0::2], approx[1::2]
+            details.append(float(np.sum(np.square(even - odd)) / 2))
+            approx = (even + odd) / np.sqrt(2)
+        return [float(np.sum(np.square(approx)))] + details[::-1]
@@ -0,0 +1,152 @@
+import threading
+import warnings
+from collections import OrderedDict
+from statistics import NormalDist
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+from statsmodels.tsa.arima.model import ARIMA
+
+from .exercise_prescription import ExercisePrescription
+
+
+class Forecaster:
+    """Multi-step forecasts with prediction intervals from a single fit.
+
+    ``arima`` fits ARIMA(1,1,1) once and reads the whole path from the fitted
+    state; fits are cached per caller supplied key, which should include the
+    data version of the series. ``holt`` and ``ewma`` are closed-form
+    exponential smoothing, ``linear`` extends a recency weighted trend from
+    the last value. ``auto`` uses ARIMA for series of at least ``min_arima``
+    points and Holt otherwise, and any ARIMA failure falls back to Holt.
+    """
+
+    METHODS = ("auto", "arima", "holt", "ewma", "linear")
+
+    def __init__(
+        self,
+        level: float = 0.8,
+        alpha: float = 0.5,
+        beta: float = 0.3,
+        min_arima: int = 8,
+        cache_size: int = 32,
+    ) -> None:
+        self.z = NormalDist().inv_cdf(0.5 + level / 2)
+        self.alpha = alpha
+        self.beta = beta
+        self.min_arima = min_arima
+        self.cache_size = cache_size
+        self._fits: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def forecast(
+        self,
+        values: List[float],
+        steps: int,
+        method: str = "auto",
+        key: Optional[Hashable] = None,
+    ) -> Dict[str, object]:
+        """Return ``method``, ``mean``, ``lower`` and ``upper`` for ``steps`` ahead."""
+        if method not in self.METHODS:
+            raise ValueError(f"unknown forecast method: {method}")
+        steps = max(int(steps), 0)
+        if len(values) < 3 and method != "linear":
+            last = float(values[-1]) if values else 0.0
+            return self._path("naive", [last] * steps, [0.0] * steps)
+        if method == "auto":
+            method = "arima" if len(values) >= self.min_arima else "holt"
+        if method == "arima":
+            result = self._arima(values, steps, key)
+            if result is not None:
+                return result
+            method = "holt"
+        if method == "holt":
+            return self._holt(values, steps)
+        if method == "ewma":
+            return self._ewma(values, steps)
+        return self._linear(values, steps)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fits.clear()
+
+    def _path(
+        self, method: str, mean: List[float], std: List[float]
+    ) -> Dict[str, object]:
+        return {
+            "method": method,
+            "mean": [float(m) for m in mean],
+            "lower": [float(m - self.z * s) for m, s in zip(mean, std)],
+            "upper": [float(m + self.z * s) for m, s in zip(mean, std)],
+        }
+
+    def _arima(
+        self, values: List[float], steps: int, key: Optional[Hashable]
+    ) -> Optional[Dict[str, object]]:
+        cache_key = (key, len(values)) if key is not None else None
+        with self._lock:
+            fit = self._fits.get(cache_key) if cache_key is not None else None
+            if fit is not None:
+                self._fits.move_to_end(cache_key)
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                if fit is None:
+                    fit = ARIMA(values, order=(1, 1, 1)).fit()
+                forecast = fit.get_forecast(steps)
+                mean = np.asarray(forecast.predicted_mean, dtype=float)
+                std = np.asarray(forecast.se_mean, dtype=float)
+        except Exception:
+            return None
+        if not np.all(np.isfinite(mean)):
+            return None
+        if cache_key is not None:
+            with self._lock:
+                self._fits[cache_key] = fit
+                while len(self._fits) > self.cache_size:
+                    self._fits.popitem(last=False)
+        return self._path("arima", list(mean), list(np.nan_to_num(std)))
+
+    def _holt(self, values: List[float], steps: int) -> Dict[str, object]:
+        a, b = self.alpha, self.beta
+        level = float(values[0])
+        trend = float(values[1]) - float(values[0])
+        errors = []
+        for y in values[1:]:
+            errors.append(float(y) - (level + trend))
+            prev = level
+            level = a * float(y) + (1 - a) * (level + trend)
+            trend = b * (level - prev) + (1 - b) * trend
+        sigma2 = float(np.mean(np.square(errors)))
+        mean = [level + h * trend for h in range(1, steps + 1)]
+        std = []
+        acc = 0.0
+        for h in range(1, steps + 1):
+            std.append(float(np.sqrt(sigma2 * (1 + acc))))
+            acc += (a * (1 + h * b)) ** 2
+        return self._path("holt", mean, std)
+
+    def _ewma(self, values: List[float], steps: int) -> Dict[str, object]:
+        a = self.alpha
+        level = float(values[0])
+        errors = []
+        for y in values[1:]:
+            errors.append(float(y) - level)
+            level = a * float(y) + (1 - a) * level
+        sigma2 = float(np.mean(np.square(errors)))
+        std = [float(np.sqrt(sigma2 * (1 + (h - 1) * a * a))) for h in range(1, steps + 1)]
+        return self._path("ewma", [level] * steps, std)
+
+    def _linear(self, values: List[float], steps: int) -> Dict[str, object]:
+        if not values:
+            return self._path("linear", [0.0] * steps, [0.0] * steps)
+        times = list(range(len(values)))
+        slope = ExercisePrescription._weighted_linear_regression(
+            times, list(values), [t + 1 for t in times]
+        )
+        last = float(values[-1])
+        diffs = np.diff(np.asarray(values, dtype=float)) - slope
+        sigma2 = float(np.mean(np.square(diffs))) if len(diffs) else 0.0
+        mean = [last + slope * h for h in range(1, steps + 1)]
+        std = [float(np.sqrt(sigma2 * h)) for h in range(1, steps + 1)]
+        return self._path("linear", mean, std)
@@ -0,0 +1,76 @@
+import datetime
+from typing import Iterable
+
+import numpy as np
+
+
+class GroupBy:
+    """Group-by aggregations over NumPy columns.
+
+    Keys are factorized once with :func:`numpy.unique` so every aggregate is a
+    single ``bincount`` or ufunc pass. Groups come back in sorted key order and
+    sums accumulate in row order, matching a sequential Python loop exactly.
+    """
+
+    def __init__(self, keys: Iterable) -> None:
+        arr = keys if isinstance(keys, np.ndarray) else np.asarray(list(keys))
+        self.keys, self.codes = np.unique(arr, return_inverse=True)
+        self.codes = self.codes.reshape(-1)
+        self.size = len(self.keys)
+
+    @classmethod
+    def by_iso_week(cls, dates: np.ndarray) -> "GroupBy":
+        """Group ISO ``YYYY-MM-DD`` dates by ``YYYY-Www`` week labels."""
+        days = cls(dates)
+        labels = []
+        for day in days.keys:
+            year, week, _ = datetime.date.fromisoformat(str(day)).isocalendar()
+            labels.append(f"{year}-W{week:02d}")
+        weeks = np.asarray(labels, dtype=str)
+        return cls(weeks[days.codes] if len(weeks) else weeks)
+
+    def count(self) -> np.ndarray:
+        """Return the number of rows in each group."""
+        return np.bincount(self.codes, minlength=self.size)
+
+    def sum(self, values: np.ndarray) -> np.ndarray:
+        """Return the per-group sum of ``values``."""
+        return np.bincount(
+            self.codes, weights=np.asarray(values, dtype=float), minlength=self.size
+        )
+
+    def mean(self, values: np.ndarray) -> np.ndarray:
+        """Return the per-group mean of ``values``."""
+        return self.sum(values) / self.count()
+
+    def max(self, values: np.ndarray) -> np.ndarray:
+        """Return the per-group maximum of ``values``."""
+        out = np.full(self.size, -np.inf)
+        np.maximum.at(out, self.codes, np.asarray(values, dtype=float))
+        return out
+
+    def min(self, values: np.ndarray) -> np.ndarray:
+        """Return the per-group minimum of ``values``."""
+        out = np.full(self.size, np.inf)
+        np.minimum.at(out, self.codes, np.asarray(values, dtype=float))
+        return out
+
+    def first(self) -> np.ndarray:
+        """Return the row index of the first row in each group."""
+        return np.unique(self.codes, return_index=True)[1]
+
+    def argmax(self, values: np.ndarray) -> np.ndarray:
+        """Return the row index of the first maximum in each group."""
+        vals = np.asarray(values, dtype=float)
+        order = np.lexsort((np.arange(len(vals)), -vals, self.codes))
+        starts = np.searchsorted(self.codes[order], np.arange(self.size))
+        return order[starts]
+
+    def nunique(self, values: np.ndarray) -> np.ndarray:
+        """Return the number of distinct ``values`` in each group."""
+        if self.size == 0:
+            return np.zeros(0, dtype=np.int64)
+        _, inverse = np.unique(np.asarray(values), return_inverse=True)
+        width = int(inverse.max()) + 1
+        pairs = np.unique(self.codes * width + inverse.reshape(-1))
+        return np.bincount(pairs // width, minlength=self.size)
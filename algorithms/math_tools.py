@@ -98,6 +98,21 @@ class MathTools:
             return 0.0
         return (reps * rom) / total_seconds
 
+    @staticmethod
+    def velocities_from_durations(
+        reps: np.ndarray, seconds: np.ndarray, rom: float = 0.5
+    ) -> np.ndarray:
+        """Vectorized :meth:`estimate_velocity_from_set` over set durations.
+
+        ``seconds`` is ``NaN`` for sets without timing, which yield ``0.0``.
+        """
+        reps = np.asarray(reps, dtype=float)
+        seconds = np.asarray(seconds, dtype=float)
+        valid = (reps > 0) & (seconds > 0)
+        out = np.zeros(len(seconds))
+        out[valid] = (reps[valid] * rom) / seconds[valid]
+        return out
+
     @staticmethod
     def estimate_power_from_set(
         reps: int,
@@ -171,6 +186,17 @@ class MathTools:
         base = (stress + fatigue) / 2.0
         return MathTools.clamp(base * (1 + variability), 0.0, 10.0)
 
+    @staticmethod
+    def workload_risk_factor(acwr: float, monotony: float) -> float:
+        """Return a risk multiplier for load spikes and monotonous weeks.
+
+        An ACWR above 1.3 or a monotony above 2.0 raises the multiplier
+        above 1; anything inside those limits leaves the risk unchanged.
+        """
+        spike = max(acwr - 1.3, 0.0)
+        sameness = max(monotony - 2.0, 0.0) / 2.0
+        return (1.0 + spike) * (1.0 + sameness)
+
     @staticmethod
     def readiness_score(stress: float, fatigue: float) -> float:
         """Return a training readiness score from stress and fatigue."""
@@ -0,0 +1,602 @@
+import math
+import warnings
+from collections import deque
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+
+from .exercise_prescription import ExercisePrescription
+from .fast_estimators import FastEstimators
+
+
+class _Regression:
+    """Running least-squares line through ``(x, y)`` points.
+
+    Welford co-moments keep constant series exactly flat, and points can
+    be removed again for sliding windows.
+    """
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.cxx = 0.0
+        self.cxy = 0.0
+        self.cyy = 0.0
+
+    def add(self, x: float, y: float) -> None:
+        self.n += 1
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.mean_x += dx / self.n
+        self.mean_y += dy / self.n
+        self.cxx += dx * (x - self.mean_x)
+        self.cxy += dx * (y - self.mean_y)
+        self.cyy += dy * (y - self.mean_y)
+
+    def remove(self, x: float, y: float) -> None:
+        if self.n <= 1:
+            self.__init__()
+            return
+        self.n -= 1
+        old_x = self.mean_x - (x - self.mean_x) / self.n
+        old_y = self.mean_y - (y - self.mean_y) / self.n
+        self.cxx -= (x - old_x) * (x - self.mean_x)
+        self.cxy -= (x - old_x) * (y - self.mean_y)
+        self.cyy -= (y - old_y) * (y - self.mean_y)
+        self.mean_x = old_x
+        self.mean_y = old_y
+
+    def slope(self) -> float:
+        return self.cxy / self.cxx if self.cxx != 0 else 0.0
+
+    def std_y(self) -> float:
+        return math.sqrt(max(self.cyy, 0.0) / self.n) if self.n else 0.0
+
+
+class _SeasonalTail:
+    """Last trend and seasonal values of the one-sided additive decomposition.
+
+    Matches :meth:`FastEstimators.decompose`: the trend is a causal moving
+    average, so detrended values never change once written and only their
+    per-phase sums are kept, plus the few leading values whose trend is
+    extrapolated.
+    """
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        if period % 2 == 0:
+            self.filt = np.r_[0.5, np.ones(period - 1), 0.5] / period
+        else:
+            self.filt = np.full(period, 1.0 / period)
+        self.front = len(self.filt) - 1
+        self.n = 0
+        self.last = 0.0
+        self.trend = 0.0
+        self._window: deque = deque(maxlen=len(self.filt))
+        self._head_x: list[float] = []
+        self._head_trend: list[float] = []
+        self._sums = np.zeros(period)
+        self._counts = np.zeros(period)
+
+    def add(self, value: float) -> None:
+        i = self.n
+        self.n += 1
+        self.last = value
+        self._window.append(value)
+        if i < self.front:
+            self._head_x.append(value)
+            return
+        self.trend = float(np.dot(self.filt, self._window))
+        if len(self._head_trend) < self.period:
+            self._head_trend.append(self.trend)
+        self._sums[i % self.period] += value - self.trend
+        self._counts[i % self.period] += 1
+
+    def components(self) -> tuple[float, float]:
+        """Return the last ``(trend, seasonal)`` pair.
+
+        Fewer than two full periods fall back to the value itself and no
+        seasonality, as :meth:`ExercisePrescription._seasonal_components`
+        does.
+        """
+        p = self.period
+        if self.n < 2 * p:
+            return self.last, 0.0
+        hi = min(self.front + p, self.n - 1)
+        slope, intercept = np.polyfit(
+            np.arange(self.front, hi), self._head_trend[: hi - self.front], 1
+        )
+        sums = self._sums.copy()
+        counts = self._counts.copy()
+        for j, value in enumerate(self._head_x):
+            sums[j % p] += value - (j * slope + intercept)
+            counts[j % p] += 1
+        averages = sums / counts
+        averages -= averages.mean()
+        return self.trend, float(averages[(self.n - 1) % p])
+
+
+class _HaarTail:
+    """Running two-level Haar energies as returned by ``_wavelet_energy``.
+
+    Completed pairs are folded into the detail and approximation energies
+    as they arrive; the unpaired tail is padded symmetrically on demand.
+    """
+
+    ROOT2 = math.sqrt(2.0)
+
+    def __init__(self) -> None:
+        self.n = 0
+        self._head: list[float] = []
+        self._pending: float | None = None
+        self._pending_approx: float | None = None
+        self._detail1 = 0.0
+        self._detail2 = 0.0
+        self._approx2 = 0.0
+
+    def add(self, value: float) -> None:
+        self.n += 1
+        if len(self._head) < 3:
+            self._head.append(value)
+        if self._pending is None:
+            self._pending = value
+            return
+        even, self._pending = self._pending, None
+        self._detail1 += (even - value) ** 2 / 2
+        approx = (even + value) / self.ROOT2
+        if self._pending_approx is None:
+            self._pending_approx = approx
+            return
+        first, self._pending_approx = self._pending_approx, None
+        self._detail2 += (first - approx) ** 2 / 2
+        self._approx2 += (first + approx) ** 2 / 2
+
+    def energies(self) -> tuple[float, float, float]:
+        if self.n < 2:
+            return 0.0, 0.0, 0.0
+        if self.n < 4:
+            low, high = FastEstimators.haar_energy(self._head, 1)
+            return low, high, 0.0
+        tail = [] if self._pending_approx is None else [self._pending_approx]
+        if self._pending is not None:
+            tail.append(self._pending * self.ROOT2)
+        approx2, detail2 = self._approx2, self._detail2
+        if len(tail) == 2:
+            detail2 += (tail[0] - tail[1]) ** 2 / 2
+            approx2 += (tail[0] + tail[1]) ** 2 / 2
+        elif tail:
+            approx2 += 2 * tail[0] ** 2
+        return approx2, detail2, self._detail1
+
+
+class ProgressSimulator(ExercisePrescription):
+    """Incremental first-set prescriptions for simulated training.
+
+    Mirrors the first set of :meth:`exercise_prescription` for a history
+    without wellness or goal data. Pyramid test rows, when given, are fixed
+    for the whole simulation. Everything it derives from the
+    whole history (1RM, means and spreads, EWMA loads, decayed fatigue
+    sums, regression slopes, seasonal and wavelet components, per-day
+    aggregates) is kept as running state, so :meth:`append` and
+    :meth:`next_set` cost O(1) amortised however long the history is. The
+    AR decay factors and the weight forecast model are fitted on the
+    history and carried forward with their parameters fixed, and refitted
+    while fewer than :attr:`REFIT_BELOW` sets exist or once the history
+    has doubled since the last fit. The first prescription therefore
+    equals :meth:`exercise_prescription` and later ones differ only by
+    those carried fits. The history is taken in timestamp order.
+    """
+
+    MEV: float = 10
+    REFIT_BELOW: int = 16
+    HOLT_ALPHA: float = 0.5
+    HOLT_BETA: float = 0.3
+
+    def __init__(
+        self,
+        weights: Iterable[float],
+        reps: Iterable[int],
+        timestamps: Iterable[float],
+        rpe_scores: Iterable[float],
+        *,
+        body_weight: float,
+        months_active: float,
+        workouts_per_month: float,
+        decay: float = 0.9,
+        theta: float = 0.1,
+        exercise_name: str | None = None,
+        pyramid_tests: list[tuple] | None = None,
+    ) -> None:
+        rows = sorted(
+            zip(timestamps, weights, reps, rpe_scores), key=lambda row: row[0]
+        )
+        if not rows:
+            raise ValueError("history is empty")
+        self.body_weight = body_weight
+        self.experience = self._experience(months_active, workouts_per_month)
+        self.decay = decay
+        self.theta = theta
+        self._pyramid = self._process_pyramid_tests(exercise_name, pyramid_tests)
+        self.n = 0
+        self.one_rm = -math.inf
+        self.weights: list[float] = []
+        self.reps: list[int] = []
+        self.rpe_scores: list[float] = []
+        self.times: list[float] = []
+        self._t0 = pd.Timedelta(rows[0][0], unit="D")
+        self._days: list[int] = []
+        self._reps_sum = 0.0
+        self._w = _Regression()
+        self._w_index = _Regression()
+        self._rpe_index = _Regression()
+        self._vol = _Regression()
+        self._ew_index = _Regression()
+        self._first_half = _Regression()
+        self._second_half = _Regression()
+        self._lagged = _Regression()
+        self._mid = 0
+        self._ew = 0.0
+        self._loads: deque = deque(maxlen=self.L + 1)
+        self._first_load = 0.0
+        self._acute = 0.0
+        self._chronic = 0.0
+        self._rising: bool | None = None
+        self._change_point = False
+        self._w_season = _SeasonalTail(7)
+        self._vol_season = _SeasonalTail(7)
+        self._w_haar = _HaarTail()
+        self._vol_haar = _HaarTail()
+        self._efficiency_sum = 0.0
+        self._efficiency_n = 0
+        self._neuro = 0.0
+        self._metabolic = 0.0
+        self._structural = 0.0
+        self._tss_load = 0.0
+        self._kalman = 0.0
+        self._kalman_p = 1.0
+        self._recent_days: deque = deque(maxlen=3)
+        self._perf_sum = 0.0
+        self._perf_days = 0
+        for t, w, r, rpe in rows:
+            self._add(float(w), int(r), rpe, t)
+        self._fit()
+
+    def _add(self, w: float, r: int, rpe: float, t: float) -> None:
+        i = self.n
+        s = (pd.Timedelta(t, unit="D") - self._t0).days
+        vol = w * r
+        if i:
+            ds = s - self._days[-1]
+            w_prev, s_prev = self.weights[-1], self._days[-1]
+        self.n += 1
+        self.weights.append(w)
+        self.reps.append(r)
+        self.rpe_scores.append(rpe)
+        self.times.append(t)
+        self._days.append(s)
+        self.one_rm = max(self.one_rm, w * (1 + self.EPL_COEFF * min(r, 8)))
+        self._reps_sum += r
+        self._w.add(s, w)
+        self._w_index.add(i, w)
+        self._rpe_index.add(i, rpe)
+        self._vol.add(i, vol)
+        self._ew = w if i == 0 else 0.3 * w + 0.7 * self._ew
+        self._ew_index.add(i, self._ew)
+
+        a = 2 / (self.L + 1)
+        recent = vol if i == 0 else a * vol + (1 - a) * self._loads[-1]
+        self._loads.append(recent)
+        if i == 0:
+            self._first_load = vol
+            self._acute = self._chronic = vol
+        else:
+            self._acute = (2 / 8) * vol + (1 - 2 / 8) * self._acute
+            self._chronic = (2 / 29) * vol + (1 - 2 / 29) * self._chronic
+
+        self._second_half.add(s, w)
+        mid = self.n // 2
+        if mid > self._mid:
+            moved_w, moved_s = self.weights[self._mid], self._days[self._mid]
+            self._second_half.remove(moved_s, moved_w)
+            self._first_half.add(moved_s, moved_w)
+            self._mid = mid
+        if i and not self._change_point:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                step = np.float64(w - w_prev) / np.float64(s - s_prev)
+            if self._rising is not None and self._rising and step <= 0:
+                self._change_point = True
+            self._rising = bool(step > 0)
+
+        self._w_season.add(w)
+        self._vol_season.add(vol)
+        self._w_haar.add(w)
+        self._vol_haar.add(vol)
+        if i and vol > 0:
+            self._efficiency_sum += (w - w_prev) / vol
+            self._efficiency_n += 1
+
+        weighted = vol * (1 + (rpe - 7) * 0.1)
+        rep_factor = 1.0 if r <= 5 else 0.8 if r <= 12 else 0.6
+        if i:
+            self._neuro *= self.NEUROMUSCULAR_DECAY**ds
+            self._metabolic *= self.METABOLIC_DECAY**ds
+            self._structural *= self.STRUCTURAL_DECAY**ds
+            self._tss_load *= 0.9 ** float(ds)
+        self._neuro += weighted
+        self._metabolic += weighted
+        self._structural += weighted
+        self._tss_load += rep_factor * w * w
+
+        if i == 0:
+            self._kalman = w
+        else:
+            self._kalman_p += 1e-5
+            gain = self._kalman_p / (self._kalman_p + 0.1)
+            self._kalman += gain * (w - self._kalman)
+            self._kalman_p *= 1 - gain
+            self._lagged.add(w_prev, w)
+
+        if self._recent_days and self._recent_days[-1][0] == s:
+            day = self._recent_days[-1]
+            day[1] += vol
+            day[2] += w
+            day[3] += rpe
+            day[4] += 1
+        else:
+            if self._recent_days:
+                self._perf_sum += self.clamp(self._recent_days[-1][1] / self.MEV, 0.5, 1.5)
+                self._perf_days += 1
+            self._recent_days.append([s, vol, w, rpe, 1])
+
+    def _fit(self) -> None:
+        """Fit the AR decay factors and the weight forecast on the history."""
+        w = np.array(self.weights)
+        vols = w * np.array(self.reps)
+        t = np.array(self.times)
+        self._vol_decay = self.decay * self._ar_decay(vols)
+        self._fatigue_load = float(np.sum(vols * (self._vol_decay ** (t[-1] - t))))
+        self._diff_decay = self._ar_decay(np.diff(w)) if self.n >= 3 else 1.0
+        self._fitted = self.n
+        self._holt = None
+        self._arma = (0.0, 0.0, 0.0, 0.0)
+        if self.n < 3:
+            return
+        if self._fast():
+            level = w[0]
+            trend = w[1] - w[0]
+            for value in w[1:]:
+                level, trend = self._holt_step(level, trend, value)
+            self._holt = (level, trend)
+            return
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                res = ARIMA(list(w), order=(1, 1, 1)).fit()
+                forecast = float(res.forecast(steps=1)[-1])
+        except Exception:
+            return
+        phi, ma = float(res.params[0]), float(res.params[1])
+        last_diff = float(w[-1] - w[-2])
+        shock = (forecast - w[-1] - phi * last_diff) / ma if ma else 0.0
+        self._arma = (phi, ma, shock, last_diff)
+
+    @classmethod
+    def _holt_step(cls, level: float, trend: float, value: float) -> tuple[float, float]:
+        prev = level
+        level = cls.HOLT_ALPHA * value + (1 - cls.HOLT_ALPHA) * (level + trend)
+        trend = cls.HOLT_BETA * (level - prev) + (1 - cls.HOLT_BETA) * trend
+        return level, trend
+
+    def _forecast_weight(self) -> float:
+        if self._holt is not None:
+            level, trend = self._holt
+            return float(level + trend)
+        phi, ma, shock, last_diff = self._arma
+        return self.weights[-1] + phi * last_diff + ma * shock
+
+    def append(self, weight: float, reps: int, rpe: float, timestamp: float) -> None:
+        """Add a performed set after the last one."""
+        last = self.weights[-1]
+        predicted = self._forecast_weight() - last
+        self._add(float(weight), int(reps), rpe, timestamp)
+        dt = self.times[-1] - self.times[-2]
+        self._fatigue_load = (
+            self._fatigue_load * self._vol_decay**dt + weight * reps
+        )
+        if self._holt is not None:
+            self._holt = self._holt_step(*self._holt, weight)
+        else:
+            phi, ma, _shock, _diff = self._arma
+            diff = weight - last
+            self._arma = (phi, ma, diff - predicted, diff)
+        if self.n < self.REFIT_BELOW or self.n >= 2 * self._fitted:
+            self._fit()
+
+    def step(self) -> dict:
+        """Prescribe the next set, perform it a day later and return it."""
+        data = self.next_set()
+        self.append(
+            float(data["weight"]),
+            int(data["reps"]),
+            int(round(data["target_rpe"])),
+            self.times[-1] + 1,
+        )
+        return data
+
+    def _plateau_score(self, slope: float, cv: float, thresh: float) -> float:
+        slope_zero = 1 if abs(slope) < self.EPSILON else 0
+        cv_low = 1 if cv < 1.5 else 0
+        thresh_low = 1 if thresh <= 0.02 else 0
+        change = 0.0
+        if self.n >= 6:
+            if self._first_half.slope() > 0 and self._second_half.slope() <= 0:
+                change = 1.0
+            if self._change_point:
+                change += 0.5
+            std = self._w.std_y()
+            if std != 0:
+                change += min(abs(self.weights[-1] - self._w.mean_y) / std / 3, 0.5)
+            trend, seasonal = self._w_season.components()
+            change += min(abs(seasonal) / (abs(trend) + self.EPSILON), 0.5)
+        return self.W1 * slope_zero + self.W2 * cv_low + self.W3 * thresh_low + 0.2 * change
+
+    def _advanced_plateau(self) -> float:
+        if self.n < 6:
+            return 0.0
+        performance_score = 1.0 if abs(self._w_index.slope()) < 0.001 else 0.0
+        rpe_score = 1.0 if self._rpe_index.slope() > 0.1 else 0.0
+        efficiency_score = (
+            1.0
+            if self._efficiency_n and self._efficiency_sum / self._efficiency_n < 0.001
+            else 0.0
+        )
+        recent = self.weights[-4:]
+        recent_cv = np.std(recent) / np.mean(recent) * 100
+        variability_score = 1.0 if recent_cv < 2.0 else 0.0
+        return (
+            0.4 * performance_score
+            + 0.3 * rpe_score
+            + 0.2 * efficiency_score
+            + 0.1 * variability_score
+        )
+
+    def _stress(self, one_rm: float) -> float:
+        values = []
+        for _day, vol, w_sum, rpe_sum, count in self._recent_days:
+            intensity = self.clamp(w_sum / count / one_rm, 0.6, 1.1)
+            rpe_factor = self.clamp(rpe_sum / count / 7, 0.8, 1.3)
+            values.append(vol * intensity * rpe_factor)
+        return self.clamp(np.mean(values) / self.MEV, 0.0, 2.0)
+
+    def _step_alpha(self, delta_1rm: float, delta_vol: float, rec: float) -> float:
+        base = 0.6 * delta_1rm + 0.4 * delta_vol
+        trend = 1.0
+        if self.n >= 3:
+            trend = self._diff_decay
+            lagged = self._lagged
+            forecast = lagged.mean_y + lagged.slope() * (self.weights[-1] - lagged.mean_x)
+            if self._kalman != 0:
+                trend *= self.clamp(forecast / self._kalman, 0.8, 1.2)
+        exp_factor = self.clamp(1 + math.log1p(self.experience) / 200, 1.0, 1.1)
+        return self.clamp(base * rec * trend * exp_factor, self.ALPHA_MIN, self.ALPHA_MAX)
+
+    def next_set(self) -> dict:
+        """Return the first set :meth:`exercise_prescription` would prescribe."""
+        n = self.n
+        now = self._days[-1]
+        pyr_ts, pyr_vals, pyr_weights, pyr_metrics = self._pyramid
+        est_1rm = self._blend_pyramid_1rm(self.one_rm, pyr_ts, pyr_vals, now)
+        y_mean = self._w.mean_y
+        slope = self._ew_index.slope() if n >= 2 else 0.0
+        recent = self._loads[-1]
+        prev = self._loads[0] if n > self.L else self._first_load
+        thresh = self._threshold(recent, prev)
+        vol_mean = self._vol.mean_y
+        cv = self._vol.std_y() / vol_mean * 100 if vol_mean != 0 else 0.0
+        plateau = (self._plateau_score(slope, cv, thresh) + self._advanced_plateau()) / 2
+
+        trend, seasonal = self._vol_season.components()
+        low, mid, high = self._vol_haar.energies()
+        base_fatigue = self._pyramid_enhanced_fatigue(
+            pyr_ts,
+            pyr_vals,
+            pyr_weights,
+            pyr_metrics,
+            self._fatigue_load
+            * (1 + abs(seasonal) / (abs(trend) + 1e-9))
+            * (1 + high / (low + mid + 1e-9)),
+            now,
+        )
+        if int(round(self._reps_sum / n)) <= 5:
+            enhanced = 0.5 * self._neuro + 0.3 * self._structural + 0.2 * self._metabolic
+        else:
+            enhanced = 0.3 * self._neuro + 0.4 * self._structural + 0.3 * self._metabolic
+        tss = (50.0 / 60) * self._tss_load / est_1rm**2 / 60 * 100 if est_1rm else 0.0
+        fatigue = base_fatigue + enhanced + tss
+
+        ac_ratio = self._acute / self._chronic if self._chronic != 0 else 1.0
+        perf_factor = (
+            self._perf_sum
+            + self.clamp(self._recent_days[-1][1] / self.MEV, 0.5, 1.5)
+        ) / (self._perf_days + 1)
+        rec_scores = self._recovery_scores_from_logs(self.body_weight, None, None, None)
+        ea = self._energy_availability(self.body_weight, None)
+        stress_auto = self._stress(est_1rm)
+        mrv = self._mrv(self.MEV, fatigue, stress_auto, ea, self.theta)
+        sri = self._sleep_recovery_index(None, None)
+        adj_mrv = mrv * perf_factor * float(np.mean(rec_scores))
+        recovery_quality = self._comprehensive_recovery_quality(
+            None, None, None, self.body_weight, stress_auto, None
+        )
+        one_rm = est_1rm
+        if pyr_vals:
+            one_rm = self._pyramid_weighted_1rm(
+                pyr_ts,
+                pyr_vals,
+                self.one_rm,
+                base_fatigue / (adj_mrv + self.EPSILON),
+                now - pyr_ts[-1],
+            )
+        delta_1rm, delta_vol = self._deltas(one_rm, y_mean, recent, prev)
+        rec_factor = (float(np.mean(rec_scores)) + recovery_quality) / 2
+        alpha = self._step_alpha(delta_1rm, delta_vol, rec_factor)
+        alpha = self._pyramid_enhanced_alpha(
+            alpha, pyr_ts, pyr_vals, pyr_weights, pyr_metrics, now
+        )
+        weekly_rate = self._weekly_rate(slope, y_mean)
+        mean_rpe = self._rpe_index.mean_y
+        # the trigger only needs the RPE mean, which a one-item list carries
+        deload_trigger = self._deload_trigger(perf_factor, [mean_rpe], rec_factor, 1.0)
+        mse = self._w.cyy / n if n > 1 else 0.0
+        se = math.sqrt(mse / self._w.cxx) if self._w.cxx != 0 else 0.0
+        deload_needed = deload_trigger >= 1.0 or (slope - 1.96 * se <= 0 <= slope + 1.96 * se)
+
+        base_reps = round(self._reps_sum / n * (1 + alpha * (1 - plateau)))
+        w_low, w_mid, w_high = self._w_haar.energies()
+        intensity_target = (0.75 if base_reps >= 6 else 0.85) * (
+            1 + w_high / (w_low + w_mid + 1e-9) * 0.01
+        )
+        target_velocity_loss = self._compute_target_velocity_loss(
+            base_reps,
+            self.rpe_scores[-1],
+            self.reps[-1],
+            self.weights[-1] / one_rm,
+            fatigue / (adj_mrv + self.EPSILON),
+        )
+        reps_1 = self.clamp(
+            round(base_reps * (1 - weekly_rate / (abs(weekly_rate) + 1))), 1, 20
+        )
+        if deload_needed:
+            reps_1 = math.ceil(0.7 * reps_1)
+        weight_1 = self.clamp(
+            one_rm * intensity_target * (1 - 0.1 * plateau) * ea * sri,
+            0.5 * y_mean,
+            0.95 * max(one_rm, self._forecast_weight()),
+        )
+        if deload_needed:
+            weight_1 *= 0.8
+        reps_1 = self._velocity_adjusted_reps(
+            int(reps_1), 1, weight_1 / one_rm, fatigue, target_velocity_loss
+        )
+        target_rpe = self.clamp(7 + 0.3 * plateau, 6, 9)
+        rpe_scale = self._rpe_index.std_y() / mean_rpe if mean_rpe != 0 else 1.0
+        first = {
+            "set": 1,
+            "reps": int(reps_1),
+            "weight": round(weight_1, 1),
+            "target_rpe": round(target_rpe, 1),
+            "rest_seconds": int(90 + 30 * rpe_scale + 15 * (reps_1 < 5) + 10),
+        }
+        deload_score = self._comprehensive_deload_assessment(
+            1 - perf_factor,
+            np.mean(self.rpe_scores[-3:]) / 7,
+            ac_ratio,
+            recovery_quality,
+            0,
+        )
+        if deload_score > 0.5:
+            first = self._deload_adjusted_prescription([first], deload_score)[0]
+        return first
@@ -0,0 +1,52 @@
+import datetime
+import warnings
+from typing import Iterable
+
+import numpy as np
+
+
+class Timestamps:
+    """Bulk ISO timestamp parsing into NumPy ``datetime64[us]`` arrays.
+
+    Naive values are taken as UTC and aware values are converted to UTC,
+    matching ``datetime.fromisoformat`` followed by a UTC default. Plain
+    values go through NumPy's C parser in one call and only columns with
+    offsets or unusual formats fall back to parsing each distinct string.
+    Missing or empty values become ``NaT``.
+    """
+
+    @classmethod
+    def parse(cls, values: Iterable) -> np.ndarray:
+        """Return ``values`` as a ``datetime64[us]`` array."""
+        if not isinstance(values, np.ndarray):
+            values = np.asarray(list(values), dtype=object)
+        arr = np.where(values == None, "", values).astype(str)  # noqa: E711
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                return arr.astype("datetime64[us]")
+        except (ValueError, UserWarning, DeprecationWarning):
+            return cls._parse_each(arr)
+
+    @staticmethod
+    def _parse_each(arr: np.ndarray) -> np.ndarray:
+        keys, inverse = np.unique(arr, return_inverse=True)
+        parsed = np.empty(len(keys), dtype="datetime64[us]")
+        for i, text in enumerate(keys):
+            if not text:
+                parsed[i] = np.datetime64("NaT")
+                continue
+            dt = datetime.datetime.fromisoformat(str(text))
+            if dt.tzinfo is not None:
+                dt = dt.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+            parsed[i] = np.datetime64(dt, "us")
+        return parsed[inverse.reshape(-1)]
+
+    @staticmethod
+    def seconds_between(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        """Return ``end - start`` in seconds, ``NaN`` where either is missing."""
+        missing = np.isnat(start) | np.isnat(end)
+        micros = (end - start).astype(np.int64)
+        seconds = micros / 1e6
+        seconds[missing] = np.nan
+        return seconds
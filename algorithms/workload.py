@@ -0,0 +1,83 @@
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class Workload:
+    """Day-by-day acute:chronic workload metrics in a single pass.
+
+    Loads are spread over a continuous calendar where rest days count as
+    zero. Acute and chronic loads are exponentially weighted averages with
+    ``acute_span`` and ``chronic_span`` (the same smoothing as
+    ``ExercisePrescription._ewma``). The rolling ACWR, monotony and strain
+    come from cumulative sums, so every day costs O(1) regardless of the
+    window length. Windows at the start of the history use the days
+    available so far.
+    """
+
+    def __init__(
+        self, acute_span: int = 7, chronic_span: int = 28, window: int = 7
+    ) -> None:
+        self.acute_span = acute_span
+        self.chronic_span = chronic_span
+        self.window = window
+
+    @staticmethod
+    def daily(dates: Sequence[str], loads: Sequence[float]) -> tuple[np.ndarray, np.ndarray]:
+        """Return every calendar day between the first and last date and its load."""
+        days = np.asarray(dates, dtype="datetime64[D]")
+        if not len(days):
+            return days, np.zeros(0)
+        first = days.min()
+        offsets = (days - first).astype(np.int64)
+        totals = np.bincount(
+            offsets, weights=np.asarray(loads, dtype=float), minlength=int(offsets.max()) + 1
+        )
+        return first + np.arange(len(totals)), totals
+
+    @staticmethod
+    def ewma(values: np.ndarray, span: int) -> np.ndarray:
+        return pd.Series(values, dtype=float).ewm(span=span, adjust=False).mean().to_numpy()
+
+    @staticmethod
+    def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+        """Return the sum of the last ``window`` values at every position."""
+        totals = np.concatenate(([0.0], np.cumsum(values, dtype=float)))
+        ends = np.arange(1, len(values) + 1)
+        return totals[ends] - totals[np.maximum(ends - window, 0)]
+
+    @staticmethod
+    def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+        out = np.ones(len(num))
+        np.divide(num, den, out=out, where=den != 0)
+        return out
+
+    def timeline(self, loads: Sequence[float]) -> Dict[str, np.ndarray]:
+        """Return acute, chronic, ACWR, rolling ACWR, monotony and strain per day."""
+        x = np.asarray(loads, dtype=float)
+        n = np.arange(1, len(x) + 1)
+        acute = self.ewma(x, self.acute_span)
+        chronic = self.ewma(x, self.chronic_span)
+        acute_n = np.minimum(n, self.acute_span)
+        chronic_n = np.minimum(n, self.chronic_span)
+        acute_mean = self.rolling_sum(x, self.acute_span) / acute_n
+        chronic_mean = self.rolling_sum(x, self.chronic_span) / chronic_n
+
+        # centre before squaring so long histories keep their precision
+        shift = x.mean() if len(x) else 0.0
+        week_n = np.minimum(n, self.window)
+        week = self.rolling_sum(x, self.window)
+        mean = self.rolling_sum(x - shift, self.window) / week_n
+        var = self.rolling_sum((x - shift) ** 2, self.window) / week_n - mean**2
+        std = np.sqrt(np.clip(var, 0.0, None))
+        std[std <= 1e-9 * (np.abs(mean + shift) + 1.0)] = 0.0
+        monotony = self._ratio(mean + shift, std)
+        return {
+            "acute": acute,
+            "chronic": chronic,
+            "acwr": self._ratio(acute, chronic),
+            "rolling_acwr": self._ratio(acute_mean, chronic_mean),
+            "monotony": monotony,
+            "strain": week * monotony,
+        }
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import concurrent.futures
+import multiprocessing
+import os
+import signal
+import threading
+from typing import Callable, Dict, Optional
+
+
+class AnalyticsBusyError(RuntimeError):
+    """Raised when the analytics queue is full."""
+
+
+class AnalyticsTimeoutError(TimeoutError):
+    """Raised when an analytics job exceeds its time budget."""
+
+
+class AnalyticsExecutor:
+    """Process pool for CPU-bound analytics.
+
+    Heavy statistics kernels are plain functions on plain data, so they run in
+    worker processes and leave the API's threads and GIL to light requests.
+    Workers import NumPy, pandas and statsmodels when they start. At most
+    ``max_pending`` jobs are queued or running; further submissions raise
+    :class:`AnalyticsBusyError`. Jobs exceeding ``timeout`` seconds are
+    cancelled while queued and aborted inside the worker once running.
+    With ``workers=0`` jobs run inline in the calling thread.
+    """
+
+    PRELOAD = ("numpy", "pandas", "statsmodels.api", "algorithms")
+
+    _shared: Optional["AnalyticsExecutor"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_pending: int = 16,
+        timeout: float | None = 30.0,
+    ) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool: concurrent.futures.ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "AnalyticsExecutor":
+        """Return the process-wide executor sized by ``ANALYTICS_WORKERS``."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                workers = int(os.environ.get("ANALYTICS_WORKERS", "2"))
+                cls._shared = cls(workers=workers)
+            return cls._shared
+
+    @classmethod
+    def _warm_worker(cls) -> None:
+        for module in cls.PRELOAD:
+            __import__(module)
+
+    @staticmethod
+    def _execute(
+        func: Callable, args: tuple, kwargs: dict, timeout: float | None
+    ) -> object:
+        """Run ``func`` in a worker, aborting it after ``timeout`` seconds."""
+        if not timeout or not hasattr(signal, "setitimer"):
+            return func(*args, **kwargs)
+
+        def expire(_signum, _frame):
+            raise AnalyticsTimeoutError(f"analytics job exceeded {timeout}s")
+
+        previous = signal.signal(signal.SIGALRM, expire)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+    def start(self) -> None:
+        """Start the pool and import the analytics stack in every worker."""
+        if self.workers <= 0:
+            return
+        pool = self._ensure_pool()
+        warmups = [
+            pool.submit(AnalyticsExecutor._warm_worker) for _ in range(self.workers)
+        ]
+        concurrent.futures.wait(warmups)
+
+    def submit(self, func: Callable, *args, **kwargs) -> concurrent.futures.Future:
+        """Queue ``func(*args, **kwargs)`` and return its future."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise AnalyticsBusyError("analytics queue is full")
+        try:
+            if self.workers <= 0:
+                future: concurrent.futures.Future = concurrent.futures.Future()
+                try:
+                    future.set_result(func(*args, **kwargs))
+                except Exception as exc:
+                    future.set_exception(exc)
+            else:
+                future = self._ensure_pool().submit(
+                    AnalyticsExecutor._execute, func, args, kwargs, self.timeout
+                )
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._finished)
+        return future
+
+    def run(self, func: Callable, *args, **kwargs) -> object:
+        """Run ``func`` in the pool and wait for its result."""
+        future = self.submit(func, *args, **kwargs)
+        wait = None if self.timeout is None else self.timeout + 5.0
+        try:
+            return future.result(timeout=wait)
+        except AnalyticsTimeoutError:
+            raise
+        except concurrent.futures.TimeoutError:
+            self.cancel(future)
+            raise AnalyticsTimeoutError("analytics job timed out") from None
+
+    def cancel(self, future: concurrent.futures.Future) -> bool:
+        """Cancel a queued job; running jobs stop at their timeout."""
+        return future.cancel()
+
+    def info(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "cancelled": self.cancelled,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _ensure_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=AnalyticsExecutor._warm_worker,
+                )
+            return self._pool
+
+    def _finished(self, future: concurrent.futures.Future) -> None:
+        self._slots.release()
+        with self._lock:
+            if future.cancelled():
+                self.cancelled += 1
+                return
+            exc = future.exception()
+            if isinstance(exc, AnalyticsTimeoutError):
+                self.timed_out += 1
+            elif exc is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
@@ -0,0 +1,486 @@
+from __future__ import annotations
+
+import datetime
+import inspect
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from algorithms import ExercisePrescription, ExerciseProgressEstimator
+
+
+class SyntheticHistory:
+    """Deterministic training log of ``years`` at ``sessions_per_week``.
+
+    Sessions alternate between an upper and a lower day of four exercises
+    with four timed working sets each. Loads follow a saturating long-term
+    progression with a four-week wave, a deload every eighth week and
+    seeded noise, so the same arguments always produce the same rows. Body
+    weight and wellness are logged every day and one goal is set for the
+    first exercise.
+    """
+
+    EXERCISES = (
+        ("Barbell Bench Press", "Olympic Barbell", 70.0),
+        ("Barbell Row", "Olympic Barbell", 60.0),
+        ("Overhead Press", "Olympic Barbell", 40.0),
+        ("Dumbbell Bench Press", "Adjustable Dumbbells", 25.0),
+        ("Squat", "Olympic Barbell", 90.0),
+        ("Deadlift", "Olympic Barbell", 110.0),
+        ("Romanian Deadlift", "Olympic Barbell", 70.0),
+        ("Lunge", "Adjustable Dumbbells", 20.0),
+    )
+    SETS_PER_EXERCISE = 4
+    WAVE = (0.95, 1.0, 1.025, 1.05)
+    REPS = (8, 6, 5, 3)
+
+    def __init__(
+        self,
+        years: float,
+        sessions_per_week: int = 4,
+        seed: int = 0,
+        start: datetime.date = datetime.date(2015, 1, 5),
+    ) -> None:
+        if years <= 0 or sessions_per_week <= 0:
+            raise ValueError("years and sessions_per_week must be positive")
+        self.years = years
+        self.sessions_per_week = sessions_per_week
+        self.seed = seed
+        self.start = start
+        self.weeks = max(1, round(years * 52))
+
+    @property
+    def label(self) -> str:
+        return f"{self.years:g}y"
+
+    def sessions(self) -> Iterable[Tuple[datetime.date, List[Tuple[str, str, List[Tuple[int, float, int]]]]]]:
+        """Yield ``(date, [(exercise, equipment, [(reps, weight, rpe)])])``."""
+        rng = random.Random(self.seed)
+        offsets = [i * 7 // self.sessions_per_week for i in range(self.sessions_per_week)]
+        count = 0
+        for week in range(self.weeks):
+            growth = 1 + 0.35 * (1 - math.exp(-week / 150))
+            deload = week % 8 == 7
+            wave = 0.8 if deload else self.WAVE[week % 4]
+            reps = self.REPS[week % 4] + (2 if deload else 0)
+            for offset in offsets:
+                date = self.start + datetime.timedelta(days=week * 7 + offset)
+                day = self.EXERCISES[(count % 2) * 4 : (count % 2) * 4 + 4]
+                count += 1
+                exercises = []
+                for name, equipment, base in day:
+                    top = base * growth * wave * rng.uniform(0.97, 1.03)
+                    sets = []
+                    for k in range(self.SETS_PER_EXERCISE):
+                        weight = round(top * (1 - 0.025 * k) / 2.5) * 2.5
+                        rpe = min(10, 7 + k // 2 + rng.randint(0, 1) - deload)
+                        sets.append((reps - (k == 3 and rng.random() < 0.3), weight, rpe))
+                    exercises.append((name, equipment, sets))
+                yield date, exercises
+
+    def write(self, db_path: str) -> Dict[str, int]:
+        """Insert the history into the initialised database at ``db_path``."""
+        rng = random.Random(self.seed + 1)
+        workouts = sets = 0
+        last = self.start
+        with sqlite3.connect(db_path) as conn:
+            cur = conn.cursor()
+            for date, exercises in self.sessions():
+                start = datetime.datetime.combine(date, datetime.time(18, 0))
+                end = start + datetime.timedelta(minutes=75)
+                cur.execute(
+                    "INSERT INTO workouts (date, start_time, end_time, training_type, location, rating) "
+                    "VALUES (?, ?, ?, 'strength', 'Gym', ?);",
+                    (date.isoformat(), start.isoformat(), end.isoformat(), rng.randint(3, 5)),
+                )
+                wid = cur.lastrowid
+                workouts += 1
+                clock = start
+                for name, equipment, entries in exercises:
+                    cur.execute(
+                        "INSERT INTO exercises (workout_id, name, equipment_name) VALUES (?, ?, ?);",
+                        (wid, name, equipment),
+                    )
+                    eid = cur.lastrowid
+                    rows = []
+                    for position, (reps, weight, rpe) in enumerate(entries, start=1):
+                        set_end = clock + datetime.timedelta(seconds=4 * reps + rng.randint(5, 15))
+                        rows.append(
+                            (eid, reps, weight, rpe, position, clock.isoformat(), set_end.isoformat())
+                        )
+                        clock = set_end + datetime.timedelta(seconds=rng.randint(90, 180))
+                    cur.executemany(
+                        "INSERT INTO sets (exercise_id, reps, weight, rpe, position, start_time, end_time) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?);",
+                        rows,
+                    )
+                    sets += len(rows)
+                last = date
+            days = (last - self.start).days + 1
+            dates = [(self.start + datetime.timedelta(days=i)).isoformat() for i in range(days)]
+            cur.executemany(
+                "INSERT INTO body_weight_logs (date, weight) VALUES (?, ?);",
+                [(d, round(80 + 2 * math.sin(i / 60) + rng.uniform(-0.5, 0.5), 1)) for i, d in enumerate(dates)],
+            )
+            cur.executemany(
+                "INSERT INTO wellness_logs (date, calories, sleep_hours, sleep_quality, stress_level) "
+                "VALUES (?, ?, ?, ?, ?);",
+                [
+                    (d, rng.randint(2400, 3200), round(rng.uniform(6, 9), 1), rng.randint(2, 5), rng.randint(1, 6))
+                    for d in dates
+                ],
+            )
+            name = self.EXERCISES[0][0]
+            cur.execute(
+                "INSERT INTO goals (exercise_name, name, target_value, unit, start_date, target_date) "
+                "VALUES (?, ?, ?, 'kg', ?, ?);",
+                (name, f"{name} goal", 150.0, self.start.isoformat(), (last + datetime.timedelta(days=90)).isoformat()),
+            )
+        return {"workouts": workouts, "sets": sets, "days": days}
+
+
+class BenchmarkSuite:
+    """Time prescriptions, statistics and repository reads on synthetic histories.
+
+    Every scale gets a fresh database filled by :class:`SyntheticHistory`.
+    Each case runs once to warm up and then ``repeat`` timed times; caches
+    of the statistics and prescription services are cleared before every
+    run, so results measure computation rather than cache hits. Results
+    are plain JSON for :meth:`compare` between commits.
+    """
+
+    SCALES = (1, 3, 10)
+    SKIPPED_STATS = {
+        "batch",
+        "chart_key",
+        "clear_cache",
+        "downsample",
+        "schedule_model_training",
+        "train_models",
+    }
+
+    def __init__(
+        self,
+        years: Iterable[float] = SCALES,
+        sessions_per_week: int = 4,
+        repeat: int = 3,
+        only: Optional[str] = None,
+    ) -> None:
+        self.years = list(years)
+        self.sessions_per_week = sessions_per_week
+        self.repeat = repeat
+        self.only = only
+
+    def run(self, log: Callable[[str], None] | None = None) -> dict:
+        from rest_api import GymAPI
+
+        results: List[dict] = []
+        for years in self.years:
+            history = SyntheticHistory(years, self.sessions_per_week)
+            with tempfile.TemporaryDirectory() as tmp:
+                db_path = os.path.join(tmp, "bench.db")
+                api = GymAPI(db_path=db_path, yaml_path=os.path.join(tmp, "settings.yaml"))
+                counts = history.write(db_path)
+                for name, func, setup in self.cases(api):
+                    if self.only and self.only not in name:
+                        continue
+                    entry = {"name": name, "scale": history.label, **counts}
+                    entry.update(self.measure(func, setup, self.repeat))
+                    results.append(entry)
+                    if log is not None:
+                        log(self.format(entry))
+        return {
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "commit": self._commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sessions_per_week": self.sessions_per_week,
+            "repeat": self.repeat,
+            "results": results,
+        }
+
+    def cases(self, api) -> List[Tuple[str, Callable[[], object], Callable[[], None] | None]]:
+        """Return ``(name, func, setup)`` for every benchmarked call."""
+        names = [name for name, _eq, _base in SyntheticHistory.EXERCISES]
+        main = names[0]
+        groups = {name: [name] for name in names}
+        workout_ids = [row[0] for row in api.workouts.fetch_all_workouts()]
+        last_date = api.workouts.fetch_detail(workout_ids[0])[1]
+        goal_id = api.goals.fetch_all()[0][0]
+        kwargs = self._prescription_kwargs(api, main)
+        timed = self._prescription_kwargs(api, main, durations=True)
+
+        cases: List[Tuple[str, Callable[[], object], Callable[[], None] | None]] = []
+        for backend in ExercisePrescription.ESTIMATORS:
+            def prescribe(backend=backend, kw=kwargs):
+                with ExercisePrescription.estimator_backend(backend):
+                    return ExercisePrescription.exercise_prescription(**kw)
+
+            def prescribe_timed(backend=backend, kw=timed):
+                with ExercisePrescription.estimator_backend(backend):
+                    return ExercisePrescription.exercise_prescription(**kw)
+
+            cases.append((f"prescription.exercise_prescription[{backend}]", prescribe, None))
+            cases.append((f"prescription.exercise_prescription[{backend},durations]", prescribe_timed, None))
+            cases.append(
+                (f"prescription.prescribe[{backend}]", lambda b=backend: ExercisePrescription.prescribe(b, kwargs), None)
+            )
+        progress = {k: kwargs[k] for k in ("weights", "reps", "timestamps", "rpe_scores")}
+        cases.append(
+            (
+                "prescription.predict_progress",
+                lambda: ExerciseProgressEstimator.predict_progress(
+                    **progress,
+                    weeks=12,
+                    workouts_per_week=2,
+                    body_weight=kwargs["body_weight"],
+                    months_active=kwargs["months_active"],
+                    workouts_per_month=kwargs["workouts_per_month"],
+                ),
+                None,
+            )
+        )
+        cases.append(
+            (
+                "recommendation.generate_prescription",
+                lambda: api.recommender.generate_prescription(main),
+                api.recommender.prescriptions.clear,
+            )
+        )
+
+        args = {
+            "exercise": main,
+            "exercise1": main,
+            "exercise2": names[4],
+            "muscle": "Pectoralis Major",
+            "muscle_group": "Chest",
+            "goal_id": goal_id,
+            "workout_id": workout_ids[0],
+            "before_date": last_date,
+            "weeks": 4,
+            "workouts_per_week": 3,
+            "days": 14,
+        }
+        stats = api.statistics
+        for name, method in inspect.getmembers(stats, inspect.ismethod):
+            if name.startswith("_") or name in self.SKIPPED_STATS:
+                continue
+            params = inspect.signature(method).parameters.values()
+            call = {
+                p.name: args[p.name]
+                for p in params
+                if p.default is p.empty and p.kind is not p.VAR_KEYWORD and p.kind is not p.VAR_POSITIONAL
+            }
+            cases.append((f"stats.{name}", self._consume(method, call), stats.clear_cache))
+
+        sets = api.sets
+        cases += [
+            ("repo.sets.fetch_history_by_names", lambda: sets.fetch_history_by_names([main]), None),
+            (
+                "repo.sets.fetch_history_by_names[details]",
+                lambda: sets.fetch_history_by_names(
+                    [main], with_equipment=True, with_duration=True, with_workout_id=True
+                ),
+                None,
+            ),
+            ("repo.sets.iter_history_by_names", lambda: list(sets.iter_history_by_names(names)), None),
+            ("repo.sets.fetch_histories_by_names", lambda: sets.fetch_histories_by_names(groups), None),
+            ("repo.sets.history_fingerprint", lambda: sets.history_fingerprint([main]), None),
+            ("repo.sets.history_fingerprints", lambda: sets.history_fingerprints(groups), None),
+            ("repo.sets.workout_summary", lambda: sets.workout_summary(workout_ids[0]), None),
+            ("repo.sets.recent_equipment", lambda: sets.recent_equipment(), None),
+            ("repo.sets.data_version", lambda: sets.data_version("sets", "exercises", "workouts"), None),
+            ("repo.workouts.fetch_all_workouts", lambda: api.workouts.fetch_all_workouts(), None),
+            ("repo.workouts.fetch_details", lambda: api.workouts.fetch_details(workout_ids), None),
+        ]
+        cases += self._aggregation_cases(
+            sets.fetch_history_by_names(
+                names, with_equipment=True, with_duration=True, with_workout_id=True, with_location=True
+            )
+        )
+        return cases
+
+    @staticmethod
+    def _aggregation_cases(rows: List[tuple]) -> List[Tuple[str, Callable[[], object], Callable[[], None] | None]]:
+        """Daily volume and per-exercise RPE by plain loop and by ``HistoryFrame``.
+
+        ``[cold]`` builds a new frame for every run, which is what a request
+        on changed data pays; ``[warm]`` reuses the cached groups and columns.
+        """
+        from stats_service import HistoryFrame
+
+        def loop():
+            by_date: Dict[str, List[float]] = {}
+            by_ex: Dict[str, List[float]] = {}
+            for reps, weight, rpe, date, ex, *_ in rows:
+                day = by_date.setdefault(date, [0.0, 0])
+                day[0] += int(reps) * float(weight)
+                day[1] += 1
+                item = by_ex.setdefault(ex, [0.0, 0])
+                item[0] += int(rpe)
+                item[1] += 1
+            return by_date, by_ex
+
+        def aggregate(frame: HistoryFrame):
+            days = frame.group("date")
+            return (
+                days.sum(frame.column("volume")),
+                days.count(),
+                frame.group("exercise").mean(frame.column("rpe")),
+            )
+
+        warm = [HistoryFrame(rows)]
+
+        def prime():
+            warm[0] = HistoryFrame(rows)
+            aggregate(warm[0])
+
+        return [
+            ("aggregate.loop", loop, None),
+            ("aggregate.group_by[cold]", lambda: aggregate(HistoryFrame(rows)), None),
+            ("aggregate.group_by[warm]", lambda: aggregate(warm[0]), prime),
+        ]
+
+    @staticmethod
+    def aggregation_speedups(report: dict) -> List[dict]:
+        """Return loop over group-by median ratios per scale, cold first."""
+        medians: Dict[str, Dict[str, float]] = {}
+        for r in report["results"]:
+            if r["name"].startswith("aggregate.") and "median_ms" in r:
+                medians.setdefault(r["scale"], {})[r["name"]] = r["median_ms"]
+        speedups = []
+        for scale, times in medians.items():
+            loop = times.get("aggregate.loop")
+            cold = times.get("aggregate.group_by[cold]")
+            warm = times.get("aggregate.group_by[warm]")
+            if not (loop and cold and warm):
+                continue
+            speedups.append(
+                {
+                    "scale": scale,
+                    "cold": round(loop / cold, 2),
+                    "warm": round(loop / warm, 2),
+                }
+            )
+        return speedups
+
+    @staticmethod
+    def _consume(method: Callable, kwargs: dict) -> Callable[[], object]:
+        def call():
+            result = method(**kwargs)
+            if inspect.isgenerator(result):
+                return list(result)
+            return result
+
+        return call
+
+    @staticmethod
+    def _prescription_kwargs(api, exercise: str, durations: bool = False) -> dict:
+        rows = api.sets.fetch_history_by_names([exercise], with_duration=True)
+        dates = [datetime.date.fromisoformat(r[3]) for r in rows]
+        first = dates[0]
+        kwargs = {
+            "weights": [float(r[1]) for r in rows],
+            "reps": [int(r[0]) for r in rows],
+            "timestamps": [(d - first).days for d in dates],
+            "rpe_scores": [float(r[2]) for r in rows],
+            "body_weight": 80.0,
+            "months_active": len({d.strftime("%Y-%m") for d in dates}),
+            "workouts_per_month": 8,
+            "exercise_name": exercise,
+        }
+        if durations:
+            kwargs["durations"] = [
+                (datetime.datetime.fromisoformat(r[5]) - datetime.datetime.fromisoformat(r[4])).total_seconds()
+                for r in rows
+            ]
+        return kwargs
+
+    @staticmethod
+    def measure(func: Callable[[], object], setup: Callable[[], None] | None, repeat: int) -> dict:
+        """Return timings in milliseconds, or the error of the warm-up run."""
+        try:
+            if setup is not None:
+                setup()
+            func()
+        except Exception as exc:  # record and keep benchmarking the rest
+            return {"error": f"{type(exc).__name__}: {exc}"}
+        times = []
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            func()
+            times.append((time.perf_counter() - start) * 1000)
+        return {
+            "runs": repeat,
+            "min_ms": round(min(times), 3),
+            "median_ms": round(statistics.median(times), 3),
+            "mean_ms": round(statistics.fmean(times), 3),
+        }
+
+    @staticmethod
+    def format(entry: dict) -> str:
+        if "error" in entry:
+            return f"{entry['scale']:>4} {entry['name']:<55} error: {entry['error']}"
+        return f"{entry['scale']:>4} {entry['name']:<55} {entry['median_ms']:>10.2f} ms"
+
+    @staticmethod
+    def save(report: dict, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    @staticmethod
+    def load(path: str) -> dict:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def compare(baseline: dict, current: dict, threshold: float = 0.2) -> List[dict]:
+        """Return cases whose median slowed down by more than ``threshold``.
+
+        Cases are matched on name and scale; ones missing from either
+        report or failing in either are ignored.
+        """
+        before = {
+            (r["name"], r["scale"]): r["median_ms"] for r in baseline["results"] if "median_ms" in r
+        }
+        slower = []
+        for r in current["results"]:
+            old = before.get((r["name"], r["scale"]))
+            if old is None or "median_ms" not in r or old <= 0:
+                continue
+            ratio = r["median_ms"] / old
+            if ratio > 1 + threshold:
+                slower.append(
+                    {
+                        "name": r["name"],
+                        "scale": r["scale"],
+                        "before_ms": old,
+                        "after_ms": r["median_ms"],
+                        "ratio": round(ratio, 2),
+                    }
+                )
+        return slower
+
+    @staticmethod
+    def _commit() -> Optional[str]:
+        try:
+            out = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                timeout=10,
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return out.stdout.strip() or None
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import concurrent.futures
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Callable, Dict, Hashable, List, Tuple
+
+
+class ChartRenderer:
+    """Render charts on a small worker pool and cache the encoded bytes.
+
+    Figures are built with matplotlib's object-oriented Agg API, so each
+    render owns its figure and never touches pyplot's global state. Results
+    are cached by ``(kind, args, version)`` where the version is the data
+    version of the tables the chart reads, and concurrent requests for the
+    same chart share one render. Every entry carries an ETag derived from
+    its bytes. All renderers share one process-wide pool, so per-database
+    instances do not each keep their own render threads.
+    """
+
+    WORKERS = 2
+    _shared_pool: concurrent.futures.ThreadPoolExecutor | None = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        pool: concurrent.futures.ThreadPoolExecutor | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._pool = pool or self.shared_pool()
+        self._entries: "OrderedDict[tuple, concurrent.futures.Future]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared_pool(cls) -> concurrent.futures.ThreadPoolExecutor:
+        """Return the process-wide render pool, creating it on first use."""
+        with cls._shared_lock:
+            if cls._shared_pool is None:
+                cls._shared_pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=cls.WORKERS, thread_name_prefix="chart"
+                )
+            return cls._shared_pool
+
+    def render(
+        self,
+        kind: str,
+        args: Hashable,
+        version: Hashable,
+        load: Callable[[], object],
+        draw: Callable[[object], bytes],
+    ) -> Tuple[bytes, str]:
+        """Return ``(content, etag)``, calling ``load`` and ``draw`` on a miss.
+
+        ``load`` runs in the calling thread so it may use the database,
+        ``draw`` turns its result into bytes on the render pool.
+        """
+        key = (kind, args, version)
+        with self._lock:
+            future = self._entries.get(key)
+            if future is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if future is None:
+            data = load()
+            with self._lock:
+                future = self._entries.get(key)
+                if future is None:
+                    self.misses += 1
+                    future = self._pool.submit(self._encode, draw, data)
+                    self._entries[key] = future
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        try:
+            return future.result()
+        except Exception:
+            with self._lock:
+                if self._entries.get(key) is future:
+                    del self._entries[key]
+            raise
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _encode(draw: Callable[[object], bytes], data: object) -> Tuple[bytes, str]:
+        content = draw(data)
+        return content, '"' + hashlib.sha1(content).hexdigest() + '"'
+
+    @staticmethod
+    def line_pdf(series: Dict[str, object]) -> bytes:
+        """Draw ``series`` (title, x, y, xlabel, ylabel) as a PDF line chart."""
+        if not series["x"]:
+            return b""
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.plot(series["x"], series["y"], marker="o")
+        ax.set_title(series["title"])
+        ax.set_xlabel(series["xlabel"])
+        ax.set_ylabel(series["ylabel"])
+        fig.tight_layout()
+        buf = BytesIO()
+        fig.savefig(buf, format="pdf")
+        return buf.getvalue()
+
+    @staticmethod
+    def text_png(lines: List[str], size: Tuple[int, int] = (400, 160)) -> bytes:
+        """Draw ``lines`` as a PNG card, the first line at the top."""
+        from PIL import Image, ImageDraw, ImageFont
+
+        img = Image.new("RGB", size, "white")
+        draw = ImageDraw.Draw(img)
+        font = ImageFont.load_default()
+        offsets = [10] + [50 + 30 * i for i in range(len(lines) - 1)]
+        for y, line in zip(offsets, lines):
+            draw.text((10, y), line, fill="black", font=font)
+        buf = BytesIO()
+        img.save(buf, format="PNG")
+        return buf.getvalue()
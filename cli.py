@@ -6,7 +6,7 @@ import shutil
 import subprocess
 from typing import Optional
 
-from db import WorkoutRepository, SetRepository
+from db import WorkoutRepository, SetRepository, PersonalRecordRepository
 from algorithms.weight_converter import WeightConverter
 from cli_tools import GitTools
 from rest_api import GymAPI
@@ -91,6 +91,12 @@ def import_workout_csv(csv_path: str, db_path: str, date: str) -> None:
             api.sets.add(ex_id, reps, weight, rpe)
 
 
+def rebuild_personal_records(db_path: str) -> None:
+    """Rebuild the personal record index from the full set history."""
+    count = PersonalRecordRepository(db_path).rebuild()
+    print(f"Rebuilt personal records for {count} exercises")
+
+
 def benchmark(url: str, runs: int = 10) -> None:
     times: list[float] = []
     for _ in range(runs):
@@ -101,6 +107,38 @@ def benchmark(url: str, runs: int = 10) -> None:
     print(f"Average /health response time over {runs} runs: {avg:.4f}s")
 
 
+def benchmark_suite(
+    years: list[float],
+    repeat: int,
+    out: str,
+    baseline: Optional[str] = None,
+    only: Optional[str] = None,
+    threshold: float = 0.2,
+) -> int:
+    """Run the benchmark suite, save JSON results and compare to ``baseline``."""
+    from benchmark_suite import BenchmarkSuite
+
+    suite = BenchmarkSuite(years=years, repeat=repeat, only=only)
+    report = suite.run(log=print)
+    BenchmarkSuite.save(report, out)
+    print(f"Results written to {out}")
+    for item in BenchmarkSuite.aggregation_speedups(report):
+        print(
+            f"{item['scale']:>4} group-by vs loop: {item['cold']:.2f}x cold "
+            f"({item['warm']:.2f}x with cached groups)"
+        )
+    if baseline is None:
+        return 0
+    slower = BenchmarkSuite.compare(BenchmarkSuite.load(baseline), report, threshold)
+    for item in slower:
+        print(
+            f"{item['scale']:>4} {item['name']}: {item['before_ms']:.2f} ms -> "
+            f"{item['after_ms']:.2f} ms ({item['ratio']}x)"
+        )
+    print(f"{len(slower)} regressions over {threshold:.0%}")
+    return 1 if slower else 0
+
+
 def security_audit() -> None:
     result = subprocess.run(["pip-audit"], capture_output=True, text=True)
     if result.returncode != 0:
@@ -153,6 +191,17 @@ def main() -> None:
     bench.add_argument("--url", default="http://localhost:8000")
     bench.add_argument("--runs", type=int, default=10)
 
+    suite = sub.add_parser("benchmark_suite")
+    suite.add_argument("--years", type=float, nargs="+", default=[1, 3, 10])
+    suite.add_argument("--repeat", type=int, default=3)
+    suite.add_argument("--out", default="benchmark_results.json")
+    suite.add_argument("--baseline")
+    suite.add_argument("--only")
+    suite.add_argument("--threshold", type=float, default=0.2)
+
+    records = sub.add_parser("rebuild_records")
+    records.add_argument("--db", default="workout.db")
+
     audit = sub.add_parser("audit")
 
     imp = sub.add_parser("import_strava")
@@ -184,6 +233,14 @@ def main() -> None:
         demo_data(args.db, args.yaml)
     elif args.cmd == "benchmark":
         benchmark(args.url, args.runs)
+    elif args.cmd == "benchmark_suite":
+        raise SystemExit(
+            benchmark_suite(
+                args.years, args.repeat, args.out, args.baseline, args.only, args.threshold
+            )
+        )
+    elif args.cmd == "rebuild_records":
+        rebuild_personal_records(args.db)
     elif args.cmd == "audit":
         security_audit()
     elif args.cmd == "bulk_update_sets":
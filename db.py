@@ -4,14 +4,22 @@ import csv
 import os
 import io
 import datetime
+import time
 import json
 import difflib
+import threading
+import atexit
+import logging
+import weakref
+from collections import OrderedDict
 from contextlib import contextmanager, asynccontextmanager
-from typing import List, Tuple, Optional, Iterable, Set
+from typing import List, Tuple, Optional, Iterable, Iterator, Set
 
 from config import YamlConfig
 from settings_schema import validate_settings
 
+logger = logging.getLogger(__name__)
+
 
 class Database:
     """Provides SQLite connection management and schema initialization."""
@@ -384,9 +392,35 @@ class Database:
                     workout_id INTEGER NOT NULL,
                     timestamp TEXT NOT NULL,
                     heart_rate INTEGER NOT NULL,
+                    samples INTEGER NOT NULL DEFAULT 1,
+                    hr_min INTEGER,
+                    hr_max INTEGER,
+                    FOREIGN KEY(workout_id) REFERENCES workouts(id) ON DELETE CASCADE
+                );""",
+            ["id", "workout_id", "timestamp", "heart_rate", "samples", "hr_min", "hr_max"],
+        ),
+        "heart_rate_rollups": (
+            """CREATE TABLE heart_rate_rollups (
+                    workout_id INTEGER NOT NULL,
+                    minute TEXT NOT NULL,
+                    samples INTEGER NOT NULL,
+                    hr_sum REAL NOT NULL,
+                    hr_min INTEGER NOT NULL,
+                    hr_max INTEGER NOT NULL,
+                    PRIMARY KEY (workout_id, minute),
+                    FOREIGN KEY(workout_id) REFERENCES workouts(id) ON DELETE CASCADE
+                );""",
+            ["workout_id", "minute", "samples", "hr_sum", "hr_min", "hr_max"],
+        ),
+        "heart_rate_histogram": (
+            """CREATE TABLE heart_rate_histogram (
+                    workout_id INTEGER NOT NULL,
+                    heart_rate INTEGER NOT NULL,
+                    samples INTEGER NOT NULL,
+                    PRIMARY KEY (workout_id, heart_rate),
                     FOREIGN KEY(workout_id) REFERENCES workouts(id) ON DELETE CASCADE
                 );""",
-            ["id", "workout_id", "timestamp", "heart_rate"],
+            ["workout_id", "heart_rate", "samples"],
         ),
         "step_count_logs": (
             """CREATE TABLE step_count_logs (
@@ -570,32 +604,191 @@ class Database:
                 );""",
             ["start_date", "end_date", "unit", "avg", "min", "max"],
         ),
+        "stats_result_cache": (
+            """CREATE TABLE stats_result_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    method TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );""",
+            ["cache_key", "method", "payload", "created_at"],
+        ),
+        "personal_records": (
+            """CREATE TABLE personal_records (
+                    set_id INTEGER PRIMARY KEY,
+                    exercise TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    est_1rm REAL NOT NULL
+                );""",
+            ["set_id", "exercise", "date", "est_1rm"],
+        ),
+        "personal_record_dirty": (
+            """CREATE TABLE personal_record_dirty (
+                    exercise TEXT PRIMARY KEY
+                );""",
+            ["exercise"],
+        ),
+        "data_versions": (
+            """CREATE TABLE data_versions (
+                    table_name TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL DEFAULT 0
+                );""",
+            ["table_name", "version"],
+        ),
+    }
+
+    _VERSIONED_TABLES = (
+        "workouts",
+        "exercises",
+        "sets",
+        "exercise_names",
+        "exercise_catalog",
+        "equipment",
+        "muscles",
+        "body_weight_logs",
+        "wellness_logs",
+        "heart_rate_logs",
+        "pyramid_tests",
+        "pyramid_entries",
+        "goals",
+        "settings",
+        "ml_models",
+    )
+
+    # Settings are re-synced from YAML on every read; only real value changes
+    # should count as a new version.
+    _VERSION_UPDATE_CONDITIONS = {"settings": "OLD.value IS NOT NEW.value"}
+
+    _INDEXES = {
+        "idx_pyramid_tests_exercise": "pyramid_tests (exercise_name, date)",
+        "idx_pyramid_entries_test": "pyramid_entries (pyramid_test_id, id)",
+        "idx_personal_records_exercise_1rm": "personal_records (exercise, est_1rm)",
+        "idx_personal_records_exercise_date": "personal_records (exercise, date)",
     }
 
+    _connection_slots: threading.BoundedSemaphore | None = None
+    _slot_holders: dict[int, int] = {}
+    _slot_lock = threading.Lock()
+    # database file -> schema version after initialization
+    _initialized: dict[tuple, int | None] = {}
+
     def __init__(self, db_path: str = "workout.db", db_url: str | None = None) -> None:
         self._db_url = db_url or os.environ.get("DB_URL")
         self._db_path = db_path
+        if self._is_initialized():
+            return
         self._ensure_schema()
+        self._ensure_version_triggers()
+        self._ensure_record_triggers()
         self._import_equipment_data()
         self._import_exercise_catalog_data()
         self._sync_muscles()
         self._sync_exercise_names()
         self._init_settings()
         self._ensure_views()
+        self._ensure_indexes()
         self.vacuum()
+        key = self._init_key()
+        if key is not None:
+            Database._initialized[key] = self._schema_version()
 
-    @contextmanager
-    def _connection(self):
+    def _init_key(self) -> tuple | None:
+        """Identify the database file, ``None`` when it does not exist yet."""
         if self._db_url and self._db_url.startswith("postgresql"):
-            import psycopg2
-            connection = psycopg2.connect(self._db_url)
-        else:
-            connection = sqlite3.connect(self._db_path)
+            return ("url", self._db_url)
+        try:
+            st = os.stat(self._db_path)
+        except OSError:
+            return None
+        return (os.path.realpath(self._db_path), st.st_dev, st.st_ino)
+
+    def _schema_version(self) -> int | None:
+        if self._db_url and self._db_url.startswith("postgresql"):
+            return None
+        with self._connection() as conn:
+            return conn.execute("PRAGMA schema_version;").fetchone()[0]
+
+    def _is_initialized(self) -> bool:
+        """Whether another instance already initialized this database file.
+
+        Schema setup, the CSV imports and VACUUM run once per file and
+        process; later repositories on the same file only compare the
+        schema version, so a replaced or migrated file is set up again.
+        """
+        key = self._init_key()
+        if key is None or key not in Database._initialized:
+            return False
+        return Database._initialized[key] == self._schema_version()
+
+    @classmethod
+    def limit_connections(cls, max_connections: int | None) -> None:
+        """Bound the number of open synchronous connections across all databases.
+
+        The limit counts threads rather than connections: a thread already
+        holding a connection may open nested ones without taking another
+        slot, so code calling repositories inside a transaction cannot
+        deadlock against itself.
+        """
+        if max_connections is not None and max_connections <= 0:
+            raise ValueError("max_connections must be positive")
+        with Database._slot_lock:
+            Database._slot_holders = {}
+            Database._connection_slots = (
+                None
+                if max_connections is None
+                else threading.BoundedSemaphore(max_connections)
+            )
+
+    @classmethod
+    def _acquire_slot(cls) -> tuple[threading.BoundedSemaphore, dict[int, int], int] | None:
+        """Take a connection slot unless the calling thread already holds one."""
+        with Database._slot_lock:
+            slots = Database._connection_slots
+            if slots is None:
+                return None
+            holders = Database._slot_holders
+            owner = threading.get_ident()
+            if holders.get(owner):
+                holders[owner] += 1
+                return slots, holders, owner
+        slots.acquire()
+        with Database._slot_lock:
+            holders[owner] = holders.get(owner, 0) + 1
+        return slots, holders, owner
+
+    @staticmethod
+    def _release_slot(
+        slot: tuple[threading.BoundedSemaphore, dict[int, int], int] | None,
+    ) -> None:
+        if slot is None:
+            return
+        slots, holders, owner = slot
+        with Database._slot_lock:
+            depth = holders.get(owner, 1) - 1
+            if depth:
+                holders[owner] = depth
+                return
+            holders.pop(owner, None)
+        slots.release()
+
+    @contextmanager
+    def _connection(self, check_same_thread: bool = True):
+        slot = Database._acquire_slot()
         try:
-            yield connection
-            connection.commit()
+            if self._db_url and self._db_url.startswith("postgresql"):
+                import psycopg2
+                connection = psycopg2.connect(self._db_url)
+            else:
+                connection = sqlite3.connect(
+                    self._db_path, check_same_thread=check_same_thread
+                )
+            try:
+                yield connection
+                connection.commit()
+            finally:
+                connection.close()
         finally:
-            connection.close()
+            Database._release_slot(slot)
 
     def _ensure_schema(self) -> None:
         with self._connection() as conn:
@@ -607,6 +800,113 @@ class Database:
             if not (self._db_url and self._db_url.startswith("postgresql")):
                 cursor.execute("PRAGMA foreign_keys=on;")
 
+    def _ensure_version_triggers(self) -> None:
+        """Create triggers bumping ``data_versions`` on every table change."""
+        if self._db_url and self._db_url.startswith("postgresql"):
+            return
+        with self._connection() as conn:
+            for table in self._VERSIONED_TABLES:
+                conn.execute(
+                    "INSERT OR IGNORE INTO data_versions (table_name, version) VALUES (?, 0);",
+                    (table,),
+                )
+                for op in ("INSERT", "UPDATE", "DELETE"):
+                    cond = self._VERSION_UPDATE_CONDITIONS.get(table)
+                    when = f"WHEN {cond} " if op == "UPDATE" and cond else ""
+                    conn.execute(
+                        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{op.lower()}_version "
+                        f"AFTER {op} ON {table} {when}BEGIN "
+                        "UPDATE data_versions SET version = version + 1 "
+                        f"WHERE table_name = '{table}'; END;"
+                    )
+
+    # Epley estimate as computed by MathTools.epley_1rm.
+    _EPLEY_SQL = "{p}weight * (1 + 0.0333 * MIN({p}reps, 8))"
+
+    _RECORD_TRIGGERS = {
+        "trg_sets_insert_record": (
+            "AFTER INSERT ON sets BEGIN "
+            "INSERT OR IGNORE INTO personal_record_dirty (exercise) "
+            "SELECT e.name FROM exercises e JOIN workouts w ON w.id = e.workout_id "
+            "WHERE e.id = NEW.exercise_id AND w.date < ("
+            "SELECT MAX(date) FROM personal_records WHERE exercise = e.name); "
+            "INSERT INTO personal_records (set_id, exercise, date, est_1rm) "
+            "SELECT NEW.id, e.name, w.date, " + _EPLEY_SQL.format(p="NEW.") + " "
+            "FROM exercises e JOIN workouts w ON w.id = e.workout_id "
+            "WHERE e.id = NEW.exercise_id "
+            "AND e.name NOT IN (SELECT exercise FROM personal_record_dirty) "
+            "AND " + _EPLEY_SQL.format(p="NEW.") + " > COALESCE(("
+            "SELECT MAX(est_1rm) FROM personal_records WHERE exercise = e.name), -1e308); "
+            "END;"
+        ),
+        "trg_sets_update_record": (
+            "AFTER UPDATE OF reps, weight, exercise_id ON sets "
+            "WHEN OLD.reps IS NOT NEW.reps OR OLD.weight IS NOT NEW.weight "
+            "OR OLD.exercise_id IS NOT NEW.exercise_id BEGIN "
+            "INSERT OR IGNORE INTO personal_record_dirty (exercise) "
+            "SELECT name FROM exercises WHERE id IN (OLD.exercise_id, NEW.exercise_id); "
+            "END;"
+        ),
+        "trg_sets_delete_record": (
+            "AFTER DELETE ON sets BEGIN "
+            "INSERT OR IGNORE INTO personal_record_dirty (exercise) "
+            "SELECT exercise FROM personal_records WHERE set_id = OLD.id; "
+            "DELETE FROM personal_records WHERE set_id = OLD.id; "
+            "END;"
+        ),
+        "trg_exercises_update_record": (
+            "AFTER UPDATE OF name, workout_id ON exercises "
+            "WHEN OLD.name IS NOT NEW.name OR OLD.workout_id IS NOT NEW.workout_id BEGIN "
+            "INSERT OR IGNORE INTO personal_record_dirty (exercise) VALUES (OLD.name); "
+            "INSERT OR IGNORE INTO personal_record_dirty (exercise) VALUES (NEW.name); "
+            "END;"
+        ),
+        "trg_exercises_delete_record": (
+            "AFTER DELETE ON exercises BEGIN "
+            "INSERT OR IGNORE INTO personal_record_dirty (exercise) VALUES (OLD.name); "
+            "END;"
+        ),
+        "trg_workouts_update_record": (
+            "AFTER UPDATE OF date ON workouts WHEN OLD.date IS NOT NEW.date BEGIN "
+            "INSERT OR IGNORE INTO personal_record_dirty (exercise) "
+            "SELECT name FROM exercises WHERE workout_id = NEW.id; "
+            "END;"
+        ),
+        "trg_workouts_delete_record": (
+            "AFTER DELETE ON workouts BEGIN "
+            "INSERT OR IGNORE INTO personal_record_dirty (exercise) "
+            "SELECT name FROM exercises WHERE workout_id = OLD.id; "
+            "END;"
+        ),
+    }
+
+    def _ensure_record_triggers(self) -> None:
+        """Create triggers maintaining the ``personal_records`` index.
+
+        Sets appended after an exercise's latest record are indexed directly.
+        Any other change marks the exercise dirty for
+        :class:`PersonalRecordRepository` to rebuild on its next read.
+        """
+        if self._db_url and self._db_url.startswith("postgresql"):
+            return
+        with self._connection() as conn:
+            existing = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger';"
+                ).fetchall()
+            }
+            missing = [n for n in self._RECORD_TRIGGERS if n not in existing]
+            for name in missing:
+                conn.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {name} {self._RECORD_TRIGGERS[name]}"
+                )
+            if missing:
+                conn.execute(
+                    "INSERT OR IGNORE INTO personal_record_dirty (exercise) "
+                    "SELECT DISTINCT name FROM exercises;"
+                )
+
     def _ensure_views(self) -> None:
         """Create required SQLite views for caching."""
         with self._connection() as conn:
@@ -616,6 +916,12 @@ class Database:
                 "FROM weight_stats_cache;"
             )
 
+    def _ensure_indexes(self) -> None:
+        """Create indexes backing per-exercise lookups."""
+        with self._connection() as conn:
+            for name, target in self._INDEXES.items():
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target};")
+
     def _ensure_table(
         self, conn: sqlite3.Connection, table: str, sql: str, columns: List[str]
     ) -> None:
@@ -663,6 +969,8 @@ class Database:
                         return "'UTC'"
                     if col in ("diff_reps", "diff_weight", "diff_rpe", "warmup"):
                         return "0"
+                    if col == "samples":
+                        return "1"
                     if col == "icon":
                         return "''"
                     return "NULL"
@@ -843,6 +1151,8 @@ class Database:
             "rpe_scale": "10",
             "language": "en",
             "show_help_tips": "0",
+            "heart_rate_retention_days": "0",
+            "prescription_estimator": "full",
         }
         with self._connection() as conn:
             for key, value in defaults.items():
@@ -872,9 +1182,264 @@ class BaseRepository(Database):
             cursor.execute(query, params)
             return cursor.fetchall()
 
+    def iter_all(
+        self,
+        query: str,
+        params: Tuple = (),
+        keys: Tuple[str, ...] = ("id",),
+        *,
+        descending: bool = False,
+        limit: int | None = None,
+        offset: int | None = None,
+        batch_size: int = 500,
+    ) -> Iterator[Tuple]:
+        """Yield rows of ``query`` in keyset-paginated batches of ``batch_size``.
+
+        ``query`` is a ``SELECT`` without ``ORDER BY`` whose ``WHERE`` clause
+        ends with an ``{after}`` marker. Rows are ordered by the non-null SQL
+        expressions ``keys``, the last of which must be unique, and every
+        batch resumes after the previous batch's last key on its own
+        short-lived connection, so a slowly consumed stream holds neither a
+        database lock nor a connection slot between batches.
+        """
+        width = len(keys)
+        columns = ", ".join(keys)
+        direction = "DESC" if descending else "ASC"
+        order = ", ".join(f"{key} {direction}" for key in keys)
+        compare = "<" if descending else ">"
+        select = f"SELECT {columns}, " + query[len("SELECT ") :]
+        last: Tuple | None = None
+        skip = offset
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            args = list(params)
+            after = ""
+            if last is not None:
+                marks = ", ".join("?" for _ in keys)
+                after = f" AND ({columns}) {compare} ({marks})"
+                args.extend(last)
+            page = select.replace("{after}", after) + f" ORDER BY {order} LIMIT ?"
+            args.append(size)
+            if skip:
+                page += " OFFSET ?"
+                args.append(skip)
+                skip = None
+            rows = self.fetch_all(page + ";", tuple(args))
+            for row in rows:
+                yield tuple(row[width:])
+            if len(rows) < size:
+                return
+            if remaining is not None:
+                remaining -= len(rows)
+            last = tuple(rows[-1][:width])
+
     def _delete_all(self, table: str) -> None:
         self.execute(f"DELETE FROM {table};")
 
+    def data_version(self, *tables: str) -> tuple[int, ...]:
+        """Return change counters for ``tables`` in the given order.
+
+        Databases without version triggers return a fresh value on every
+        call so caches keyed on it never serve stale data.
+        """
+        if self._db_url and self._db_url.startswith("postgresql"):
+            return (time.time_ns(),)
+        placeholders = ", ".join(["?" for _ in tables])
+        rows = BaseRepository.fetch_all(
+            self,
+            f"SELECT table_name, version FROM data_versions WHERE table_name IN ({placeholders});",
+            tuple(tables),
+        )
+        versions = dict(rows)
+        return tuple(int(versions.get(t, 0)) for t in tables)
+
+
+class WriteBehindBuffer:
+    """Bounded queue batching repository writes into ``executemany`` calls.
+
+    Rows are flushed on a background timer ``flush_interval`` seconds after
+    the first pending row or as soon as ``max_pending`` rows are queued, on
+    explicit :meth:`flush` and at interpreter shutdown. Rows added with a
+    ``key`` replace any pending row with the same statement and key so
+    repeated upserts are coalesced. Rows stay queued until the transaction
+    writing them commits; a failed background flush is retried with
+    exponential backoff, and once ``capacity`` rows are queued the oldest
+    are dropped and counted in :attr:`dropped`. :meth:`add` never writes.
+    """
+
+    MAX_BACKOFF = 300.0
+
+    _instances: "weakref.WeakSet[WriteBehindBuffer]" = weakref.WeakSet()
+
+    def __init__(
+        self,
+        repo: BaseRepository,
+        max_pending: int = 256,
+        flush_interval: float = 2.0,
+        capacity: int | None = None,
+    ) -> None:
+        if max_pending <= 0:
+            raise ValueError("max_pending must be positive")
+        self.repo = repo
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.capacity = max(capacity or 4 * max_pending, max_pending)
+        self.dropped = 0
+        self._rows: "OrderedDict[tuple[str, object], Tuple]" = OrderedDict()
+        self._seq = 0
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._backoff = 0.0
+        WriteBehindBuffer._instances.add(self)
+
+    def add(self, query: str, params: Tuple, key: object = None) -> None:
+        """Queue ``params`` for ``query`` and schedule a background flush."""
+        with self._lock:
+            if key is None:
+                self._seq += 1
+                key = ("_seq", self._seq)
+            self._rows[(query, key)] = params
+            while len(self._rows) > self.capacity:
+                self._rows.popitem(last=False)
+                self.dropped += 1
+            if not self._backoff:
+                self._arm()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._rows)
+
+    def _arm(self) -> None:
+        if len(self._rows) >= self.max_pending:
+            self._schedule(0.0)
+        elif self._rows and self.flush_interval > 0:
+            self._schedule(self.flush_interval)
+
+    def _schedule(self, delay: float) -> None:
+        """Arm the flush timer unless one fires sooner; caller holds the lock."""
+        timer = self._timer
+        if timer is not None:
+            if delay >= timer.interval:
+                return
+            timer.cancel()
+        self._timer = threading.Timer(delay, self._timed_flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self) -> bool:
+        """Write the queued rows in a single transaction.
+
+        Returns ``False`` without discarding anything when the database file
+        does not exist. Rows queued or replaced while the write runs stay
+        pending for the next flush.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                snapshot = list(self._rows.items())
+            if not snapshot:
+                return True
+            if not self.repo._db_url and not os.path.exists(self.repo._db_path):
+                return False
+            batches: dict[str, list[Tuple]] = {}
+            for (query, _key), params in snapshot:
+                batches.setdefault(query, []).append(params)
+            with self.repo._connection() as conn:
+                cursor = conn.cursor()
+                for query, rows in batches.items():
+                    cursor.executemany(query, rows)
+            with self._lock:
+                for item, params in snapshot:
+                    if self._rows.get(item) is params:
+                        del self._rows[item]
+                self._backoff = 0.0
+            return True
+
+    def _timed_flush(self) -> None:
+        try:
+            written = self.flush()
+        except Exception:
+            written = False
+            logger.exception(
+                "Write-behind flush failed; keeping %d pending rows (%d dropped)",
+                self.pending(),
+                self.dropped,
+            )
+        with self._lock:
+            if written:
+                self._arm()
+                return
+            self._backoff = min(
+                max(self._backoff * 2, self.flush_interval, 1.0), self.MAX_BACKOFF
+            )
+            self._schedule(self._backoff)
+
+    def close(self) -> None:
+        """Flush queued rows and stop tracking this buffer for shutdown."""
+        WriteBehindBuffer._instances.discard(self)
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+
+    @classmethod
+    def flush_all(cls) -> None:
+        """Flush every live buffer, used at interpreter shutdown."""
+        for buf in list(cls._instances):
+            try:
+                buf.flush()
+            except Exception:
+                logger.exception(
+                    "Write-behind flush failed at shutdown; %d rows lost",
+                    buf.pending(),
+                )
+
+
+atexit.register(WriteBehindBuffer.flush_all)
+
+
+class BufferedRepository(BaseRepository):
+    """Repository whose telemetry writes may be deferred to a write-behind buffer."""
+
+    def __init__(
+        self,
+        db_path: str = "workout.db",
+        *,
+        buffered: bool = False,
+        max_pending: int = 256,
+        flush_interval: float = 2.0,
+    ) -> None:
+        super().__init__(db_path)
+        self.buffer = (
+            WriteBehindBuffer(self, max_pending, flush_interval) if buffered else None
+        )
+
+    def _write(self, query: str, params: Tuple, key: object = None) -> int | None:
+        """Execute ``query`` now or queue it when buffering is enabled."""
+        if self.buffer is None:
+            return self.execute(query, params)
+        self.buffer.add(query, params, key)
+        return None
+
+    def flush(self) -> None:
+        if self.buffer is not None:
+            self.buffer.flush()
+
+    def close(self) -> None:
+        if self.buffer is not None:
+            self.buffer.close()
+
+    def fetch_all(self, query: str, params: Tuple = ()) -> List[Tuple]:
+        self.flush()
+        return super().fetch_all(query, params)
+
 
 class AsyncDatabase(Database):
     """Provides asynchronous connection management."""
@@ -1189,30 +1754,109 @@ class WorkoutRepository(BaseRepository):
             Optional[int],
         ]
     ]:
+        query, params = self._workouts_query(
+            start_date, end_date, start_time, end_time, sort_by, descending, limit, offset
+        )
+        return self.fetch_all(query, params)
+
+    def iter_workouts(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        sort_by: str = "id",
+        descending: bool = True,
+        limit: int | None = None,
+        offset: int | None = None,
+        summary: bool = False,
+    ) -> Iterator[Tuple]:
+        """Stream the rows of :meth:`fetch_all_workouts` page by page.
+
+        With ``summary`` each row also carries the workout's total volume,
+        set count and RPE sum, aggregated in the same query.
+        """
+        query, params = self._workouts_select(
+            start_date, end_date, start_time, end_time, summary, "{after}"
+        )
+        if sort_by not in self._WORKOUT_SORT_KEYS:
+            sort_by = "id"
+        return self.iter_all(
+            query,
+            params,
+            self._WORKOUT_SORT_KEYS[sort_by],
+            descending=descending,
+            limit=limit,
+            offset=offset,
+        )
+
+    _WORKOUT_SORT_KEYS = {
+        "id": ("w.id",),
+        "date": ("w.date", "w.id"),
+        "start_time": ("COALESCE(w.start_time, '')", "w.id"),
+        "end_time": ("COALESCE(w.end_time, '')", "w.id"),
+        "training_type": ("w.training_type", "w.id"),
+        "rating": ("COALESCE(w.rating, -1)", "w.id"),
+    }
+
+    @staticmethod
+    def _workouts_select(
+        start_date: Optional[str],
+        end_date: Optional[str],
+        start_time: Optional[str],
+        end_time: Optional[str],
+        summary: bool = False,
+        after: str = "",
+    ) -> Tuple[str, list]:
         query = (
-            "SELECT id, date, name, start_time, end_time, timezone, training_type, notes, location, icon, rating, mood_before, mood_after FROM workouts"
+            "SELECT w.id, w.date, w.name, w.start_time, w.end_time, w.timezone, w.training_type, w.notes, w.location, w.icon, w.rating, w.mood_before, w.mood_after"
         )
+        if summary:
+            query += (
+                ", TOTAL(s.reps * s.weight), COUNT(s.id), TOTAL(s.rpe) FROM workouts w"
+                " LEFT JOIN exercises e ON e.workout_id = w.id"
+                " LEFT JOIN sets s ON s.exercise_id = e.id"
+            )
+        else:
+            query += " FROM workouts w"
         params: list[str | int] = []
         where_clauses: list[str] = []
         if start_date:
-            where_clauses.append("date >= ?")
+            where_clauses.append("w.date >= ?")
             params.append(start_date)
         if end_date:
-            where_clauses.append("date <= ?")
+            where_clauses.append("w.date <= ?")
             params.append(end_date)
         if start_time:
-            where_clauses.append("start_time >= ?")
+            where_clauses.append("w.start_time >= ?")
             params.append(start_time)
         if end_time:
-            where_clauses.append("end_time <= ?")
+            where_clauses.append("w.end_time <= ?")
             params.append(end_time)
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
+        if where_clauses or after:
+            query += " WHERE " + " AND ".join(where_clauses or ["1=1"]) + after
+        if summary:
+            query += " GROUP BY w.id"
+        return query, params
+
+    @classmethod
+    def _workouts_query(
+        cls,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        start_time: Optional[str],
+        end_time: Optional[str],
+        sort_by: str,
+        descending: bool,
+        limit: int | None,
+        offset: int | None,
+    ) -> Tuple[str, Tuple]:
+        query, params = cls._workouts_select(start_date, end_date, start_time, end_time)
         allowed = {"id", "date", "start_time", "end_time", "training_type", "rating"}
         if sort_by not in allowed:
             sort_by = "id"
         order = "DESC" if descending else "ASC"
-        query += f" ORDER BY {sort_by} {order}"
+        query += f" ORDER BY w.{sort_by} {order}"
         if limit is not None:
             query += " LIMIT ?"
             params.append(limit)
@@ -1222,7 +1866,7 @@ class WorkoutRepository(BaseRepository):
             query += " OFFSET ?"
             params.append(offset)
         query += ";"
-        return self.fetch_all(query, tuple(params))
+        return query, tuple(params)
 
     def set_start_time(self, workout_id: int, timestamp: str) -> None:
         self.execute(
@@ -1327,6 +1971,19 @@ class WorkoutRepository(BaseRepository):
             raise ValueError("workout not found")
         return rows[0]
 
+    def fetch_details(self, workout_ids: Iterable[int]) -> dict[int, Tuple]:
+        """Return :meth:`fetch_detail` rows for ``workout_ids`` keyed by id."""
+        ids = sorted(set(workout_ids))
+        if not ids:
+            return {}
+        placeholders = ", ".join(["?" for _ in ids])
+        rows = self.fetch_all(
+            "SELECT id, date, name, start_time, end_time, timezone, training_type, notes, location, icon, rating, mood_before, mood_after "
+            f"FROM workouts WHERE id IN ({placeholders});",
+            tuple(ids),
+        )
+        return {row[0]: row for row in rows}
+
     def set_note(self, workout_id: int, note: str | None) -> None:
         self.execute(
             "UPDATE workouts SET notes = ? WHERE id = ?;",
@@ -1763,6 +2420,137 @@ class SetRepository(BaseRepository):
         with_workout_id: bool = False,
         with_location: bool = False,
     ) -> List[Tuple]:
+        query, params = self._history_query(
+            names,
+            start_date,
+            end_date,
+            equipment,
+            with_equipment,
+            with_duration,
+            with_workout_id,
+            with_location,
+        )
+        return self.fetch_all(query, params)
+
+    def iter_history_by_names(
+        self,
+        names: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        equipment: Optional[List[str]] = None,
+        with_equipment: bool = False,
+        with_duration: bool = False,
+        with_workout_id: bool = False,
+        with_location: bool = False,
+    ) -> Iterator[Tuple]:
+        """Stream the rows of :meth:`fetch_history_by_names` page by page."""
+        query, params = self._history_query(
+            names,
+            start_date,
+            end_date,
+            equipment,
+            with_equipment,
+            with_duration,
+            with_workout_id,
+            with_location,
+            "{after}",
+        )
+        return self.iter_all(query, params, ("w.date", "s.id"))
+
+    _FINGERPRINT_COLUMNS = (
+        "COUNT(*), MAX(s.id), TOTAL(s.reps), TOTAL(s.weight), TOTAL(s.rpe),"
+        " MAX(w.date), COUNT(s.start_time), COUNT(s.end_time),"
+        " MAX(COALESCE(s.start_time, '')), MAX(COALESCE(s.end_time, '')),"
+        " TOTAL(s.id * s.exercise_id), TOTAL(s.id * s.reps),"
+        " TOTAL(s.id * s.weight), TOTAL(s.id * s.rpe),"
+        " TOTAL(s.id * julianday(s.start_time)), TOTAL(s.id * julianday(s.end_time))"
+    )
+    _FINGERPRINT_MAX = frozenset({1, 5, 8, 9})
+    _FINGERPRINT_EMPTY = (0, None, 0.0, 0.0, 0.0, None, 0, 0, None, None) + (0.0,) * 6
+
+    def history_fingerprint(self, names: List[str]) -> Tuple:
+        """Return a cheap summary that changes whenever the history of ``names`` does.
+
+        The set count and last set id capture new and deleted sets; the
+        plain sums and latest timestamps capture edits of existing ones,
+        and the sums weighted by set id catch values swapped between sets
+        or sets moved to another exercise.
+        """
+        placeholders = ", ".join(["?" for _ in names])
+        rows = self.fetch_all(
+            f"SELECT {self._FINGERPRINT_COLUMNS} FROM sets s "
+            "JOIN exercises e ON s.exercise_id = e.id "
+            "JOIN workouts w ON e.workout_id = w.id "
+            f"WHERE e.name IN ({placeholders});",
+            tuple(names),
+        )
+        return tuple(rows[0])
+
+    def fetch_histories_by_names(
+        self, groups: dict[str, List[str]]
+    ) -> dict[str, List[Tuple]]:
+        """Return the prescription history of several alias groups in one query.
+
+        Rows match :meth:`fetch_history_by_names` with ``with_duration`` and
+        ``with_workout_id`` and keep its order within every group.
+        """
+        names = sorted({n for aliases in groups.values() for n in aliases})
+        result: dict[str, List[Tuple]] = {key: [] for key in groups}
+        if not names:
+            return result
+        query, params = self._history_query(
+            names, None, None, None, True, True, True, False
+        )
+        members: dict[str, List[str]] = {}
+        for key, aliases in groups.items():
+            for name in set(aliases):
+                members.setdefault(name, []).append(key)
+        for reps, weight, rpe, date, name, _eq, start, end, wid in self.fetch_all(
+            query, params
+        ):
+            row = (reps, weight, rpe, date, start, end, wid)
+            for key in members.get(name, ()):
+                result[key].append(row)
+        return result
+
+    def history_fingerprints(self, groups: dict[str, List[str]]) -> dict[str, Tuple]:
+        """Return :meth:`history_fingerprint` for several alias groups in one query."""
+        names = sorted({n for aliases in groups.values() for n in aliases})
+        per_name: dict[str, Tuple] = {}
+        if names:
+            placeholders = ", ".join(["?" for _ in names])
+            rows = self.fetch_all(
+                f"SELECT e.name, {self._FINGERPRINT_COLUMNS} FROM sets s "
+                "JOIN exercises e ON s.exercise_id = e.id "
+                "JOIN workouts w ON e.workout_id = w.id "
+                f"WHERE e.name IN ({placeholders}) GROUP BY e.name;",
+                tuple(names),
+            )
+            per_name = {row[0]: row[1:] for row in rows}
+        result: dict[str, Tuple] = {}
+        for key, aliases in groups.items():
+            parts = [per_name[n] for n in set(aliases) if n in per_name]
+            if not parts:
+                result[key] = self._FINGERPRINT_EMPTY
+                continue
+            result[key] = tuple(
+                max(column) if i in self._FINGERPRINT_MAX else sum(column)
+                for i, column in enumerate(zip(*parts))
+            )
+        return result
+
+    @staticmethod
+    def _history_query(
+        names: List[str],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        equipment: Optional[List[str]],
+        with_equipment: bool,
+        with_duration: bool,
+        with_workout_id: bool,
+        with_location: bool,
+        after: str | None = None,
+    ) -> Tuple[str, Tuple]:
         placeholders = ", ".join(["?" for _ in names])
         select = "SELECT s.reps, s.weight, s.rpe, w.date"
         if with_equipment:
@@ -1790,8 +2578,8 @@ class SetRepository(BaseRepository):
         if end_date:
             query += " AND w.date <= ?"
             params.append(end_date)
-        query += " ORDER BY w.date, s.id;"
-        return self.fetch_all(query, tuple(params))
+        query += " ORDER BY w.date, s.id;" if after is None else after
+        return query, tuple(params)
 
     def fetch_for_workout(
         self, workout_id: int
@@ -2632,17 +3420,55 @@ class PlannedSetRepository(BaseRepository):
         super().__init__(db_path)
         self.settings = settings
 
-    def add(self, exercise_id: int, reps: int, weight: float, rpe: int) -> int:
+    def _check_rpe(self, rpe: int) -> None:
         max_rpe = 10
         if self.settings is not None:
             max_rpe = self.settings.get_int("rpe_scale", 10)
         if rpe < 0 or rpe > max_rpe:
             raise ValueError(f"rpe must be between 0 and {max_rpe}")
+
+    def add(self, exercise_id: int, reps: int, weight: float, rpe: int) -> int:
+        self._check_rpe(rpe)
         return self.execute(
             "INSERT INTO planned_sets (planned_exercise_id, reps, weight, rpe) VALUES (?, ?, ?, ?);",
             (exercise_id, reps, weight, rpe),
         )
 
+    def create_plan(
+        self,
+        date: str,
+        training_type: str,
+        exercises: Iterable[tuple[str, Optional[str], list[tuple[int, float, int]]]],
+    ) -> int:
+        """Insert a planned workout with its exercises and sets in one transaction.
+
+        ``exercises`` holds ``(name, equipment, [(reps, weight, rpe), ...])``.
+        Nothing is written when a set fails validation.
+        """
+        items = [(name, equipment, list(sets)) for name, equipment, sets in exercises]
+        for _name, _equipment, sets in items:
+            for _reps, _weight, rpe in sets:
+                self._check_rpe(rpe)
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO planned_workouts (date, training_type, position) "
+                "SELECT ?, ?, COALESCE(MAX(position), 0) + 1 FROM planned_workouts;",
+                (date, training_type),
+            )
+            plan_id = cursor.lastrowid
+            for name, equipment, sets in items:
+                cursor.execute(
+                    "INSERT INTO planned_exercises (planned_workout_id, name, equipment_name) VALUES (?, ?, ?);",
+                    (plan_id, name, equipment),
+                )
+                exercise_id = cursor.lastrowid
+                cursor.executemany(
+                    "INSERT INTO planned_sets (planned_exercise_id, reps, weight, rpe) VALUES (?, ?, ?, ?);",
+                    [(exercise_id, *row) for row in sets],
+                )
+        return plan_id
+
     def remove(self, set_id: int) -> None:
         self.execute("DELETE FROM planned_sets WHERE id = ?;", (set_id,))
 
@@ -3090,6 +3916,10 @@ class SettingsRepository(BaseRepository):
     def _sync_to_yaml(self) -> None:
         self._yaml.save(self._raw_all_settings())
 
+    def refresh(self) -> None:
+        """Pull external edits of the YAML file into the database."""
+        self._sync_from_yaml()
+
     def get_float(self, key: str, default: float) -> float:
         self._sync_from_yaml()
         rows = self.fetch_all("SELECT value FROM settings WHERE key = ?;", (key,))
@@ -3818,6 +4648,61 @@ class PyramidTestRepository(BaseRepository):
             result.append(tuple(row) + (weights,))
         return result
 
+    def fetch_full_for_exercise(self, exercise_name: str | None = None) -> List[Tuple]:
+        """Return :meth:`fetch_full_with_weights` rows for one exercise.
+
+        Tests and their entries are read with two indexed queries; ``None``
+        returns every test.
+        """
+        where = " WHERE exercise_name = ?" if exercise_name is not None else ""
+        params = (exercise_name,) if exercise_name is not None else ()
+        tests = super().fetch_all(
+            "SELECT id, exercise_name, date, equipment_name, starting_weight, failed_weight, max_achieved, test_duration_minutes, rest_between_attempts, rpe_per_attempt, time_of_day, sleep_hours, stress_level, nutrition_quality "
+            f"FROM pyramid_tests{where} ORDER BY id DESC;",
+            params,
+        )
+        entries = super().fetch_all(
+            "SELECT e.pyramid_test_id, e.weight FROM pyramid_entries e "
+            "JOIN pyramid_tests t ON t.id = e.pyramid_test_id"
+            f"{where.replace('exercise_name', 't.exercise_name')} ORDER BY e.id;",
+            params,
+        )
+        weights: dict[int, List[float]] = {}
+        for tid, weight in entries:
+            weights.setdefault(tid, []).append(float(weight))
+        return [tuple(row) + (weights.get(row[0], []),) for row in tests]
+
+
+class PyramidTestLoader:
+    """Per-exercise pyramid test rows for the prescription engine.
+
+    Rows are cached per exercise on the pyramid tables' data version, so
+    repeated prescriptions read them once until a test is logged.
+    """
+
+    TABLES = ("pyramid_tests", "pyramid_entries")
+
+    def __init__(self, tests: PyramidTestRepository, max_entries: int = 64) -> None:
+        self.tests = tests
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str | None, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, exercise_name: str | None = None) -> List[Tuple]:
+        version = self.tests.data_version(*self.TABLES)
+        with self._lock:
+            cached = self._entries.get(exercise_name)
+            if cached is not None and cached[0] == version:
+                self._entries.move_to_end(exercise_name)
+                return cached[1]
+        rows = self.tests.fetch_full_for_exercise(exercise_name)
+        with self._lock:
+            self._entries[exercise_name] = (version, rows)
+            self._entries.move_to_end(exercise_name)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return rows
+
 
 class PyramidEntryRepository(BaseRepository):
     """Repository for pyramid test entries."""
@@ -3919,11 +4804,12 @@ class MLModelRepository(BaseRepository):
         return rows[0][0] if rows else None
 
 
-class MLLogRepository(BaseRepository):
+class MLLogRepository(BufferedRepository):
     """Repository for logging model predictions and confidence."""
 
-    def add(self, name: str, prediction: float, confidence: float) -> int:
-        return self.execute(
+    def add(self, name: str, prediction: float, confidence: float) -> int | None:
+        """Log a prediction. Returns ``None`` when the row is buffered."""
+        return self._write(
             "INSERT INTO ml_logs (name, timestamp, prediction, confidence) VALUES (?, ?, ?, ?);",
             (name, datetime.datetime.now().isoformat(), prediction, confidence),
         )
@@ -3970,6 +4856,12 @@ class BodyWeightRepository(BaseRepository):
     def fetch_history(
         self, start_date: Optional[str] = None, end_date: Optional[str] = None
     ) -> list[tuple[int, str, float]]:
+        return list(self.iter_history(start_date, end_date))
+
+    def iter_history(
+        self, start_date: Optional[str] = None, end_date: Optional[str] = None
+    ) -> Iterator[tuple[int, str, float]]:
+        """Stream body weight logs ordered by date."""
         query = "SELECT id, date, weight FROM body_weight_logs WHERE 1=1"
         params: list[str] = []
         if start_date:
@@ -3978,9 +4870,9 @@ class BodyWeightRepository(BaseRepository):
         if end_date:
             query += " AND date <= ?"
             params.append(end_date)
-        query += " ORDER BY date;"
-        rows = self.fetch_all(query, tuple(params))
-        return [(int(r[0]), r[1], float(r[2])) for r in rows]
+        query += "{after}"
+        for r in self.iter_all(query, tuple(params), ("date", "id")):
+            yield (int(r[0]), r[1], float(r[2]))
 
     def update(self, entry_id: int, date: str, weight: float) -> None:
         if weight <= 0:
@@ -4152,19 +5044,161 @@ class WellnessRepository(BaseRepository):
 
 
 class HeartRateRepository(BaseRepository):
-    """Repository for logging heart rate during workouts."""
+    """Repository for logging heart rate during workouts.
+
+    Raw samples are mirrored into per-minute rollups and a per-workout
+    histogram on every write so summaries never need to scan raw rows.
+    Downsampled rows keep the sample count, minimum and maximum of the
+    minute they replace, so minute rollups rebuild losslessly; the
+    histogram of a downsampled workout cannot be recovered from its rows
+    and is only adjusted for edits of raw samples.
+    """
+
+    _ROLLUP_MINUTE_SQL = (
+        "INSERT INTO heart_rate_rollups (workout_id, minute, samples, hr_sum, hr_min, hr_max) "
+        "VALUES (?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(workout_id, minute) DO UPDATE SET "
+        "samples = samples + excluded.samples, hr_sum = hr_sum + excluded.hr_sum, "
+        "hr_min = MIN(hr_min, excluded.hr_min), hr_max = MAX(hr_max, excluded.hr_max);"
+    )
+    _ROLLUP_HISTOGRAM_SQL = (
+        "INSERT INTO heart_rate_histogram (workout_id, heart_rate, samples) VALUES (?, ?, ?) "
+        "ON CONFLICT(workout_id, heart_rate) DO UPDATE SET samples = samples + excluded.samples;"
+    )
 
-    def log(self, workout_id: int, timestamp: str, heart_rate: int) -> int:
-        return self.execute(
-            "INSERT INTO heart_rate_logs (workout_id, timestamp, heart_rate) VALUES (?, ?, ?);",
-            (workout_id, timestamp, heart_rate),
+    def __init__(self, db_path: str = "workout.db") -> None:
+        super().__init__(db_path)
+        self._backfill_rollups()
+
+    @staticmethod
+    def _minute(timestamp: str) -> str:
+        return timestamp[:16]
+
+    def _add_rollups(
+        self, conn: sqlite3.Connection, workout_id: int, entries: list[tuple[str, int]]
+    ) -> None:
+        minutes: dict[str, list[float]] = {}
+        counts: dict[int, int] = {}
+        for ts, hr in entries:
+            item = minutes.setdefault(self._minute(ts), [0, 0.0, hr, hr])
+            item[0] += 1
+            item[1] += hr
+            item[2] = min(item[2], hr)
+            item[3] = max(item[3], hr)
+            counts[hr] = counts.get(hr, 0) + 1
+        conn.executemany(
+            self._ROLLUP_MINUTE_SQL,
+            [(workout_id, m, *vals) for m, vals in minutes.items()],
+        )
+        conn.executemany(
+            self._ROLLUP_HISTOGRAM_SQL,
+            [(workout_id, hr, n) for hr, n in counts.items()],
+        )
+
+    _ROLLUP_REBUILD_SQL = (
+        "INSERT INTO heart_rate_rollups (workout_id, minute, samples, hr_sum, hr_min, hr_max) "
+        "SELECT workout_id, substr(timestamp, 1, 16), SUM(samples), SUM(heart_rate * samples), "
+        "MIN(COALESCE(hr_min, heart_rate)), MAX(COALESCE(hr_max, heart_rate)) "
+        "FROM heart_rate_logs WHERE workout_id = ?{minutes} "
+        "GROUP BY workout_id, substr(timestamp, 1, 16);"
+    )
+
+    def _rebuild_minutes(
+        self, conn: sqlite3.Connection, workout_id: int, minutes: set[str]
+    ) -> None:
+        """Recompute the minute rollups of ``minutes`` from the stored rows."""
+        marks = ", ".join("?" for _ in minutes)
+        conn.execute(
+            f"DELETE FROM heart_rate_rollups WHERE workout_id = ? AND minute IN ({marks});",
+            (workout_id, *minutes),
+        )
+        conn.execute(
+            self._ROLLUP_REBUILD_SQL.replace(
+                "{minutes}", f" AND substr(timestamp, 1, 16) IN ({marks})"
+            ),
+            (workout_id, *minutes),
+        )
+
+    def _shift_histogram(
+        self, conn: sqlite3.Connection, workout_id: int, heart_rate: int, delta: int
+    ) -> None:
+        conn.execute(self._ROLLUP_HISTOGRAM_SQL, (workout_id, heart_rate, delta))
+        conn.execute(
+            "DELETE FROM heart_rate_histogram WHERE workout_id = ? AND heart_rate = ? AND samples <= 0;",
+            (workout_id, heart_rate),
+        )
+
+    def _rebuild_workout(self, conn: sqlite3.Connection, workout_id: int) -> None:
+        conn.execute("DELETE FROM heart_rate_rollups WHERE workout_id = ?;", (workout_id,))
+        conn.execute(self._ROLLUP_REBUILD_SQL.replace("{minutes}", ""), (workout_id,))
+        downsampled = conn.execute(
+            "SELECT EXISTS(SELECT 1 FROM heart_rate_logs WHERE workout_id = ? AND samples > 1) "
+            "AND EXISTS(SELECT 1 FROM heart_rate_histogram WHERE workout_id = ?);",
+            (workout_id, workout_id),
+        ).fetchone()[0]
+        if downsampled:
+            return
+        conn.execute("DELETE FROM heart_rate_histogram WHERE workout_id = ?;", (workout_id,))
+        conn.execute(
+            "INSERT INTO heart_rate_histogram (workout_id, heart_rate, samples) "
+            "SELECT workout_id, heart_rate, SUM(samples) FROM heart_rate_logs "
+            "WHERE workout_id = ? GROUP BY workout_id, heart_rate;",
+            (workout_id,),
         )
 
+    def _backfill_rollups(self) -> None:
+        """Build rollups for workouts logged before rollups existed."""
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT workout_id FROM heart_rate_logs "
+                "WHERE workout_id NOT IN (SELECT workout_id FROM heart_rate_histogram);"
+            ).fetchall()
+            for (wid,) in rows:
+                self._rebuild_workout(conn, int(wid))
+
+    def rebuild_rollups(self, workout_id: int | None = None) -> None:
+        """Recompute rollups from stored samples for one or all workouts.
+
+        Histograms of downsampled workouts are kept as they are.
+        """
+        with self._connection() as conn:
+            if workout_id is not None:
+                ids = [workout_id]
+            else:
+                for table in ("heart_rate_rollups", "heart_rate_histogram"):
+                    conn.execute(
+                        f"DELETE FROM {table} WHERE workout_id NOT IN "
+                        "(SELECT workout_id FROM heart_rate_logs);"
+                    )
+                ids = [
+                    int(r[0])
+                    for r in conn.execute(
+                        "SELECT DISTINCT workout_id FROM heart_rate_logs;"
+                    ).fetchall()
+                ]
+            for wid in ids:
+                self._rebuild_workout(conn, wid)
+
+    def log(self, workout_id: int, timestamp: str, heart_rate: int) -> int:
+        with self._connection() as conn:
+            cur = conn.execute(
+                "INSERT INTO heart_rate_logs (workout_id, timestamp, heart_rate) VALUES (?, ?, ?);",
+                (workout_id, timestamp, heart_rate),
+            )
+            self._add_rollups(conn, workout_id, [(timestamp, heart_rate)])
+            return cur.lastrowid
+
     def bulk_log(self, workout_id: int, entries: list[tuple[str, int]]) -> list[int]:
         """Insert multiple heart rate entries and return their ids."""
         ids: list[int] = []
-        for ts, hr in entries:
-            ids.append(self.log(workout_id, ts, hr))
+        with self._connection() as conn:
+            for ts, hr in entries:
+                cur = conn.execute(
+                    "INSERT INTO heart_rate_logs (workout_id, timestamp, heart_rate) VALUES (?, ?, ?);",
+                    (workout_id, ts, hr),
+                )
+                ids.append(cur.lastrowid)
+            self._add_rollups(conn, workout_id, list(entries))
         return ids
 
     def fetch_for_workout(self, workout_id: int) -> list[tuple[int, str, int]]:
@@ -4175,6 +5209,12 @@ class HeartRateRepository(BaseRepository):
         return [(int(r[0]), r[1], int(r[2])) for r in rows]
 
     def fetch_range(self, start_date: str | None = None, end_date: str | None = None) -> list[tuple[int, int, str, int]]:
+        return list(self.iter_range(start_date, end_date))
+
+    def iter_range(
+        self, start_date: str | None = None, end_date: str | None = None
+    ) -> Iterator[tuple[int, int, str, int]]:
+        """Stream heart rate logs ordered by timestamp."""
         query = (
             "SELECT hr.id, hr.workout_id, hr.timestamp, hr.heart_rate FROM heart_rate_logs hr JOIN workouts w ON hr.workout_id = w.id WHERE 1=1"
         )
@@ -4185,30 +5225,146 @@ class HeartRateRepository(BaseRepository):
         if end_date:
             query += " AND w.date <= ?"
             params.append(end_date)
-        query += " ORDER BY timestamp;"
-        rows = self.fetch_all(query, tuple(params))
-        return [(int(r[0]), int(r[1]), r[2], int(r[3])) for r in rows]
+        query += "{after}"
+        for r in self.iter_all(query, tuple(params), ("hr.timestamp", "hr.id")):
+            yield (int(r[0]), int(r[1]), r[2], int(r[3]))
 
-    def update(self, entry_id: int, timestamp: str, heart_rate: int) -> None:
+    @staticmethod
+    def _date_filter(start_date: str | None, end_date: str | None) -> tuple[str, list[str]]:
+        clause = ""
+        params: list[str] = []
+        if start_date:
+            clause += " AND w.date >= ?"
+            params.append(start_date)
+        if end_date:
+            clause += " AND w.date <= ?"
+            params.append(end_date)
+        return clause, params
+
+    def fetch_histogram(
+        self, start_date: str | None = None, end_date: str | None = None
+    ) -> list[tuple[int, int]]:
+        """Return ``(heart_rate, samples)`` pairs aggregated over the range."""
+        clause, params = self._date_filter(start_date, end_date)
         rows = self.fetch_all(
-            "SELECT id FROM heart_rate_logs WHERE id = ?;",
-            (entry_id,),
+            "SELECT h.heart_rate, SUM(h.samples) FROM heart_rate_histogram h "
+            "JOIN workouts w ON h.workout_id = w.id WHERE 1=1"
+            + clause
+            + " GROUP BY h.heart_rate ORDER BY h.heart_rate;",
+            tuple(params),
         )
-        if not rows:
-            raise ValueError("log not found")
-        self.execute(
-            "UPDATE heart_rate_logs SET timestamp = ?, heart_rate = ? WHERE id = ?;",
-            (timestamp, heart_rate, entry_id),
+        return [(int(r[0]), int(r[1])) for r in rows]
+
+    def fetch_minute_rollups(
+        self, start_date: str | None = None, end_date: str | None = None
+    ) -> list[tuple[int, str, int, float, int, int]]:
+        """Return per-minute ``(workout_id, minute, samples, mean, min, max)`` rows."""
+        clause, params = self._date_filter(start_date, end_date)
+        rows = self.fetch_all(
+            "SELECT r.workout_id, r.minute, r.samples, r.hr_sum, r.hr_min, r.hr_max "
+            "FROM heart_rate_rollups r JOIN workouts w ON r.workout_id = w.id WHERE 1=1"
+            + clause
+            + " ORDER BY r.minute;",
+            tuple(params),
         )
+        return [
+            (int(r[0]), r[1], int(r[2]), float(r[3]) / int(r[2]), int(r[4]), int(r[5]))
+            for r in rows
+        ]
 
-    def delete(self, entry_id: int) -> None:
+    def fetch_workout_rollups(
+        self, start_date: str | None = None, end_date: str | None = None
+    ) -> list[tuple[int, int, float, int, int]]:
+        """Return per-workout ``(workout_id, samples, mean, min, max)`` rows."""
+        clause, params = self._date_filter(start_date, end_date)
         rows = self.fetch_all(
-            "SELECT id FROM heart_rate_logs WHERE id = ?;",
-            (entry_id,),
+            "SELECT h.workout_id, SUM(h.samples), SUM(h.heart_rate * h.samples), "
+            "MIN(h.heart_rate), MAX(h.heart_rate) FROM heart_rate_histogram h "
+            "JOIN workouts w ON h.workout_id = w.id WHERE 1=1"
+            + clause
+            + " GROUP BY h.workout_id ORDER BY h.workout_id;",
+            tuple(params),
         )
-        if not rows:
+        return [
+            (int(r[0]), int(r[1]), float(r[2]) / int(r[1]), int(r[3]), int(r[4]))
+            for r in rows
+        ]
+
+    def downsample_before(self, cutoff_date: str) -> int:
+        """Collapse raw samples of workouts before ``cutoff_date`` to one per minute.
+
+        Rollups are left untouched so summaries keep full resolution, and
+        each collapsed row records its minute's minimum and maximum so later
+        rebuilds of the minute rollups stay lossless.
+        Returns the number of raw rows removed.
+        """
+        with self._connection() as conn:
+            groups = conn.execute(
+                "SELECT hr.workout_id, substr(hr.timestamp, 1, 16), COUNT(*), "
+                "SUM(hr.heart_rate * hr.samples), SUM(hr.samples), MIN(hr.timestamp), "
+                "MIN(COALESCE(hr.hr_min, hr.heart_rate)), MAX(COALESCE(hr.hr_max, hr.heart_rate)) "
+                "FROM heart_rate_logs hr JOIN workouts w ON hr.workout_id = w.id "
+                "WHERE w.date < ? GROUP BY hr.workout_id, substr(hr.timestamp, 1, 16) "
+                "HAVING COUNT(*) > 1;",
+                (cutoff_date,),
+            ).fetchall()
+            removed = 0
+            for wid, minute, count, hr_total, samples, first_ts, low, high in groups:
+                conn.execute(
+                    "DELETE FROM heart_rate_logs WHERE workout_id = ? AND substr(timestamp, 1, 16) = ?;",
+                    (wid, minute),
+                )
+                conn.execute(
+                    "INSERT INTO heart_rate_logs (workout_id, timestamp, heart_rate, samples, hr_min, hr_max) "
+                    "VALUES (?, ?, ?, ?, ?, ?);",
+                    (wid, first_ts, int(round(hr_total / samples)), samples, low, high),
+                )
+                removed += int(count) - 1
+            return removed
+
+    def apply_retention(self, days: int, today: datetime.date | None = None) -> int:
+        """Downsample raw samples older than ``days`` days. ``0`` disables retention."""
+        if days <= 0:
+            return 0
+        today = today or datetime.date.today()
+        cutoff = (today - datetime.timedelta(days=days)).isoformat()
+        return self.downsample_before(cutoff)
+
+    @staticmethod
+    def _entry(conn: sqlite3.Connection, entry_id: int) -> tuple[int, str, int, int]:
+        row = conn.execute(
+            "SELECT workout_id, timestamp, heart_rate, samples FROM heart_rate_logs WHERE id = ?;",
+            (entry_id,),
+        ).fetchone()
+        if row is None:
             raise ValueError("log not found")
-        self.execute("DELETE FROM heart_rate_logs WHERE id = ?;", (entry_id,))
+        return int(row[0]), row[1], int(row[2]), int(row[3])
+
+    def update(self, entry_id: int, timestamp: str, heart_rate: int) -> None:
+        """Edit one row and refresh only the rollups it contributes to."""
+        with self._connection() as conn:
+            workout_id, old_ts, old_hr, samples = self._entry(conn, entry_id)
+            conn.execute(
+                "UPDATE heart_rate_logs SET timestamp = ?, heart_rate = ?, "
+                "hr_min = CASE WHEN samples > 1 THEN MIN(hr_min, ?) END, "
+                "hr_max = CASE WHEN samples > 1 THEN MAX(hr_max, ?) END WHERE id = ?;",
+                (timestamp, heart_rate, heart_rate, heart_rate, entry_id),
+            )
+            self._rebuild_minutes(
+                conn, workout_id, {self._minute(old_ts), self._minute(timestamp)}
+            )
+            if samples == 1:
+                self._shift_histogram(conn, workout_id, old_hr, -1)
+                self._shift_histogram(conn, workout_id, heart_rate, 1)
+
+    def delete(self, entry_id: int) -> None:
+        """Remove one row and refresh only the rollups it contributed to."""
+        with self._connection() as conn:
+            workout_id, old_ts, old_hr, samples = self._entry(conn, entry_id)
+            conn.execute("DELETE FROM heart_rate_logs WHERE id = ?;", (entry_id,))
+            self._rebuild_minutes(conn, workout_id, {self._minute(old_ts)})
+            if samples == 1:
+                self._shift_histogram(conn, workout_id, old_hr, -1)
 
 
 class StepCountRepository(BaseRepository):
@@ -5069,28 +6225,31 @@ class EmailLogRepository(BaseRepository):
         return result
 
 
-class MLModelStatusRepository(BaseRepository):
+class MLModelStatusRepository(BufferedRepository):
     """Repository tracking ML model usage timestamps."""
 
     def set_loaded(self, name: str) -> None:
-        self.execute(
+        self._write(
             "INSERT INTO ml_model_status (name, last_loaded) VALUES (?, ?) "
             "ON CONFLICT(name) DO UPDATE SET last_loaded=excluded.last_loaded;",
             (name, datetime.datetime.now().isoformat()),
+            key=name,
         )
 
     def set_trained(self, name: str) -> None:
-        self.execute(
+        self._write(
             "INSERT INTO ml_model_status (name, last_train) VALUES (?, ?) "
             "ON CONFLICT(name) DO UPDATE SET last_train=excluded.last_train;",
             (name, datetime.datetime.now().isoformat()),
+            key=name,
         )
 
     def set_prediction(self, name: str) -> None:
-        self.execute(
+        self._write(
             "INSERT INTO ml_model_status (name, last_predict) VALUES (?, ?) "
             "ON CONFLICT(name) DO UPDATE SET last_predict=excluded.last_predict;",
             (name, datetime.datetime.now().isoformat()),
+            key=name,
         )
 
     def fetch(self, name: str) -> dict[str, Optional[str]]:
@@ -5199,11 +6358,12 @@ class WorkoutCommentRepository(BaseRepository):
         return [(int(r[0]), r[1], r[2]) for r in rows]
 
 
-class MLTrainingRawRepository(BaseRepository):
+class MLTrainingRawRepository(BufferedRepository):
     """Repository storing raw ML training samples."""
 
-    def add(self, model_name: str, inputs: str, target: float) -> int:
-        return self.execute(
+    def add(self, model_name: str, inputs: str, target: float) -> int | None:
+        """Store a training sample. Returns ``None`` when the row is buffered."""
+        return self._write(
             "INSERT INTO ml_training_raw (model_name, inputs, target) VALUES (?, ?, ?);",
             (model_name, inputs, target),
         )
@@ -5220,6 +6380,113 @@ class MLTrainingRawRepository(BaseRepository):
         return result
 
 
+class PersonalRecordRepository(BaseRepository):
+    """Index of personal record events per exercise name.
+
+    Each row is a set that beat every earlier set of its exercise, ordered by
+    workout date and set id, so the last row per exercise is its current
+    record. Triggers keep the index current on appends and mark exercises
+    dirty when earlier history changes; dirty exercises are rebuilt on read.
+    """
+
+    def __init__(self, db_path: str = "workout.db") -> None:
+        super().__init__(db_path)
+        self.refresh()
+
+    @property
+    def indexed(self) -> bool:
+        """Whether the backing database maintains the record triggers."""
+        return not (self._db_url and self._db_url.startswith("postgresql"))
+
+    def _rebuild(self, conn: sqlite3.Connection, names: list[str]) -> None:
+        placeholders = ", ".join("?" for _ in names)
+        conn.execute(
+            f"DELETE FROM personal_records WHERE exercise IN ({placeholders});",
+            names,
+        )
+        rows = conn.execute(
+            f"SELECT s.id, e.name, w.date, {self._EPLEY_SQL.format(p='s.')} "
+            "FROM sets s JOIN exercises e ON s.exercise_id = e.id "
+            "JOIN workouts w ON e.workout_id = w.id "
+            f"WHERE e.name IN ({placeholders}) ORDER BY e.name, w.date, s.id;",
+            names,
+        ).fetchall()
+        best: dict[str, float] = {}
+        events = []
+        for set_id, name, date, est in rows:
+            if name not in best or est > best[name]:
+                best[name] = est
+                events.append((set_id, name, date, est))
+        conn.executemany(
+            "INSERT INTO personal_records (set_id, exercise, date, est_1rm) "
+            "VALUES (?, ?, ?, ?);",
+            events,
+        )
+
+    def refresh(self) -> int:
+        """Rebuild exercises marked dirty and return how many were rebuilt.
+
+        The write lock is only taken when something is marked dirty, so
+        reads of a clean index never wait for writers.
+        """
+        if not self.indexed:
+            return 0
+        with self._connection() as conn:
+            dirty = conn.execute(
+                "SELECT EXISTS(SELECT 1 FROM personal_record_dirty);"
+            ).fetchone()[0]
+            if not dirty:
+                return 0
+            conn.execute("BEGIN IMMEDIATE;")
+            names = [
+                r[0]
+                for r in conn.execute(
+                    "SELECT exercise FROM personal_record_dirty;"
+                ).fetchall()
+            ]
+            if names:
+                self._rebuild(conn, names)
+                conn.execute("DELETE FROM personal_record_dirty;")
+        return len(names)
+
+    def rebuild(self) -> int:
+        """Rebuild the whole index from set history."""
+        if not self.indexed:
+            return 0
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO personal_record_dirty (exercise) "
+                "SELECT DISTINCT name FROM exercises;"
+            )
+        return self.refresh()
+
+    def fetch_events(
+        self, names: list[str], end_date: str | None = None
+    ) -> list[tuple]:
+        """Return record events for ``names`` up to ``end_date``.
+
+        Rows hold ``exercise, date, equipment, reps, weight, rpe, est_1rm``
+        ordered like :meth:`SetRepository.fetch_history_by_names`.
+        """
+        if not names:
+            return []
+        self.refresh()
+        placeholders = ", ".join("?" for _ in names)
+        query = (
+            "SELECT r.exercise, r.date, e.equipment_name, s.reps, s.weight, s.rpe, "
+            "r.est_1rm FROM personal_records r "
+            "JOIN sets s ON s.id = r.set_id "
+            "JOIN exercises e ON s.exercise_id = e.id "
+            f"WHERE r.exercise IN ({placeholders})"
+        )
+        params: list = list(names)
+        if end_date:
+            query += " AND r.date <= ?"
+            params.append(end_date)
+        query += " ORDER BY r.date, r.set_id;"
+        return self.fetch_all(query, tuple(params))
+
+
 class StatsCacheRepository(BaseRepository):
     """Repository managing cached statistics."""
 
@@ -5255,8 +6522,40 @@ class StatsCacheRepository(BaseRepository):
             (start_date, end_date, unit, avg, min_val, max_val),
         )
 
+    def fetch_result(self, key: str, max_age: float | None = None) -> str | None:
+        """Return the stored payload for ``key`` unless older than ``max_age``."""
+        rows = self.fetch_all(
+            "SELECT payload, created_at FROM stats_result_cache WHERE cache_key = ?;",
+            (key,),
+        )
+        if not rows:
+            return None
+        payload, created = rows[0]
+        if max_age is not None and time.time() - float(created) > max_age:
+            return None
+        return payload
+
+    def save_result(
+        self, key: str, method: str, payload: str, max_entries: int | None = None
+    ) -> None:
+        """Store ``payload`` for ``key`` keeping at most ``max_entries`` rows."""
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO stats_result_cache "
+                "(cache_key, method, payload, created_at) VALUES (?, ?, ?, ?);",
+                (key, method, payload, time.time()),
+            )
+            if max_entries is not None:
+                conn.execute(
+                    "DELETE FROM stats_result_cache WHERE cache_key NOT IN ("
+                    "SELECT cache_key FROM stats_result_cache "
+                    "ORDER BY created_at DESC LIMIT ?);",
+                    (max_entries,),
+                )
+
     def clear(self) -> None:
         self._delete_all("weight_stats_cache")
+        self._delete_all("stats_result_cache")
 
 
 
@@ -1,5 +1,7 @@
 from __future__ import annotations
 import io
+import threading
+from collections import OrderedDict
 import torch
 from db import (
     MLModelRepository,
@@ -7,7 +9,7 @@ from db import (
     MLLogRepository,
     MLModelStatusRepository,
 )
-from typing import Iterable, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
 from ml_plugins import PluginManager
 
 plugin_manager = PluginManager()
@@ -15,6 +17,93 @@ plugin_manager = PluginManager()
 torch.manual_seed(0)
 
 
+class ModelTrainingQueue:
+    """Background worker running keyed model training jobs.
+
+    Submitting a key that is still pending replaces its job, so a burst of
+    identical requests trains once. Jobs run in submission order on a daemon
+    thread started with the first job, or inline via :meth:`run_pending`.
+    """
+
+    def __init__(self, background: bool = True) -> None:
+        self.background = background
+        self.completed = 0
+        self.failed = 0
+        self.last_error: str | None = None
+        self._jobs: "OrderedDict[str, Callable[[], object]]" = OrderedDict()
+        self._running = 0
+        self._cond = threading.Condition()
+        self._worker: threading.Thread | None = None
+        self._stopped = False
+
+    def submit(self, key: str, job: Callable[[], object]) -> bool:
+        """Queue ``job`` under ``key``; ``False`` means it replaced a pending job."""
+        with self._cond:
+            fresh = key not in self._jobs
+            self._jobs[key] = job
+            if self.background and self._worker is None and not self._stopped:
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+            self._cond.notify_all()
+        return fresh
+
+    def run_pending(self) -> int:
+        """Run queued jobs in the calling thread and return how many ran."""
+        count = 0
+        while True:
+            with self._cond:
+                if not self._jobs:
+                    return count
+                _key, job = self._jobs.popitem(last=False)
+                self._running += 1
+            try:
+                job()
+            except Exception as exc:
+                with self._cond:
+                    self.failed += 1
+                    self.last_error = str(exc)
+            else:
+                with self._cond:
+                    self.completed += 1
+            finally:
+                with self._cond:
+                    self._running -= 1
+                    self._cond.notify_all()
+            count += 1
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until no job is pending or running."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._jobs and not self._running, timeout
+            )
+
+    def info(self) -> Dict[str, object]:
+        with self._cond:
+            return {
+                "pending": list(self._jobs),
+                "running": self._running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "last_error": self.last_error,
+            }
+
+    def stop(self) -> None:
+        """Let queued jobs finish, then end the worker thread."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: bool(self._jobs) or self._stopped)
+                if not self._jobs:
+                    self._worker = None
+                    return
+            self.run_pending()
+
+
 class RPEModel(torch.nn.Module):
     """Feed-forward network predicting RPE with confidence."""
 
@@ -37,7 +126,13 @@ class RPEModel(torch.nn.Module):
 
 
 class BaseModelService:
-    """Base functionality for persistent Torch models."""
+    """Base functionality for persistent Torch models.
+
+    The attributes named in ``LAZY`` come from ``_load`` on first access, so
+    constructing a service neither builds the network nor reads its state.
+    """
+
+    LAZY: tuple[str, ...] = ("model", "opt", "initialized")
 
     def __init__(
         self,
@@ -50,6 +145,16 @@ class BaseModelService:
         self.name = name
         self.lr = lr
         self.status_repo = status_repo
+        self.lock = threading.RLock()
+
+    def __getattr__(self, name: str):
+        if name not in self.LAZY or "lock" not in self.__dict__:
+            raise AttributeError(name)
+        with self.lock:
+            if name not in self.__dict__:
+                for attr, value in zip(self.LAZY, self._load()):
+                    self.__dict__.setdefault(attr, value)
+        return self.__dict__[name]
 
     def _save_state(
         self,
@@ -211,7 +316,6 @@ class VolumeModelService(BaseModelService):
         status_repo: MLModelStatusRepository | None = None,
     ) -> None:
         super().__init__(repo, "volume_model", lr, status_repo)
-        self.model, self.opt, self.initialized = self._load()
 
     def _load(self) -> tuple[VolumePredictor, torch.optim.Optimizer, bool]:
         torch.manual_seed(0)
@@ -281,7 +385,6 @@ class ReadinessModelService(BaseModelService):
         status_repo: MLModelStatusRepository | None = None,
     ) -> None:
         super().__init__(repo, "readiness_model", lr, status_repo)
-        self.model, self.opt, self.initialized = self._load()
 
     def _load(self) -> tuple[ReadinessPredictor, torch.optim.Optimizer, bool]:
         torch.manual_seed(0)
@@ -298,7 +401,7 @@ class ReadinessModelService(BaseModelService):
         self._save_state(self.model, self.opt)
         self.initialized = True
 
-    def train(self, stress: float, fatigue: float, readiness: float) -> None:
+    def _step(self, stress: float, fatigue: float, readiness: float) -> None:
         self.model.train()
         self.opt.zero_grad()
         x = torch.tensor(
@@ -309,21 +412,45 @@ class ReadinessModelService(BaseModelService):
         loss = torch.nn.functional.mse_loss(pred, y)
         loss.backward()
         self.opt.step()
-        self._save()
+
+    def train(self, stress: float, fatigue: float, readiness: float) -> None:
+        with self.lock:
+            self._step(stress, fatigue, readiness)
+            self._save()
+
+    def train_many(self, samples: Iterable[tuple[float, float, float]]) -> int:
+        """Run one step per ``(stress, fatigue, readiness)`` sample, saving once."""
+        count = 0
+        with self.lock:
+            for stress, fatigue, readiness in samples:
+                self._step(stress, fatigue, readiness)
+                count += 1
+            if count:
+                self._save()
+        return count
 
     def predict(self, stress: float, fatigue: float, fallback: float) -> float:
-        if not self.initialized:
-            return fallback
-        self.model.eval()
-        with torch.no_grad():
+        return self.predict_many([stress], [fatigue], [fallback])[0]
+
+    def predict_many(
+        self,
+        stress: Sequence[float],
+        fatigue: Sequence[float],
+        fallback: Sequence[float],
+    ) -> List[float]:
+        """Predict readiness for many samples in one forward pass."""
+        if not self.initialized or not len(fallback):
+            return list(fallback)
+        with self.lock, torch.no_grad():
+            self.model.eval()
             x = torch.tensor(
-                [[stress / self.SCALE, fatigue / self.SCALE]], dtype=torch.float32
+                [[s / self.SCALE, f / self.SCALE] for s, f in zip(stress, fatigue)],
+                dtype=torch.float32,
             )
-            pred = self.model(x)
-            val = float(pred.item() * self.SCALE)
+            preds = self.model(x).view(-1).tolist()
         if self.status_repo is not None:
             self.status_repo.set_prediction("readiness_model")
-        return (val + fallback) / 2
+        return [(p * self.SCALE + fb) / 2 for p, fb in zip(preds, fallback)]
 
 
 class LSTMProgressPredictor(torch.nn.Module):
@@ -344,6 +471,7 @@ class ProgressModelService(BaseModelService):
     """Handle online training and prediction of 1RM values using an LSTM."""
 
     SCALE: float = 200.0
+    LAZY = ("model", "opt", "initialized", "history")
 
     def __init__(
         self,
@@ -352,7 +480,6 @@ class ProgressModelService(BaseModelService):
         status_repo: MLModelStatusRepository | None = None,
     ) -> None:
         super().__init__(repo, "progress_model", lr, status_repo)
-        self.model, self.opt, self.initialized, self.history = self._load()
 
     def _load(self) -> tuple[LSTMProgressPredictor, torch.optim.Optimizer, bool, list]:
         torch.manual_seed(0)
@@ -425,6 +552,7 @@ class RLGoalModelService(BaseModelService):
     """Deep Q-learning model for dynamic exercise goals."""
 
     ACTIONS = [-2.5, 0.0, 2.5]
+    LAZY = ("model", "opt", "initialized", "history")
 
     def __init__(
         self,
@@ -435,7 +563,6 @@ class RLGoalModelService(BaseModelService):
     ) -> None:
         super().__init__(repo, "rl_goal_model", lr, status_repo)
         self.gamma = gamma
-        self.model, self.opt, self.initialized, self.history = self._load()
         self.pending: dict[int, tuple[list[float], int]] = {}
 
     def _load(self) -> tuple[RLGoalNet, torch.optim.Optimizer, bool, list]:
@@ -524,7 +651,6 @@ class InjuryRiskModelService(BaseModelService):
         status_repo: MLModelStatusRepository | None = None,
     ) -> None:
         super().__init__(repo, "injury_model", lr, status_repo)
-        self.model, self.opt, self.initialized = self._load()
 
     def _load(self) -> tuple[InjuryRiskPredictor, torch.optim.Optimizer, bool]:
         torch.manual_seed(0)
@@ -541,7 +667,7 @@ class InjuryRiskModelService(BaseModelService):
         self._save_state(self.model, self.opt)
         self.initialized = True
 
-    def train(self, features: Iterable[float], label: float) -> None:
+    def _step(self, features: Iterable[float], label: float) -> None:
         self.model.train()
         self.opt.zero_grad()
         x = torch.tensor([list(features)], dtype=torch.float32)
@@ -550,11 +676,26 @@ class InjuryRiskModelService(BaseModelService):
         loss = torch.nn.functional.binary_cross_entropy(pred, y)
         loss.backward()
         self.opt.step()
-        self._save()
+
+    def train(self, features: Iterable[float], label: float) -> None:
+        with self.lock:
+            self._step(features, label)
+            self._save()
+
+    def train_many(self, samples: Iterable[tuple[Iterable[float], float]]) -> int:
+        """Run one step per ``(features, label)`` sample, saving once."""
+        count = 0
+        with self.lock:
+            for features, label in samples:
+                self._step(features, label)
+                count += 1
+            if count:
+                self._save()
+        return count
 
     def predict(self, features: Iterable[float]) -> float:
-        self.model.eval()
-        with torch.no_grad():
+        with self.lock, torch.no_grad():
+            self.model.eval()
             x = torch.tensor([list(features)], dtype=torch.float32)
             pred = self.model(x)
             val = float(pred.item())
@@ -589,7 +730,6 @@ class AdaptationModelService(BaseModelService):
         status_repo: MLModelStatusRepository | None = None,
     ) -> None:
         super().__init__(repo, "adaptation_model", lr, status_repo)
-        self.model, self.opt, self.initialized = self._load()
 
     def _load(self) -> tuple[FusionNet, torch.optim.Optimizer, bool]:
         torch.manual_seed(0)
@@ -100,6 +100,17 @@ class PlannerService:
                 self.planned_sets.add(new_ex_id, reps, weight, rpe)
         return plan_id
 
+    @staticmethod
+    def _planned_rows(sets: list[dict]) -> list[tuple[int, float, int]]:
+        return [
+            (
+                int(item["reps"]),
+                float(item["weight"]),
+                int(round(item["target_rpe"])),
+            )
+            for item in sets
+        ]
+
     def create_ai_plan(
         self,
         date: str,
@@ -113,20 +124,16 @@ class PlannerService:
             if randomize:
                 import random
                 random.shuffle(exercises)
-            plan_id = self.planned_workouts.create(date, training_type)
+            prescriptions = self.recommender.generate_prescriptions(
+                [name for name, _equipment in exercises]
+            )
+            items = []
             for name, equipment in exercises:
-                ex_id = self.planned_exercises.add(plan_id, name, equipment)
-                presc = self.recommender.generate_prescription(name)
-                sets = presc["prescription"]
+                sets = list(prescriptions[name]["prescription"])
                 if randomize:
                     random.shuffle(sets)
-                for item in sets:
-                    self.planned_sets.add(
-                        ex_id,
-                        int(item["reps"]),
-                        float(item["weight"]),
-                        int(round(item["target_rpe"])),
-                    )
+                items.append((name, equipment, self._planned_rows(sets)))
+            plan_id = self.planned_sets.create_plan(date, training_type, items)
             if self.log_repo is not None:
                 self.log_repo.log_success()
             return plan_id
@@ -145,14 +152,15 @@ class PlannerService:
         if not active:
             raise ValueError("no active goals")
         try:
-            plan_id = self.planned_workouts.create(date, "strength")
+            prescriptions = self.recommender.generate_prescriptions(
+                [g["exercise_name"] for g in active], skip_errors=True
+            )
+            items = []
             for g in active:
                 name = g["exercise_name"]
-                ex_id = self.planned_exercises.add(plan_id, name, None)
-                try:
-                    presc = self.recommender.generate_prescription(name)
-                    sets = presc["prescription"]
-                except Exception:
+                if name in prescriptions:
+                    sets = prescriptions[name]["prescription"]
+                else:
                     sets = [
                         {
                             "reps": 5,
@@ -160,13 +168,8 @@ class PlannerService:
                             "target_rpe": 8,
                         }
                     ]
-                for item in sets:
-                    self.planned_sets.add(
-                        ex_id,
-                        int(item["reps"]),
-                        float(item["weight"]),
-                        int(round(item["target_rpe"])),
-                    )
+                items.append((name, None, self._planned_rows(sets)))
+            plan_id = self.planned_sets.create_plan(date, "strength", items)
             if self.log_repo is not None:
                 self.log_repo.log_success()
             return plan_id
@@ -1,5 +1,10 @@
 from __future__ import annotations
+import concurrent.futures
+import copy
 import datetime
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable
 from db import (
     WorkoutRepository,
     ExerciseRepository,
@@ -10,16 +15,73 @@ from db import (
     WellnessRepository,
     GoalRepository,
     ExercisePrescriptionLogRepository,
+    PyramidTestLoader,
 )
 from algorithms.exercise_prescription import ExercisePrescription
+from analytics_executor import (
+    AnalyticsBusyError,
+    AnalyticsExecutor,
+    AnalyticsTimeoutError,
+)
 from gamification_service import GamificationService
 from ml_service import PerformanceModelService, RLGoalModelService
 from algorithms.math_tools import MathTools
 
 
+class PrescriptionCache:
+    """LRU of generated prescriptions keyed by an exercise history fingerprint.
+
+    Values are copied on the way in and out, so callers may adjust the
+    returned sets without touching the cached ones.
+    """
+
+    def __init__(self, max_entries: int = 64) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> dict | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: dict) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def info(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
 class RecommendationService:
     """Generate exercise set recommendations based on logged history."""
 
+    # Tables other than the exercise's own sets that feed a prescription.
+    PRESCRIPTION_TABLES = ("workouts", "pyramid_tests", "pyramid_entries", "settings")
+
     def __init__(
         self,
         workout_repo: WorkoutRepository,
@@ -34,6 +96,9 @@ class RecommendationService:
         goal_repo: GoalRepository | None = None,
         wellness_repo: WellnessRepository | None = None,
         prescription_log_repo: ExercisePrescriptionLogRepository | None = None,
+        prescription_cache: PrescriptionCache | None = None,
+        pyramid_loader: PyramidTestLoader | None = None,
+        executor: AnalyticsExecutor | None = None,
     ) -> None:
         self.workouts = workout_repo
         self.exercises = exercise_repo
@@ -47,6 +112,9 @@ class RecommendationService:
         self.goals = goal_repo
         self.wellness = wellness_repo
         self.prescription_logs = prescription_log_repo
+        self.prescriptions = prescription_cache or PrescriptionCache()
+        self.pyramid_loader = pyramid_loader
+        self.executor = executor
         self._pending: dict[int, list[float]] = {}
 
     def _current_body_weight(self) -> float:
@@ -106,16 +174,168 @@ class RecommendationService:
                 best = eq
         return best
 
+    def _active_goal(self, exercise_name: str) -> tuple[float | None, int | None]:
+        """Return the target 1RM and days left of the first active goal."""
+        if self.goals is None:
+            return None, None
+        active = self.goals.fetch_active_by_exercise(exercise_name)
+        if not active:
+            return None, None
+        g = active[0]
+        goal_days = None
+        try:
+            today = datetime.date.today()
+            target_date = datetime.date.fromisoformat(g["target_date"])
+            diff = (target_date - today).days
+            goal_days = max(diff, 1)
+        except Exception:
+            goal_days = None
+        return float(g["target_value"]), goal_days
+
     def generate_prescription(self, exercise_name: str) -> dict:
-        """Return a full prescription for the given exercise."""
-        alias_names = self.exercise_names.aliases(exercise_name)
-        history = self.sets.fetch_history_by_names(
-            alias_names, with_duration=True, with_workout_id=True
-        )
-        if not history:
-            if self.prescription_logs is not None:
-                self.prescription_logs.log_error("no history for exercise")
-            raise ValueError("no history for exercise")
+        """Return a full prescription for the given exercise.
+
+        Results are cached on the exercise's set history fingerprint, the
+        active goal, the wellness window, body weight and the versions of
+        :attr:`PRESCRIPTION_TABLES`, so repeated requests skip the model
+        pipeline until one of them changes.
+        """
+        return self.generate_prescriptions([exercise_name])[exercise_name]
+
+    def generate_prescriptions(
+        self, exercise_names: Iterable[str], skip_errors: bool = False
+    ) -> dict[str, dict]:
+        """Return prescriptions for several exercises keyed by name.
+
+        Histories, fingerprints and workout details are read with one query
+        each and wellness, body weight and settings once for the batch.
+        Cache misses run in parallel on :attr:`executor` when one is set.
+        A failing exercise raises unless ``skip_errors`` is set, in which
+        case it is left out of the result.
+        """
+        names = list(dict.fromkeys(exercise_names))
+        aliases = {name: self.exercise_names.aliases(name) for name in names}
+        fingerprints = self.sets.history_fingerprints(aliases)
+        wellness = self._recent_wellness()
+        body_weight = self._current_body_weight()
+        self.settings.refresh()
+        version = self.sets.data_version(*self.PRESCRIPTION_TABLES)
+        results: dict[str, dict] = {}
+        errors: dict[str, Exception] = {}
+        pending: dict[str, tuple] = {}
+        for name in names:
+            if not fingerprints[name][0]:
+                errors[name] = ValueError("no history for exercise")
+                continue
+            goal = self._active_goal(name)
+            key = (
+                self.exercise_names.canonical(name),
+                name,
+                tuple(aliases[name]),
+                fingerprints[name],
+                goal,
+                tuple(tuple(v) if v else None for v in wellness),
+                body_weight,
+                version,
+            )
+            cached = self.prescriptions.get(key)
+            if cached is not None:
+                results[name] = cached
+            else:
+                pending[name] = (key, goal)
+        if pending:
+            histories = self.sets.fetch_histories_by_names(
+                {name: aliases[name] for name in pending}
+            )
+            details = self.workouts.fetch_details(
+                row[6] for rows in histories.values() for row in rows
+            )
+            inputs: dict[str, dict] = {}
+            for name, (_key, goal) in pending.items():
+                if not histories[name]:
+                    errors[name] = ValueError("no history for exercise")
+                    continue
+                try:
+                    inputs[name] = self._prescription_inputs(
+                        name, histories[name], details, goal, wellness, body_weight
+                    )
+                except Exception as e:
+                    errors[name] = e
+            estimator = self.settings.get_text("prescription_estimator", "full")
+            for name, outcome in self._run_prescriptions(estimator, inputs).items():
+                if isinstance(outcome, Exception):
+                    errors[name] = outcome
+                    continue
+                kwargs = inputs[name]
+                result = {
+                    "prescription": outcome["prescription"],
+                    "weights": kwargs["weights"],
+                    "reps": kwargs["reps"],
+                    "rpe": kwargs["rpe_scores"],
+                }
+                self.prescriptions.put(pending[name][0], result)
+                results[name] = result
+                if self.prescription_logs is not None:
+                    self.prescription_logs.log_success()
+        if self.prescription_logs is not None:
+            for name in names:
+                if name in errors:
+                    self.prescription_logs.log_error(str(errors[name]))
+        if not skip_errors:
+            for name in names:
+                if name in errors:
+                    raise errors[name]
+        return {name: results[name] for name in names if name in results}
+
+    def _run_prescriptions(
+        self, estimator: str, inputs: dict[str, dict]
+    ) -> dict[str, dict | Exception]:
+        """Compute prescriptions for ``inputs``, fanning out when possible.
+
+        Jobs the executor rejects as busy run inline instead.
+        """
+        futures: dict[str, concurrent.futures.Future] = {}
+        if self.executor is not None and len(inputs) > 1:
+            for name, kwargs in inputs.items():
+                try:
+                    futures[name] = self.executor.submit(
+                        ExercisePrescription.prescribe, estimator, kwargs
+                    )
+                except AnalyticsBusyError:
+                    break
+        wait = None
+        if self.executor is not None and self.executor.timeout is not None:
+            wait = self.executor.timeout + 5.0
+        outcomes: dict[str, dict | Exception] = {}
+        for name, kwargs in inputs.items():
+            future = futures.get(name)
+            try:
+                if future is None:
+                    outcomes[name] = ExercisePrescription.prescribe(estimator, kwargs)
+                else:
+                    outcomes[name] = future.result(timeout=wait)
+            except concurrent.futures.TimeoutError:
+                self.executor.cancel(future)
+                outcomes[name] = AnalyticsTimeoutError("prescription timed out")
+            except Exception as e:
+                outcomes[name] = e
+        return outcomes
+
+    def _prescription_inputs(
+        self,
+        exercise_name: str,
+        history: list[tuple],
+        details: dict[int, tuple],
+        goal: tuple[float | None, int | None],
+        wellness: tuple,
+        body_weight: float,
+    ) -> dict:
+        """Return :meth:`ExercisePrescription.exercise_prescription` arguments.
+
+        ``history`` rows are ``(reps, weight, rpe, date, start, end,
+        workout_id)`` and ``details`` maps workout ids to their
+        :meth:`WorkoutRepository.fetch_detail` rows.
+        """
         reps_list = [int(r[0]) for r in history]
         weight_list = [float(r[1]) for r in history]
         rpe_list = [int(r[2]) for r in history]
@@ -149,7 +369,9 @@ class RecommendationService:
 
         sessions: list[dict] = []
         for wid in session_map:
-            wid_d, date, start, end, t_type, *_ = self.workouts.fetch_detail(wid)
+            if wid not in details:
+                raise ValueError("workout not found")
+            wid_d, date, start, end, t_type, *_ = details[wid]
             sessions.append(
                 {
                     "id": wid_d,
@@ -197,56 +419,35 @@ class RecommendationService:
         )
         frequency_factor = ExercisePrescription.clamp(72 / avg_recovery_time, 0.5, 2.0)
         session_volumes = [s["volume"] for s in sessions[:-1]]
-        goal_target = None
-        goal_days = None
-        if self.goals is not None:
-            active = self.goals.fetch_active_by_exercise(exercise_name)
-            if active:
-                g = active[0]
-                goal_target = float(g["target_value"])
-                try:
-                    today = datetime.date.today()
-                    target_date = datetime.date.fromisoformat(g["target_date"])
-                    diff = (target_date - today).days
-                    goal_days = max(diff, 1)
-                except Exception:
-                    goal_days = None
-        calories, sleep_hours, sleep_quality, stress_levels = self._recent_wellness()
-        try:
-            prescription = ExercisePrescription.exercise_prescription(
-                weight_list,
-                reps_list,
-                timestamps,
-                rpe_list,
-                durations=durations,
-                rest_times=rest_times,
-                recovery_times=recovery_times,
-                optimal_recovery_times=optimal_times,
-                session_volumes=session_volumes,
-                recovery_quality_mean=recovery_quality_mean,
-                frequency_factor=frequency_factor,
-                body_weight=self._current_body_weight(),
-                months_active=months_active,
-                workouts_per_month=workouts_per_month,
-                calories=calories,
-                sleep_hours=sleep_hours,
-                sleep_quality=sleep_quality,
-                stress_levels=stress_levels,
-                exercise_name=exercise_name,
-                target_1rm=goal_target,
-                days_remaining=goal_days,
-            )
-            if self.prescription_logs is not None:
-                self.prescription_logs.log_success()
-        except Exception as e:
-            if self.prescription_logs is not None:
-                self.prescription_logs.log_error(str(e))
-            raise
+        goal_target, goal_days = goal
+        calories, sleep_hours, sleep_quality, stress_levels = wellness
         return {
-            "prescription": prescription["prescription"],
             "weights": weight_list,
             "reps": reps_list,
-            "rpe": rpe_list,
+            "timestamps": timestamps,
+            "rpe_scores": rpe_list,
+            "durations": durations,
+            "rest_times": rest_times,
+            "recovery_times": recovery_times,
+            "optimal_recovery_times": optimal_times,
+            "session_volumes": session_volumes,
+            "recovery_quality_mean": recovery_quality_mean,
+            "frequency_factor": frequency_factor,
+            "body_weight": body_weight,
+            "months_active": months_active,
+            "workouts_per_month": workouts_per_month,
+            "calories": calories,
+            "sleep_hours": sleep_hours,
+            "sleep_quality": sleep_quality,
+            "stress_levels": stress_levels,
+            "exercise_name": exercise_name,
+            "target_1rm": goal_target,
+            "days_remaining": goal_days,
+            "pyramid_tests": (
+                self.pyramid_loader(exercise_name)
+                if self.pyramid_loader is not None
+                else None
+            ),
         }
 
     def recommend_next_set(self, exercise_id: int) -> dict:
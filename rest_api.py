@@ -1,5 +1,6 @@
 import datetime
 import json
+import logging
 import time
 import threading
 import asyncio
@@ -8,7 +9,8 @@ import requests
 import re
 import zipfile
 import base64
-from typing import List, Dict
+from collections import OrderedDict
+from typing import Any, List, Dict
 from fastapi import (
     FastAPI,
     HTTPException,
@@ -21,7 +23,10 @@ from fastapi import (
     Header,
     Depends,
 )
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from db import (
+    Database,
     WorkoutRepository,
     AsyncWorkoutRepository,
     AsyncExerciseRepository,
@@ -45,6 +50,7 @@ from db import (
     SettingsRepository,
     PyramidTestRepository,
     PyramidEntryRepository,
+    PyramidTestLoader,
     GamificationRepository,
     MLModelRepository,
     MLLogRepository,
@@ -73,10 +79,16 @@ from db import (
     GoalRepository,
     ChallengeRepository,
     StatsCacheRepository,
+    PersonalRecordRepository,
 )
 from planner_service import PlannerService
 from recommendation_service import RecommendationService
 from stats_service import StatisticsService
+from analytics_executor import (
+    AnalyticsExecutor,
+    AnalyticsBusyError,
+    AnalyticsTimeoutError,
+)
 from gamification_service import GamificationService
 from ml_service import (
     PerformanceModelService,
@@ -91,6 +103,8 @@ from algorithms.exercise_prescription import ExercisePrescription
 from algorithms.math_tools import MathTools
 from cli_tools import GitTools
 
+logger = logging.getLogger(__name__)
+
 
 class RateLimiter:
     """Simple in-memory rate limiter."""
@@ -121,6 +135,11 @@ class EmailScheduler(threading.Thread):
         self.last_sent: datetime.datetime | None = None
         self.last_monthly: datetime.datetime | None = None
         self.running = True
+        self._wake = threading.Event()
+
+    def stop(self) -> None:
+        self.running = False
+        self._wake.set()
 
     def run(self) -> None:
         while self.running:
@@ -140,7 +159,7 @@ class EmailScheduler(threading.Thread):
                 self.api.workouts.delete_empty()
             except Exception:
                 pass
-            time.sleep(self.interval)
+            self._wake.wait(self.interval)
 
 
 class ReminderScheduler(threading.Thread):
@@ -151,6 +170,11 @@ class ReminderScheduler(threading.Thread):
         self.api = api
         self.interval = interval_hours * 3600
         self.running = True
+        self._wake = threading.Event()
+
+    def stop(self) -> None:
+        self.running = False
+        self._wake.set()
 
     def run(self) -> None:
         while self.running:
@@ -158,7 +182,30 @@ class ReminderScheduler(threading.Thread):
                 self.api.send_daily_reminder()
             except Exception:
                 pass
-            time.sleep(self.interval)
+            self._wake.wait(self.interval)
+
+
+class RetentionScheduler(threading.Thread):
+    """Background thread downsampling old raw heart rate samples daily."""
+
+    def __init__(self, api: "GymAPI", interval_hours: int = 24) -> None:
+        super().__init__(daemon=True)
+        self.api = api
+        self.interval = interval_hours * 3600
+        self.running = True
+        self._wake = threading.Event()
+
+    def stop(self) -> None:
+        self.running = False
+        self._wake.set()
+
+    def run(self) -> None:
+        while self.running:
+            try:
+                self.api.apply_retention()
+            except Exception:
+                logger.exception("Heart rate retention failed for %s", self.api.db_path)
+            self._wake.wait(self.interval)
 
 
 class GymAPI:
@@ -207,15 +254,16 @@ class GymAPI:
         self.async_tags = AsyncTagRepository(db_path)
         self.pyramid_tests = PyramidTestRepository(db_path)
         self.pyramid_entries = PyramidEntryRepository(db_path)
+        self.pyramid_loader = PyramidTestLoader(self.pyramid_tests)
         self.game_repo = GamificationRepository(db_path)
         self.ml_models = MLModelRepository(db_path)
-        self.ml_logs = MLLogRepository(db_path)
-        self.ml_status = MLModelStatusRepository(db_path)
+        self.ml_logs = MLLogRepository(db_path, buffered=True)
+        self.ml_status = MLModelStatusRepository(db_path, buffered=True)
         self.notifications = NotificationRepository(db_path)
         self.async_notifications = AsyncNotificationRepository(db_path)
         self.comments = WorkoutCommentRepository(db_path)
         self.api_keys = APIKeyRepository(db_path)
-        self.ml_training_raw = MLTrainingRawRepository(db_path)
+        self.ml_training_raw = MLTrainingRawRepository(db_path, buffered=True)
         self.autoplan_logs = AutoPlannerLogRepository(db_path)
         self.prescription_logs = ExercisePrescriptionLogRepository(db_path)
         self.email_logs = EmailLogRepository(db_path)
@@ -226,6 +274,7 @@ class GymAPI:
         self.step_counts = StepCountRepository(db_path)
         self.exercise_images = ExerciseImageRepository(db_path)
         self.stats_cache = StatsCacheRepository(db_path)
+        self.personal_records = PersonalRecordRepository(db_path)
         self.goals = GoalRepository(db_path)
         self.challenges = ChallengeRepository(db_path)
         self.watchers: list[WebSocket] = []
@@ -274,6 +323,8 @@ class GymAPI:
             self.goals,
             self.wellness,
             prescription_log_repo=self.prescription_logs,
+            pyramid_loader=self.pyramid_loader,
+            executor=AnalyticsExecutor.shared(),
         )
         self.planner = PlannerService(
             self.workouts,
@@ -308,14 +359,26 @@ class GymAPI:
             self.step_counts,
             self.goals,
             cache_repo=self.stats_cache,
+            record_repo=self.personal_records,
+            pyramid_loader=self.pyramid_loader,
+            analytics=AnalyticsExecutor.shared(),
         )
         self.app = FastAPI(
             title="Gym API",
             description="REST API for workout logging and analytics",
         )
+        self.app.add_exception_handler(AnalyticsBusyError, self._analytics_busy)
+        self.app.add_exception_handler(
+            AnalyticsTimeoutError, self._analytics_timeout
+        )
+        self.app.router.on_shutdown.append(self.flush_pending_writes)
         if rate_limit is not None:
             limiter = RateLimiter(limit=rate_limit, window=rate_window)
             self.app.middleware("http")(limiter)
+        self.scheduler: EmailScheduler | None = None
+        self.reminder_scheduler: ReminderScheduler | None = None
+        self.retention_scheduler: RetentionScheduler | None = None
+        self.app.router.on_startup.append(self.start_retention)
         if start_scheduler:
             self.scheduler = EmailScheduler(self)
             self.scheduler.start()
@@ -324,6 +387,42 @@ class GymAPI:
             self.reminder_scheduler.start()
         self._setup_routes()
 
+    def flush_pending_writes(self) -> None:
+        """Persist buffered ML telemetry rows."""
+        self.ml_logs.flush()
+        self.ml_status.flush()
+        self.ml_training_raw.flush()
+
+    def apply_retention(self) -> int:
+        """Downsample raw heart rate samples per ``heart_rate_retention_days``."""
+        return self.heart_rates.apply_retention(
+            self.settings.get_int("heart_rate_retention_days", 0)
+        )
+
+    def start_retention(self) -> None:
+        """Start the daily retention thread once a retention period is set."""
+        if self.settings.get_int("heart_rate_retention_days", 0) <= 0:
+            return
+        if self.retention_scheduler is None:
+            self.retention_scheduler = RetentionScheduler(self)
+            self.retention_scheduler.start()
+
+    def shutdown(self) -> None:
+        """Flush buffered writes and stop this instance's background workers."""
+        for scheduler in (
+            self.scheduler,
+            self.reminder_scheduler,
+            self.retention_scheduler,
+        ):
+            if scheduler is not None:
+                scheduler.stop()
+        if self.retention_scheduler is not None:
+            self.retention_scheduler.join(5)
+        self.ml_logs.close()
+        self.ml_status.close()
+        self.ml_training_raw.close()
+        self.statistics.training.stop()
+
     def send_weekly_email_report(self, address: str | None = None) -> None:
         addr = address or self.settings.get_text("weekly_report_email", "")
         if not addr:
@@ -416,6 +515,58 @@ class GymAPI:
         except Exception:
             pass
 
+    @staticmethod
+    def _analytics_busy(_request: Request, exc: Exception) -> JSONResponse:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(exc)},
+            headers={"Retry-After": "1"},
+        )
+
+    @staticmethod
+    def _analytics_timeout(_request: Request, exc: Exception) -> JSONResponse:
+        return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+    def _sampled(
+        self,
+        response: Response,
+        rows: list,
+        value_key: str,
+        max_points: int | None,
+        x_key: str = "date",
+    ) -> list:
+        """Downsample a chart series and report it in ``X-Downsampled``."""
+        try:
+            points, applied = self.statistics.downsample(
+                rows, value_key, max_points, x_key
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        response.headers["X-Downsampled"] = "true" if applied else "false"
+        response.headers["X-Total-Points"] = str(len(rows))
+        return points
+
+    @staticmethod
+    def _wants_ndjson(request: Request) -> bool:
+        return "application/x-ndjson" in request.headers.get("accept", "")
+
+    @staticmethod
+    def _ndjson(items) -> StreamingResponse:
+        """Stream ``items`` as newline delimited JSON, one object per line."""
+        lines = (json.dumps(jsonable_encoder(item)) + "\n" for item in items)
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    @staticmethod
+    def _chart_response(
+        request: Request, chart: tuple[bytes, str], media_type: str
+    ) -> Response:
+        """Serve rendered chart bytes with ETag revalidation."""
+        content, etag = chart
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=content, media_type=media_type, headers=headers)
+
     def _setup_routes(self) -> None:
         equipment_router = APIRouter(prefix="/equipment", tags=["Equipment"])
         muscles_router = APIRouter(prefix="/muscles", tags=["Muscles"])
@@ -1051,6 +1202,7 @@ class GymAPI:
             description="Detailed workout list with volume and RPE summary.",
         )
         async def workout_history(
+            request: Request,
             start_date: str,
             end_date: str,
             training_type: str = None,
@@ -1062,9 +1214,27 @@ class GymAPI:
             limit: int | None = None,
             offset: int | None = None,
         ):
-            workouts = await self.async_workouts.fetch_all_workouts(
-                start_date,
-                end_date,
+            def entries(workouts):
+                for wid, date, t_type, summary in workouts:
+                    if training_type and t_type != training_type:
+                        continue
+                    if summary is None:
+                        summary = self.sets.workout_summary(wid)
+                    entry = {
+                        "id": wid,
+                        "date": date,
+                        "training_type": t_type,
+                        "volume": summary["volume"],
+                        "sets": summary["sets"],
+                        "avg_rpe": summary["avg_rpe"],
+                    }
+                    if fields:
+                        allowed = set(entry.keys())
+                        keep = [f for f in fields.split(",") if f in allowed]
+                        entry = {k: entry[k] for k in keep}
+                    yield entry
+
+            query = dict(
                 start_time=start_time,
                 end_time=end_time,
                 sort_by=sort_by,
@@ -1072,25 +1242,29 @@ class GymAPI:
                 limit=limit,
                 offset=offset,
             )
-            result = []
-            for wid, date, _s, _e, _tz, t_type, _notes, _loc, _rating, *_ in workouts:
-                if training_type and t_type != training_type:
-                    continue
-                summary = self.sets.workout_summary(wid)
-                entry = {
-                    "id": wid,
-                    "date": date,
-                    "training_type": t_type,
-                    "volume": summary["volume"],
-                    "sets": summary["sets"],
-                    "avg_rpe": summary["avg_rpe"],
-                }
-                if fields:
-                    allowed = set(entry.keys())
-                    keep = [f for f in fields.split(",") if f in allowed]
-                    entry = {k: entry[k] for k in keep}
-                result.append(entry)
-            return result
+            if self._wants_ndjson(request):
+                rows = self.workouts.iter_workouts(
+                    start_date, end_date, summary=True, **query
+                )
+                return self._ndjson(
+                    entries(
+                        (
+                            r[0],
+                            r[1],
+                            r[6],
+                            {
+                                "volume": round(r[13], 2),
+                                "sets": r[14],
+                                "avg_rpe": round(r[15] / r[14], 2) if r[14] else 0.0,
+                            },
+                        )
+                        for r in rows
+                    )
+                )
+            workouts = await self.async_workouts.fetch_all_workouts(
+                start_date, end_date, **query
+            )
+            return list(entries((w[0], w[1], w[5], None) for w in workouts))
 
         @self.app.get("/calendar")
         async def calendar(start_date: str, end_date: str):
@@ -1190,9 +1364,9 @@ class GymAPI:
             )
 
         @self.app.get("/workouts/{workout_id}/summary_image")
-        def workout_summary_image(workout_id: int):
-            data = self.statistics.workout_summary_image(workout_id)
-            return Response(content=data, media_type="image/png")
+        def workout_summary_image(request: Request, workout_id: int):
+            chart = self.statistics.workout_summary_chart(workout_id)
+            return self._chart_response(request, chart, "image/png")
 
         @self.app.get("/workouts/{workout_id}/share")
         def share_workout(workout_id: int):
@@ -2017,10 +2191,17 @@ class GymAPI:
 
         @self.app.get("/stats/exercise_history")
         def stats_exercise_history(
+            request: Request,
             exercise: str,
             start_date: str = None,
             end_date: str = None,
         ):
+            if self._wants_ndjson(request):
+                return self._ndjson(
+                    self.statistics.iter_exercise_history(
+                        exercise, start_date, end_date
+                    )
+                )
             return self.statistics.exercise_history(
                 exercise,
                 start_date,
@@ -2041,24 +2222,28 @@ class GymAPI:
 
         @self.app.get("/stats/progression")
         def stats_progression(
+            response: Response,
             exercise: str,
             start_date: str = None,
             end_date: str = None,
+            max_points: int = None,
         ):
-            return self.statistics.progression(
+            rows = self.statistics.progression(
                 exercise,
                 start_date,
                 end_date,
             )
+            return self._sampled(response, rows, "est_1rm", max_points)
 
         @self.app.get("/stats/progression_pdf")
         def stats_progression_pdf(
+            request: Request,
             exercise: str,
             start_date: str = None,
             end_date: str = None,
         ):
-            data = self.statistics.progression_chart_pdf(exercise, start_date, end_date)
-            return Response(content=data, media_type="application/pdf")
+            chart = self.statistics.progression_chart(exercise, start_date, end_date)
+            return self._chart_response(request, chart, "application/pdf")
 
         @self.app.get("/stats/moving_average_progress")
         def stats_moving_average_progress(
@@ -2102,10 +2287,13 @@ class GymAPI:
 
         @self.app.get("/stats/daily_volume")
         def stats_daily_volume(
+            response: Response,
             start_date: str = None,
             end_date: str = None,
+            max_points: int = None,
         ):
-            return self.statistics.daily_volume(start_date, end_date)
+            rows = self.statistics.daily_volume(start_date, end_date)
+            return self._sampled(response, rows, "volume", max_points)
 
         @self.app.get("/stats/equipment_usage")
         def stats_equipment_usage(
@@ -2214,27 +2402,33 @@ class GymAPI:
 
         @self.app.get("/stats/velocity_history")
         def stats_velocity_history(
+            response: Response,
             exercise: str,
             start_date: str = None,
             end_date: str = None,
+            max_points: int = None,
         ):
-            return self.statistics.velocity_history(
+            rows = self.statistics.velocity_history(
                 exercise,
                 start_date,
                 end_date,
             )
+            return self._sampled(response, rows, "velocity", max_points)
 
         @self.app.get("/stats/power_history")
         def stats_power_history(
+            response: Response,
             exercise: str,
             start_date: str = None,
             end_date: str = None,
+            max_points: int = None,
         ):
-            return self.statistics.power_history(
+            rows = self.statistics.power_history(
                 exercise,
                 start_date,
                 end_date,
             )
+            return self._sampled(response, rows, "power", max_points)
 
         @self.app.get("/stats/relative_power_history")
         def stats_relative_power_history(
@@ -2293,6 +2487,16 @@ class GymAPI:
         ):
             return self.statistics.weekly_load_variability(start_date, end_date)
 
+        @self.app.get("/stats/workload_timeline")
+        def stats_workload_timeline(
+            response: Response,
+            start_date: str = None,
+            end_date: str = None,
+            max_points: int = None,
+        ):
+            rows = self.statistics.workload_timeline(start_date, end_date)
+            return self._sampled(response, rows, "acwr", max_points)
+
         @self.app.get("/stats/training_monotony")
         def stats_training_monotony(
             start_date: str = None,
@@ -2410,8 +2614,14 @@ class GymAPI:
             days: int = 7,
             start_date: str = None,
             end_date: str = None,
+            method: str = "auto",
         ):
-            return self.statistics.volume_forecast(days, start_date, end_date)
+            try:
+                return self.statistics.volume_forecast(
+                    days, start_date, end_date, method
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
 
         @self.app.get("/stats/overtraining_risk")
         def stats_overtraining_risk(
@@ -2711,9 +2921,21 @@ class GymAPI:
             return {"id": wid}
 
         @self.app.get("/body_weight")
-        async def list_body_weight(start_date: str = None, end_date: str = None):
+        async def list_body_weight(
+            request: Request,
+            response: Response,
+            start_date: str = None,
+            end_date: str = None,
+            max_points: int = None,
+        ):
+            if max_points is None and self._wants_ndjson(request):
+                rows = self.body_weights.iter_history(start_date, end_date)
+                return self._ndjson(
+                    {"id": rid, "date": d, "weight": w} for rid, d, w in rows
+                )
             rows = await self.async_body_weights.fetch_history(start_date, end_date)
-            return [{"id": rid, "date": d, "weight": w} for rid, d, w in rows]
+            entries = [{"id": rid, "date": d, "weight": w} for rid, d, w in rows]
+            return self._sampled(response, entries, "weight", max_points)
 
         @self.app.get("/body_weight/export_csv")
         async def export_body_weight_csv(start_date: str = None, end_date: str = None):
@@ -2848,9 +3070,26 @@ class GymAPI:
             ]
 
         @self.app.get("/heart_rate")
-        def list_heart_rate(start_date: str = None, end_date: str = None):
+        def list_heart_rate(
+            request: Request,
+            response: Response,
+            start_date: str = None,
+            end_date: str = None,
+            max_points: int = None,
+        ):
+            if max_points is None and self._wants_ndjson(request):
+                rows = self.heart_rates.iter_range(start_date, end_date)
+                return self._ndjson(
+                    {
+                        "id": rid,
+                        "workout_id": wid,
+                        "timestamp": ts,
+                        "heart_rate": hr,
+                    }
+                    for rid, wid, ts, hr in rows
+                )
             rows = self.heart_rates.fetch_range(start_date, end_date)
-            return [
+            entries = [
                 {
                     "id": rid,
                     "workout_id": wid,
@@ -2859,6 +3098,9 @@ class GymAPI:
                 }
                 for rid, wid, ts, hr in rows
             ]
+            return self._sampled(
+                response, entries, "heart_rate", max_points, "timestamp"
+            )
 
         @self.app.put("/heart_rate/{entry_id}")
         def update_heart_rate(entry_id: int, timestamp: str, heart_rate: int):
@@ -3019,13 +3261,47 @@ class GymAPI:
             self.statistics.clear_cache()
             return {"status": "cleared"}
 
+        @self.app.get("/stats/cache")
+        def stats_cache_info():
+            return self.statistics.memo.info()
+
+        @self.app.get("/stats/charts")
+        def stats_chart_cache_info():
+            return self.statistics.charts.info()
+
+        @self.app.get("/stats/analytics")
+        def stats_analytics_info():
+            return self.statistics.analytics.info()
+
+        @self.app.get("/prescriptions/cache")
+        def prescription_cache_info():
+            return self.recommender.prescriptions.info()
+
+        @self.app.post("/stats/batch")
+        def stats_batch(
+            metrics: List[Any] = Body(...),
+            start_date: str = Body(None),
+            end_date: str = Body(None),
+            stream: bool = Body(True),
+        ):
+            try:
+                results = self.statistics.batch(metrics, start_date, end_date)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if not stream:
+                return {item.pop("key"): item for item in results}
+            return self._ndjson(results)
+
         @self.app.get("/stats/readiness_stats")
         def stats_readiness_stats(start_date: str = None, end_date: str = None):
             return self.statistics.readiness_stats(start_date, end_date)
 
         @self.app.get("/stats/weight_forecast")
-        def stats_weight_forecast(days: int):
-            return self.statistics.weight_forecast(days)
+        def stats_weight_forecast(days: int, method: str = "linear"):
+            try:
+                return self.statistics.weight_forecast(days, method)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
 
         @self.app.get("/stats/wellness_summary")
         def stats_wellness_summary(start_date: str = None, end_date: str = None):
@@ -3055,6 +3331,10 @@ class GymAPI:
         def stats_heart_rate_summary(start_date: str = None, end_date: str = None):
             return self.statistics.heart_rate_summary(start_date, end_date)
 
+        @self.app.get("/stats/heart_rate_workouts")
+        def stats_heart_rate_workouts(start_date: str = None, end_date: str = None):
+            return self.statistics.heart_rate_workout_summary(start_date, end_date)
+
         @self.app.get("/stats/heart_rate_zones")
         def stats_heart_rate_zones(start_date: str = None, end_date: str = None):
             return self.statistics.heart_rate_zones(start_date, end_date)
@@ -3075,6 +3355,24 @@ class GymAPI:
                 for ts, pred, conf in rows
             ]
 
+        @self.app.post("/ml/train")
+        def ml_train(
+            models: str = "readiness,injury",
+            start_date: str = None,
+            end_date: str = None,
+        ):
+            names = [m.strip() for m in models.split(",") if m.strip()]
+            try:
+                return self.statistics.schedule_model_training(
+                    names, start_date, end_date
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        @self.app.get("/ml/train")
+        def ml_train_status():
+            return self.statistics.training.info()
+
         @self.app.get("/ml/cross_validate/{model_name}")
         def ml_cross_validate(model_name: str, folds: int = 5):
             if model_name != "performance_model":
@@ -3188,7 +3486,17 @@ class GymAPI:
             hide_completed_plans: bool = None,
             rpe_scale: int = None,
             quick_weight_increment: float = None,
+            prescription_estimator: str = None,
+            heart_rate_retention_days: int = None,
         ):
+            if prescription_estimator not in (None, *ExercisePrescription.ESTIMATORS):
+                raise HTTPException(
+                    status_code=400, detail="invalid prescription_estimator"
+                )
+            if heart_rate_retention_days is not None and heart_rate_retention_days < 0:
+                raise HTTPException(
+                    status_code=400, detail="invalid heart_rate_retention_days"
+                )
             if body_weight is not None:
                 self.settings.set_float("body_weight", body_weight)
             if height is not None:
@@ -3294,6 +3602,13 @@ class GymAPI:
                 self.settings.set_bool("hide_completed_plans", hide_completed_plans)
             if quick_weight_increment is not None:
                 self.settings.set_float("quick_weight_increment", quick_weight_increment)
+            if prescription_estimator is not None:
+                self.settings.set_text("prescription_estimator", prescription_estimator)
+            if heart_rate_retention_days is not None:
+                self.settings.set_int(
+                    "heart_rate_retention_days", heart_rate_retention_days
+                )
+                self.start_retention()
             return {"status": "updated"}
 
         @self.app.get("/settings/bookmarks")
@@ -3421,8 +3736,131 @@ class GymAPI:
         self.app.include_router(muscle_groups_router)
 
 
+class TenantRouter:
+    """ASGI application routing each athlete to a dedicated SQLite database.
+
+    The athlete is taken from the ``X-Athlete-ID`` header or an
+    ``/athletes/{athlete}/`` path prefix. A :class:`GymAPI` is created on the
+    first request for an athlete and the least recently used instances are
+    evicted once ``max_tenants`` are loaded, so a single process serves many
+    athletes while sharing imports and a global connection limit.
+
+    ``max_tenants`` counts athletes, not memory. Loading an athlete sets up
+    its database file once and builds the repositories and services, but ML
+    models load on first use, charts render on a shared pool and the
+    retention thread only runs when a retention period is set.
+    """
+
+    HEADER = b"x-athlete-id"
+    PREFIX = "/athletes/"
+    TENANT_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+    def __init__(
+        self,
+        base_dir: str = "athletes",
+        *,
+        max_tenants: int = 32,
+        max_connections: int | None = 64,
+        **api_kwargs,
+    ) -> None:
+        if max_tenants <= 0:
+            raise ValueError("max_tenants must be positive")
+        self.base_dir = base_dir
+        self.max_tenants = max_tenants
+        self.api_kwargs = api_kwargs
+        self.max_connections = max_connections
+        self.tenants: "OrderedDict[str, GymAPI]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def db_path(self, tenant: str) -> str:
+        return os.path.join(self.base_dir, f"{tenant}.db")
+
+    def get_api(self, tenant: str) -> GymAPI:
+        """Return the API instance for ``tenant`` creating it on first use."""
+        if not self.TENANT_RE.match(tenant):
+            raise ValueError("invalid athlete id")
+        with self._lock:
+            api = self.tenants.get(tenant)
+            if api is not None:
+                self.tenants.move_to_end(tenant)
+                return api
+            if self.max_connections is not None and Database._connection_slots is None:
+                Database.limit_connections(self.max_connections)
+            os.makedirs(self.base_dir, exist_ok=True)
+            api = GymAPI(
+                db_path=self.db_path(tenant),
+                yaml_path=os.path.join(self.base_dir, f"{tenant}.yaml"),
+                **self.api_kwargs,
+            )
+            api.start_retention()
+            self.tenants[tenant] = api
+            while len(self.tenants) > self.max_tenants:
+                _name, evicted = self.tenants.popitem(last=False)
+                evicted.shutdown()
+            return api
+
+    def close(self) -> None:
+        """Shut down and drop every loaded tenant."""
+        with self._lock:
+            for api in self.tenants.values():
+                api.shutdown()
+            self.tenants.clear()
+
+    def _resolve(self, scope: dict) -> tuple[str | None, dict]:
+        path = scope.get("path", "")
+        if path.startswith(self.PREFIX):
+            tenant, _, rest = path[len(self.PREFIX) :].partition("/")
+            prefix = self.PREFIX + tenant
+            child = dict(scope)
+            child["path"] = "/" + rest
+            child["raw_path"] = child["path"].encode()
+            child["root_path"] = scope.get("root_path", "") + prefix
+            return tenant, child
+        for key, value in scope.get("headers", []):
+            if key == self.HEADER:
+                return value.decode(), scope
+        return None, scope
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await asyncio.to_thread(self.close)
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        tenant, child = self._resolve(scope)
+        if tenant is None:
+            await self._reject(scope, send, "athlete not specified")
+            return
+        try:
+            api = await asyncio.to_thread(self.get_api, tenant)
+        except ValueError as e:
+            await self._reject(scope, send, str(e))
+            return
+        await api.app(child, receive, send)
+
+    @staticmethod
+    async def _reject(scope, send, detail: str) -> None:
+        if scope["type"] == "websocket":
+            await send({"type": "websocket.close", "code": 1008})
+            return
+        body = json.dumps({"detail": detail}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 400,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
 api = GymAPI()
 app = api.app
+tenant_app = TenantRouter(os.environ.get("ATHLETE_DB_DIR", "athletes"))
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,4 +1,6 @@
-from pydantic import BaseModel, ValidationError
+from typing import Literal
+
+from pydantic import BaseModel, Field, ValidationError
 
 class SettingsSchema(BaseModel):
     theme: str = "light"
@@ -16,6 +18,8 @@ class SettingsSchema(BaseModel):
     hotkey_repeat_last_set: str = "r"
     show_est_1rm: bool = True
     show_help_tips: bool = False
+    prescription_estimator: Literal["full", "fast"] = "full"
+    heart_rate_retention_days: int = Field(0, ge=0)
 
 def validate_settings(data: dict) -> None:
     try:
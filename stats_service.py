@@ -1,6 +1,15 @@
 from __future__ import annotations
+import copy
 import datetime
-from typing import List, Optional, Dict
+import functools
+import inspect
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Dict, Iterable, Iterator
+import numpy as np
 from db import (
     SetRepository,
     ExerciseNameRepository,
@@ -12,6 +21,8 @@ from db import (
     StepCountRepository,
     GoalRepository,
     StatsCacheRepository,
+    PersonalRecordRepository,
+    PyramidTestLoader,
 )
 from ml_service import (
     VolumeModelService,
@@ -19,15 +30,436 @@ from ml_service import (
     ProgressModelService,
     InjuryRiskModelService,
     AdaptationModelService,
+    ModelTrainingQueue,
 )
 from algorithms.math_tools import MathTools
 from algorithms.exercise_progress_estimator import ExerciseProgressEstimator
 from algorithms.exercise_prescription import ExercisePrescription
+from algorithms.group_by import GroupBy
+from algorithms.forecaster import Forecaster
+from algorithms.downsampler import Downsampler
+from algorithms.timestamps import Timestamps
+from algorithms.workload import Workload
+from analytics_executor import AnalyticsExecutor
+from chart_service import ChartRenderer
+
+
+class HistoryFrame:
+    """Widest set history projection shared by statistics methods.
+
+    Rows hold ``reps, weight, rpe, date, exercise, equipment, start, end,
+    workout_id, location`` and :meth:`project` returns them in the layout
+    produced by :meth:`SetRepository.fetch_history_by_names`.
+    """
+
+    COLUMNS = (
+        "reps",
+        "weight",
+        "rpe",
+        "date",
+        "exercise",
+        "equipment",
+        "start",
+        "end",
+        "workout_id",
+        "location",
+    )
+
+    def __init__(self, rows: List[tuple]) -> None:
+        self.rows = rows
+        self._matrix: np.ndarray | None = None
+        self._cols: Dict[str, np.ndarray] = {}
+        self._groups: Dict[str, GroupBy] = {}
+
+    def column(self, name: str) -> np.ndarray:
+        """Return one history column as a NumPy array, built on first use."""
+        col = self._cols.get(name)
+        if col is not None:
+            return col
+        if self._matrix is None:
+            self._matrix = np.array(self.rows, dtype=object).reshape(
+                -1, len(self.COLUMNS)
+            )
+        if name == "volume":
+            col = self.column("reps") * self.column("weight")
+        else:
+            raw = self._matrix[:, self.COLUMNS.index(name)]
+            if name == "weight":
+                col = raw.astype(float)
+            elif name in ("reps", "rpe"):
+                col = raw.astype(float).astype(np.int64)
+            elif name == "workout_id":
+                col = raw.astype(np.int64)
+            else:
+                raw = raw.copy()
+                raw[raw == None] = ""  # noqa: E711
+                col = raw.astype(str)
+        self._cols[name] = col
+        return col
+
+    def timestamps(self, name: str) -> np.ndarray:
+        """Return the ``start`` or ``end`` column as ``datetime64[us]``."""
+        key = f"{name}_ts"
+        col = self._cols.get(key)
+        if col is None:
+            col = Timestamps.parse(self.column(name))
+            self._cols[key] = col
+        return col
+
+    def durations(self, default: float = np.nan) -> np.ndarray:
+        """Return set durations in seconds, ``default`` for untimed sets."""
+        seconds = Timestamps.seconds_between(
+            self.timestamps("start"), self.timestamps("end")
+        )
+        return np.where(np.isnan(seconds), default, seconds)
+
+    def group(self, name: str) -> GroupBy:
+        """Return a cached :class:`GroupBy` over ``name``.
+
+        ``week`` groups dates by ISO week.
+        """
+        group = self._groups.get(name)
+        if group is None:
+            if name == "week":
+                group = GroupBy.by_iso_week(self.column("date"))
+            else:
+                group = GroupBy(self.column(name))
+            self._groups[name] = group
+        return group
+
+    def project(
+        self,
+        equipment: Optional[Iterable[str]] = None,
+        with_equipment: bool = False,
+        with_duration: bool = False,
+        with_workout_id: bool = False,
+        with_location: bool = False,
+    ) -> List[tuple]:
+        rows = self.rows
+        if equipment:
+            allowed = set(equipment)
+            rows = [r for r in rows if r[5] in allowed]
+        idx = [0, 1, 2, 3]
+        if with_equipment:
+            idx += [4, 5]
+        if with_duration:
+            idx += [6, 7]
+        if with_workout_id:
+            idx.append(8)
+        if with_location:
+            idx.append(9)
+        return [tuple(r[i] for i in idx) for r in rows]
+
+    def subset(self, names: Iterable[str]) -> "HistoryFrame":
+        """Return a frame holding only the rows of exercises in ``names``."""
+        allowed = set(names)
+        return HistoryFrame([r for r in self.rows if r[4] in allowed])
+
+
+class CatalogIndex:
+    """In-memory equipment and exercise catalog lookups.
+
+    Built from four bulk queries and mirroring ``EquipmentRepository`` and
+    ``ExerciseCatalogRepository`` lookups without a connection per call.
+    """
+
+    TABLES = ("equipment", "muscles", "exercise_names", "exercise_catalog")
+
+    def __init__(self, repo: SetRepository) -> None:
+        muscle_names = dict(repo.fetch_all("SELECT name, canonical_name FROM muscles;"))
+        self.exercise_names = dict(
+            repo.fetch_all("SELECT name, canonical_name FROM exercise_names;")
+        )
+        self.equipment_muscles: Dict[str, List[str]] = {}
+        self.equipment_custom: Dict[str, int] = {}
+        for name, muscles, is_custom in repo.fetch_all(
+            "SELECT name, muscles, is_custom FROM equipment;"
+        ):
+            canon = [muscle_names.get(m, m) for m in muscles.split("|")]
+            self.equipment_muscles[name] = list(dict.fromkeys(canon))
+            self.equipment_custom[name] = int(is_custom)
+        self.exercise_groups: Dict[str, str] = dict(
+            repo.fetch_all("SELECT name, muscle_group FROM exercise_catalog;")
+        )
+
+    def canonical_exercise(self, name: str) -> str:
+        return self.exercise_names.get(name, name)
+
+    def muscles_for(self, equipment: str, hide_preconfigured: bool = False) -> List[str]:
+        """Return canonical muscles trained with ``equipment``."""
+        if hide_preconfigured and self.equipment_custom.get(equipment) == 0:
+            return []
+        return self.equipment_muscles.get(equipment, [])
+
+    def group_for(self, exercise: str) -> Optional[str]:
+        """Return the catalog muscle group of ``exercise`` or its canonical name."""
+        canonical = self.canonical_exercise(self.canonical_exercise(exercise))
+        return self.exercise_groups.get(canonical)
+
+
+class StatsMemo:
+    """Memoize statistics results by method, arguments and data version.
+
+    Results are kept in an in-memory LRU and, when a
+    :class:`StatsCacheRepository` is given, in SQLite so repeat views survive
+    restarts. Entries older than ``ttl`` seconds are ignored.
+    """
+
+    def __init__(
+        self,
+        store: StatsCacheRepository | None = None,
+        max_entries: int = 256,
+        ttl: float | None = None,
+    ) -> None:
+        self.store = store
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.store_hits = 0
+        self._entries: "OrderedDict[str, tuple[float, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def cached(*tables: str):
+        """Cache a :class:`StatisticsService` method on the versions of ``tables``."""
+
+        def decorator(func):
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            def wrapper(service: "StatisticsService", *args, **kwargs):
+                memo = service.memo
+                if memo is None:
+                    return func(service, *args, **kwargs)
+                bound = signature.bind(service, *args, **kwargs)
+                bound.apply_defaults()
+                arguments = list(bound.arguments.items())[1:]
+                key = json.dumps(
+                    [func.__name__, arguments, service._data_version(tables)],
+                    default=str,
+                )
+                found, value = memo.get(key)
+                if found:
+                    return value
+                value = func(service, *args, **kwargs)
+                memo.put(key, func.__name__, value)
+                return value
+
+            return wrapper
+
+        return decorator
+
+    def get(self, key: str) -> tuple[bool, object]:
+        """Return ``(found, value)`` for ``key``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self.ttl is None or time.time() - entry[0] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, copy.deepcopy(entry[1])
+                del self._entries[key]
+        if self.store is not None:
+            payload = self.store.fetch_result(key, self.ttl)
+            if payload is not None:
+                value = json.loads(payload)
+                self._remember(key, value)
+                with self._lock:
+                    self.hits += 1
+                    self.store_hits += 1
+                return True, copy.deepcopy(value)
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def put(self, key: str, method: str, value: object) -> None:
+        """Store ``value`` computed by ``method`` under ``key``."""
+        value = copy.deepcopy(value)
+        self._remember(key, value)
+        if self.store is None:
+            return
+        try:
+            payload = json.dumps(value)
+        except (TypeError, ValueError):
+            return
+        if json.loads(payload) == value:
+            self.store.save_result(key, method, payload, self.max_entries)
+
+    def _remember(self, key: str, value: object) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all in-memory entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> Dict[str, float]:
+        """Return entry count and hit/miss counters."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "store_hits": self.store_hits,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+class MetricGraph:
+    """Shared inputs of composite statistics.
+
+    ``inputs`` maps a derived metric to the metrics it reads. Input values
+    are cached by name, date range and data version, so metrics sharing an
+    input evaluate it once until the data changes. Inputs may be derived
+    metrics themselves and resolve through the same cache. Like
+    :class:`StatsMemo`, values are copied in and out of the cache so callers
+    may modify what they receive.
+    """
+
+    def __init__(self, inputs: Dict[str, tuple], max_entries: int = 64) -> None:
+        self.inputs = inputs
+        self.max_entries = max_entries
+        self.evaluations: Dict[str, int] = {}
+        self._values: "OrderedDict[tuple, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(
+        self, service: "StatisticsService", metric: str, *args
+    ) -> Dict[str, object]:
+        """Return the input values of ``metric`` for ``args``."""
+        version = service._data_version(service.STATS_TABLES + service.MODEL_TABLES)
+        return {
+            name: self.value(service, name, args, version)
+            for name in self.inputs[metric]
+        }
+
+    def value(
+        self, service: "StatisticsService", name: str, args: tuple, version: tuple
+    ) -> object:
+        """Return a copy of input ``name``, computing it on a cache miss."""
+        key = (name, args, version)
+        with self._lock:
+            if key in self._values:
+                self._values.move_to_end(key)
+                return copy.deepcopy(self._values[key])
+        value = getattr(service, name)(*args)
+        with self._lock:
+            self.evaluations[name] = self.evaluations.get(name, 0) + 1
+            self._values[key] = copy.deepcopy(value)
+            while len(self._values) > self.max_entries:
+                self._values.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self.evaluations.clear()
 
 
 class StatisticsService:
     """Compute workout statistics for analysis."""
 
+    HISTORY_TABLES = ("workouts", "exercises", "sets")
+    NAME_TABLES = ("exercise_names", "exercise_catalog")
+    STATS_TABLES = HISTORY_TABLES + NAME_TABLES + ("body_weight_logs",)
+    MODEL_TABLES = ("ml_models",)
+    PYRAMID_TABLES = PyramidTestLoader.TABLES
+    TRAINABLE_MODELS = ("readiness", "injury")
+    FRAME_CACHE_SIZE = 8
+    METRIC_INPUTS = {
+        "training_strain": ("weekly_load_variability", "training_monotony"),
+        "weekly_volume_change": ("weekly_load_variability",),
+        "overtraining_risk": (
+            "stress_overview",
+            "weekly_load_variability",
+            "workload_timeline",
+        ),
+        "injury_risk": (
+            "stress_overview",
+            "weekly_load_variability",
+            "workload_timeline",
+        ),
+        "adaptation_index": (
+            "stress_overview",
+            "weekly_load_variability",
+            "training_monotony",
+        ),
+        "readiness_stats": ("readiness",),
+    }
+    BATCH_METRICS = (
+        "adaptation_index",
+        "bmi",
+        "bmi_history",
+        "compare_progress",
+        "daily_muscle_group_volume",
+        "daily_volume",
+        "deload_recommendation",
+        "equipment_usage",
+        "exercise_diversity",
+        "exercise_frequency",
+        "exercise_history",
+        "exercise_summary",
+        "heart_rate_summary",
+        "heart_rate_workout_summary",
+        "heart_rate_zones",
+        "injury_risk",
+        "intensity_distribution",
+        "intensity_map",
+        "location_summary",
+        "moving_average_progress",
+        "muscle_engagement_3d",
+        "muscle_group_usage",
+        "muscle_progression",
+        "muscle_usage",
+        "overtraining_risk",
+        "overview",
+        "performance_momentum",
+        "personal_record_history",
+        "personal_records",
+        "plateau_score",
+        "power_history",
+        "progress_insights",
+        "progression",
+        "rating_distribution",
+        "rating_history",
+        "rating_stats",
+        "readiness",
+        "readiness_stats",
+        "relative_power_history",
+        "reps_distribution",
+        "rest_times",
+        "rpe_distribution",
+        "session_density",
+        "session_duration",
+        "session_efficiency",
+        "set_pace",
+        "step_summary",
+        "stress_balance",
+        "stress_overview",
+        "time_under_tension",
+        "training_monotony",
+        "training_strain",
+        "training_stress",
+        "training_type_summary",
+        "velocity_history",
+        "volume_forecast",
+        "volume_heatmap",
+        "weekly_load_variability",
+        "weekly_streak",
+        "weekly_volume_change",
+        "weight_forecast",
+        "weight_stats",
+        "wellness_summary",
+        "workload_timeline",
+        "workout_consistency",
+    )
+
     def __init__(
         self,
         set_repo: SetRepository,
@@ -47,6 +479,13 @@ class StatisticsService:
         step_repo: "StepCountRepository" | None = None,
         goal_repo: "GoalRepository" | None = None,
         cache_repo: "StatsCacheRepository" | None = None,
+        record_repo: "PersonalRecordRepository" | None = None,
+        pyramid_loader: PyramidTestLoader | None = None,
+        memo_size: int = 256,
+        memo_ttl: float | None = None,
+        training_queue: ModelTrainingQueue | None = None,
+        analytics: AnalyticsExecutor | None = None,
+        charts: ChartRenderer | None = None,
     ) -> None:
         self.sets = set_repo
         self.exercise_names = name_repo
@@ -65,14 +504,53 @@ class StatisticsService:
         self.step_counts = step_repo
         self.goals = goal_repo
         self.stats_cache = cache_repo
-        self._cache: dict[tuple, dict] = {}
+        self.records = record_repo
+        self.pyramid_loader = pyramid_loader
+        self.memo = (
+            StatsMemo(cache_repo, max_entries=memo_size, ttl=memo_ttl)
+            if memo_size > 0
+            else None
+        )
+        self.graph = MetricGraph(self.METRIC_INPUTS)
+        self.forecaster = Forecaster()
+        self.training = training_queue or ModelTrainingQueue()
+        self.analytics = analytics
+        self.charts = charts or ChartRenderer()
+        self._frames: "OrderedDict[tuple, HistoryFrame]" = OrderedDict()
+        self._names_cache: tuple[tuple, List[str]] | None = None
+        self._catalog_index: tuple[tuple, CatalogIndex] | None = None
+        self._frame_lock = threading.Lock()
 
     def clear_cache(self) -> None:
         """Clear any cached statistics."""
-        self._cache.clear()
+        if self.memo is not None:
+            self.memo.clear()
+        self.graph.clear()
+        self.forecaster.clear()
+        self.charts.clear()
+        with self._frame_lock:
+            self._frames.clear()
+            self._names_cache = None
+            self._catalog_index = None
         if self.stats_cache is not None:
             self.stats_cache.clear()
 
+    def _compute(self, func, *args, **kwargs):
+        """Run a CPU-bound kernel on the analytics pool when one is set."""
+        if self.analytics is None:
+            return func(*args, **kwargs)
+        return self.analytics.run(func, *args, **kwargs)
+
+    @staticmethod
+    def downsample(
+        rows: List[Dict[str, object]],
+        value_key: str,
+        max_points: int | None,
+        x_key: str = "date",
+    ) -> tuple[List[Dict[str, object]], bool]:
+        """Reduce a chart series to ``max_points`` with LTTB, keeping peaks."""
+        return Downsampler.sample(rows, x_key, value_key, max_points)
+
     def _current_body_weight(self) -> float:
         """Fetch the latest logged body weight or fallback to settings."""
         if self.body_weights is not None:
@@ -83,21 +561,196 @@ class StatisticsService:
             return self.settings.get_float("body_weight", 80.0)
         return 80.0
 
+    def _data_version(self, tables: Iterable[str]) -> tuple[int, ...]:
+        """Return versions of ``tables`` and the settings they depend on."""
+        if self.settings is not None:
+            self.settings.refresh()
+        return self.sets.data_version(*tables, "settings")
+
+    def _history_frame(
+        self,
+        names: Iterable[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> HistoryFrame:
+        """Return the shared history frame for ``names`` within the dates.
+
+        Frames are keyed by the name selection, the date range and the data
+        version of the set tables, so repeated metric calls reuse one query.
+        A cached frame covering more names for the same range is filtered
+        instead of querying again.
+        """
+        version = self.sets.data_version(*self.HISTORY_TABLES)
+        key = (tuple(sorted(set(names))), start_date, end_date, version)
+        wanted = set(key[0])
+        superset: HistoryFrame | None = None
+        with self._frame_lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                return frame
+            for other, cached in self._frames.items():
+                if other[1:] == key[1:] and wanted.issubset(other[0]):
+                    superset = cached
+                    break
+        if superset is not None:
+            frame = superset.subset(wanted)
+        else:
+            rows = self.sets.fetch_history_by_names(
+                list(key[0]),
+                start_date=start_date,
+                end_date=end_date,
+                with_equipment=True,
+                with_duration=True,
+                with_workout_id=True,
+                with_location=True,
+            )
+            frame = HistoryFrame(rows)
+        with self._frame_lock:
+            self._frames[key] = frame
+            while len(self._frames) > self.FRAME_CACHE_SIZE:
+                self._frames.popitem(last=False)
+        return frame
+
+    def batch(
+        self,
+        metrics: List[Dict[str, object] | str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Iterator[Dict[str, object]]:
+        """Compute several metrics from one shared history scan.
+
+        ``metrics`` holds ``{"metric": name, "key": label, "params": {...}}``
+        items or bare metric names; ``key`` defaults to the metric name and
+        the batch date range fills in ``start_date``/``end_date`` where a
+        metric accepts them.
+        All items are validated before anything runs. The returned iterator
+        yields ``{"key", "metric", "result", "elapsed_ms"}`` as each metric
+        finishes, with ``error`` instead of ``result`` when one fails.
+        """
+        plan = []
+        keys: set[str] = set()
+        for item in metrics:
+            if isinstance(item, str):
+                item = {"metric": item}
+            if not isinstance(item, dict):
+                raise ValueError(f"invalid metric item: {item!r}")
+            name = item.get("metric")
+            if not isinstance(name, str) or name not in self.BATCH_METRICS:
+                raise ValueError(f"unknown metric: {name}")
+            key = str(item.get("key") or name)
+            if key in keys:
+                raise ValueError(f"duplicate key: {key}")
+            keys.add(key)
+            params = item.get("params") or {}
+            if not isinstance(params, dict):
+                raise ValueError(f"{key}: params must be an object")
+            params = dict(params)
+            method = getattr(self, name)
+            signature = inspect.signature(method)
+            for field, value in (("start_date", start_date), ("end_date", end_date)):
+                if field in signature.parameters and value is not None:
+                    params.setdefault(field, value)
+            try:
+                bound = signature.bind(**params)
+            except TypeError as exc:
+                raise ValueError(f"{key}: {exc}") from exc
+            plan.append((key, name, method, bound))
+        return self._run_batch(plan, start_date, end_date)
+
+    def _run_batch(
+        self,
+        plan: List[tuple],
+        start_date: Optional[str],
+        end_date: Optional[str],
+    ) -> Iterator[Dict[str, object]]:
+        if plan:
+            self._history_frame(self._all_names(), start_date, end_date)
+        for key, name, method, bound in plan:
+            began = time.perf_counter()
+            item: Dict[str, object] = {"key": key, "metric": name}
+            try:
+                item["result"] = method(*bound.args, **bound.kwargs)
+            except Exception as exc:
+                item["error"] = str(exc)
+            item["elapsed_ms"] = round((time.perf_counter() - began) * 1000, 3)
+            yield item
+
+    def _timed_history(
+        self,
+        names: Iterable[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        **columns: bool,
+    ) -> tuple[List[tuple], np.ndarray]:
+        """Return ``with_duration`` history rows and their durations in seconds.
+
+        Timestamps are parsed once per history frame; untimed sets get ``NaN``.
+        """
+        frame = self._history_frame(names, start_date, end_date)
+        return frame.project(with_duration=True, **columns), frame.durations()
+
+    def _history(
+        self,
+        names: Iterable[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        equipment: Optional[List[str]] = None,
+        with_equipment: bool = False,
+        with_duration: bool = False,
+        with_workout_id: bool = False,
+        with_location: bool = False,
+    ) -> List[tuple]:
+        """Return history rows shaped like ``fetch_history_by_names``."""
+        frame = self._history_frame(names, start_date, end_date)
+        return frame.project(
+            equipment,
+            with_equipment=with_equipment,
+            with_duration=with_duration,
+            with_workout_id=with_workout_id,
+            with_location=with_location,
+        )
+
     @staticmethod
-    def _parse_timestamp(ts: str) -> datetime.datetime:
-        """Return ``ts`` as timezone-aware datetime in UTC."""
-        dt = datetime.datetime.fromisoformat(ts)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=datetime.timezone.utc)
-        return dt
+    def _volume_rows(
+        frame: HistoryFrame, key: str, label: str
+    ) -> List[Dict[str, float]]:
+        """Return ``{label, volume, sets}`` rows for each ``key`` group."""
+        group = frame.group(key)
+        totals = group.sum(frame.column("volume"))
+        counts = group.count()
+        return [
+            {label: str(k), "volume": round(float(v), 2), "sets": int(c)}
+            for k, v, c in zip(group.keys, totals, counts)
+        ]
+
+    def _catalog(self) -> CatalogIndex:
+        """Return the catalog index for the current catalog data version."""
+        version = self.sets.data_version(*CatalogIndex.TABLES)
+        cached = self._catalog_index
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        index = CatalogIndex(self.sets)
+        self._catalog_index = (version, index)
+        return index
 
     def _all_names(self) -> List[str]:
-        names = self.exercise_names.fetch_all()
-        if (
+        hide = (
             self.settings is not None
             and self.settings.get_bool("hide_preconfigured_exercises", False)
             and self.catalog is not None
-        ):
+        )
+        version = (self.sets.data_version(*self.NAME_TABLES), hide)
+        cached = self._names_cache
+        if cached is not None and cached[0] == version:
+            return list(cached[1])
+        names = self._load_all_names(hide)
+        self._names_cache = (version, names)
+        return list(names)
+
+    def _load_all_names(self, hide_preconfigured: bool) -> List[str]:
+        names = self.exercise_names.fetch_all()
+        if hide_preconfigured:
             filtered: list[str] = []
             for n in names:
                 detail = self.catalog.fetch_detail(n)
@@ -126,32 +779,47 @@ class StatisticsService:
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
     ) -> List[Dict[str, float]]:
+        frame = self._history_frame(self._alias_names(exercise), start_date, end_date)
+        rows = frame.project(with_equipment=True, with_duration=True)
+        velocities = self._set_velocities(frame).tolist()
+        return [self._history_entry(row, v) for row, v in zip(rows, velocities)]
+
+    def iter_exercise_history(
+        self,
+        exercise: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Iterator[Dict[str, float]]:
+        """Stream :meth:`exercise_history` entries from a database cursor."""
         names = self._alias_names(exercise)
-        rows = self.sets.fetch_history_by_names(
+        if not names:
+            return
+        rows = self.sets.iter_history_by_names(
             names,
             start_date=start_date,
             end_date=end_date,
             with_equipment=True,
             with_duration=True,
         )
-        history = []
-        for reps, weight, rpe, date, ex_name, eq_name, start, end in rows:
-            history.append(
-                {
-                    "exercise": ex_name,
-                    "equipment": eq_name,
-                    "date": date,
-                    "reps": int(reps),
-                    "weight": float(weight),
-                    "rpe": int(rpe),
-                    "volume": int(reps) * float(weight),
-                    "est_1rm": MathTools.epley_1rm(float(weight), int(reps)),
-                    "velocity": MathTools.estimate_velocity_from_set(
-                        int(reps), start, end
-                    ),
-                }
-            )
-        return history
+        for row in rows:
+            reps, start, end = row[0], row[6], row[7]
+            velocity = MathTools.estimate_velocity_from_set(int(reps), start, end)
+            yield self._history_entry(row, velocity)
+
+    @staticmethod
+    def _history_entry(row: tuple, velocity: float) -> Dict[str, float]:
+        reps, weight, rpe, date, ex_name, eq_name, _start, _end = row
+        return {
+            "exercise": ex_name,
+            "equipment": eq_name,
+            "date": date,
+            "reps": int(reps),
+            "weight": float(weight),
+            "rpe": int(rpe),
+            "volume": int(reps) * float(weight),
+            "est_1rm": MathTools.epley_1rm(float(weight), int(reps)),
+            "velocity": velocity,
+        }
 
     def exercise_summary(
         self,
@@ -160,48 +828,32 @@ class StatisticsService:
         end_date: Optional[str] = None,
     ) -> List[Dict[str, float]]:
         names = self._alias_names(exercise)
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_equipment=True,
+        frame = self._history_frame(names, start_date, end_date)
+        group = frame.group("exercise")
+        est = frame.column("weight") * (
+            1 + MathTools.EPL_COEFF * np.minimum(frame.column("reps"), 8)
         )
-        stats: Dict[str, Dict[str, float]] = {}
-        for reps, weight, rpe, date, ex_name, _ in rows:
-            item = stats.setdefault(
-                ex_name,
-                {
-                    "volume": 0.0,
-                    "rpe_total": 0.0,
-                    "count": 0,
-                    "max_1rm": 0.0,
-                },
-            )
-            vol = int(reps) * float(weight)
-            item["volume"] += vol
-            item["rpe_total"] += int(rpe)
-            item["count"] += 1
-            est = MathTools.epley_1rm(float(weight), int(reps))
-            if est > item["max_1rm"]:
-                item["max_1rm"] = est
-        result = []
-        for name, data in stats.items():
-            result.append(
-                {
-                    "exercise": name,
-                    "volume": round(data["volume"], 2),
-                    "avg_rpe": round(data["rpe_total"] / data["count"], 2),
-                    "max_1rm": round(data["max_1rm"], 2),
-                    "sets": int(data["count"]),
-                }
-            )
-        return sorted(result, key=lambda x: x["exercise"])
+        volume = group.sum(frame.column("volume"))
+        avg_rpe = group.mean(frame.column("rpe"))
+        max_1rm = np.maximum(group.max(est), 0.0)
+        counts = group.count()
+        return [
+            {
+                "exercise": str(name),
+                "volume": round(float(volume[i]), 2),
+                "avg_rpe": round(float(avg_rpe[i]), 2),
+                "max_1rm": round(float(max_1rm[i]), 2),
+                "sets": int(counts[i]),
+            }
+            for i, name in enumerate(group.keys)
+        ]
 
     def progression(
         self,
         exercise: str,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
+        max_points: int | None = None,
     ) -> List[Dict[str, float]]:
         history = self.exercise_history(exercise, start_date, end_date)
         by_date: Dict[str, float] = {}
@@ -210,7 +862,8 @@ class StatisticsService:
             est = item["est_1rm"]
             if date not in by_date or est > by_date[date]:
                 by_date[date] = est
-        return [{"date": d, "est_1rm": round(by_date[d], 2)} for d in sorted(by_date)]
+        result = [{"date": d, "est_1rm": round(by_date[d], 2)} for d in sorted(by_date)]
+        return self.downsample(result, "est_1rm", max_points)[0]
 
     def muscle_progression(
         self,
@@ -226,7 +879,7 @@ class StatisticsService:
         for n in names:
             all_names.extend(self.exercise_names.aliases(n))
         uniq = sorted(dict.fromkeys(all_names))
-        rows = self.sets.fetch_history_by_names(
+        rows = self._history(
             uniq,
             start_date=start_date,
             end_date=end_date,
@@ -244,30 +897,13 @@ class StatisticsService:
         self,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
+        max_points: int | None = None,
     ) -> List[Dict[str, float]]:
         """Return total volume and set count per day."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-        )
-        by_date: Dict[str, Dict[str, float]] = {}
-        for reps, weight, _rpe, date in rows:
-            entry = by_date.setdefault(date, {"volume": 0.0, "sets": 0})
-            entry["volume"] += int(reps) * float(weight)
-            entry["sets"] += 1
-        result = []
-        for d in sorted(by_date):
-            data = by_date[d]
-            result.append(
-                {
-                    "date": d,
-                    "volume": round(data["volume"], 2),
-                    "sets": data["sets"],
-                }
-            )
-        return result
+        frame = self._history_frame(names, start_date, end_date)
+        result = self._volume_rows(frame, "date", "date")
+        return self.downsample(result, "volume", max_points)[0]
 
     def daily_muscle_group_volume(
         self,
@@ -283,23 +919,8 @@ class StatisticsService:
         for n in names:
             all_names.extend(self.exercise_names.aliases(n))
         uniq = sorted(dict.fromkeys(all_names))
-        rows = self.sets.fetch_history_by_names(
-            uniq,
-            start_date=start_date,
-            end_date=end_date,
-        )
-        by_date: Dict[str, Dict[str, float]] = {}
-        for reps, weight, _rpe, date in rows:
-            entry = by_date.setdefault(date, {"volume": 0.0, "sets": 0})
-            entry["volume"] += int(reps) * float(weight)
-            entry["sets"] += 1
-        result: List[Dict[str, float]] = []
-        for d in sorted(by_date):
-            data = by_date[d]
-            result.append(
-                {"date": d, "volume": round(data["volume"], 2), "sets": data["sets"]}
-            )
-        return result
+        frame = self._history_frame(uniq, start_date, end_date)
+        return self._volume_rows(frame, "date", "date")
 
     def workouts_by_muscle_group(self, muscle_group: str) -> list[int]:
         """Return workout IDs containing exercises for the given muscle group."""
@@ -310,7 +931,7 @@ class StatisticsService:
         for n in names:
             all_names.extend(self.exercise_names.aliases(n))
         uniq = sorted(dict.fromkeys(all_names))
-        rows = self.sets.fetch_history_by_names(uniq, with_workout_id=True)
+        rows = self._history(uniq, with_workout_id=True)
         ids = sorted({r[-1] for r in rows})
         return ids
 
@@ -322,26 +943,14 @@ class StatisticsService:
     ) -> Dict[str, float]:
         """Return deload trigger and score for ``exercise``."""
         names = self._alias_names(exercise)
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_duration=True,
-        )
+        rows, secs = self._timed_history(names, start_date, end_date)
         if not rows:
             return {"trigger": 0.0, "score": 0.0}
 
         weights = [float(r[1]) for r in rows]
         reps = [int(r[0]) for r in rows]
         rpe_scores = [int(r[2]) for r in rows]
-        durations: List[float] = []
-        for _r, _w, _rpe, _date, start, end in rows:
-            if start and end:
-                t0 = self._parse_timestamp(start)
-                t1 = self._parse_timestamp(end)
-                durations.append((t1 - t0).total_seconds())
-            else:
-                durations.append(50.0)
+        durations = np.where(np.isnan(secs), 50.0, secs).tolist()
 
         times = list(range(len(rows)))
         perf = ExercisePrescription._performance_scores_from_logs(
@@ -373,6 +982,7 @@ class StatisticsService:
             "score": round(score, 2),
         }
 
+    @StatsMemo.cached(*STATS_TABLES, *PYRAMID_TABLES)
     def progress_forecast(
         self,
         exercise: str,
@@ -381,7 +991,7 @@ class StatisticsService:
     ) -> List[Dict[str, float]]:
         """Predict 1RM progression for ``exercise`` over future weeks."""
         names = self._alias_names(exercise)
-        rows = self.sets.fetch_history_by_names(names)
+        rows = self._history(names)
         if not rows:
             return []
 
@@ -395,8 +1005,10 @@ class StatisticsService:
         )
         workouts_per_month = float(len(set(times)))
         body_weight = self._current_body_weight()
+        pyramid = self.pyramid_loader(exercise) if self.pyramid_loader else None
 
-        base = ExerciseProgressEstimator.predict_progress(
+        base = self._compute(
+            ExerciseProgressEstimator.predict_progress,
             weights,
             reps,
             times,
@@ -406,6 +1018,8 @@ class StatisticsService:
             body_weight=body_weight,
             months_active=months_active,
             workouts_per_month=workouts_per_month,
+            exercise_name=exercise,
+            pyramid_tests=pyramid,
         )
 
         if self.progress_model is None:
@@ -472,37 +1086,24 @@ class StatisticsService:
     ) -> List[Dict[str, float]]:
         """Return volume and set count per equipment."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_equipment=True,
-        )
-        stats: Dict[str, Dict[str, float]] = {}
-        for reps, weight, _rpe, _date, _ex_name, eq_name in rows:
-            if not eq_name:
-                continue
-            if (
-                self.settings is not None
-                and self.settings.get_bool("hide_preconfigured_equipment", False)
-                and self.equipment is not None
-            ):
-                detail = self.equipment.fetch_detail(eq_name)
+        frame = self._history_frame(names, start_date, end_date)
+        result = [
+            item
+            for item in self._volume_rows(frame, "equipment", "equipment")
+            if item["equipment"]
+        ]
+        if (
+            self.settings is not None
+            and self.settings.get_bool("hide_preconfigured_equipment", False)
+            and self.equipment is not None
+        ):
+            visible = []
+            for item in result:
+                detail = self.equipment.fetch_detail(item["equipment"])
                 if detail is not None and detail[2] == 0:
                     continue
-            item = stats.setdefault(eq_name, {"volume": 0.0, "sets": 0})
-            item["volume"] += int(reps) * float(weight)
-            item["sets"] += 1
-        result = []
-        for eq in sorted(stats):
-            data = stats[eq]
-            result.append(
-                {
-                    "equipment": eq,
-                    "volume": round(data["volume"], 2),
-                    "sets": data["sets"],
-                }
-            )
+                visible.append(item)
+            result = visible
         return result
 
     def recent_equipment(self, limit: int = 5) -> list[str]:
@@ -532,40 +1133,39 @@ class StatisticsService:
         if self.equipment is None:
             return []
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_equipment=True,
+        frame = self._history_frame(names, start_date, end_date)
+        index = self._catalog()
+        hide = self.settings is not None and self.settings.get_bool(
+            "hide_preconfigured_equipment", False
         )
-        stats: Dict[str, Dict[str, float]] = {}
-        for reps, weight, _rpe, _date, _ex_name, eq_name in rows:
-            if not eq_name:
-                continue
-            if (
-                self.settings is not None
-                and self.settings.get_bool("hide_preconfigured_equipment", False)
-                and self.equipment is not None
-            ):
-                detail = self.equipment.fetch_detail(eq_name)
-                if detail is not None and detail[2] == 0:
-                    continue
-            muscles = self.equipment.fetch_muscles(eq_name)
-            for m in muscles:
-                item = stats.setdefault(m, {"volume": 0.0, "sets": 0})
-                item["volume"] += int(reps) * float(weight)
-                item["sets"] += 1
-        result = []
-        for mus in sorted(stats):
-            data = stats[mus]
-            result.append(
-                {
-                    "muscle": mus,
-                    "volume": round(data["volume"], 2),
-                    "sets": data["sets"],
-                }
-            )
-        return result
+        equipment = frame.group("equipment")
+        per_eq = [
+            index.muscles_for(str(eq), hide) if eq else [] for eq in equipment.keys
+        ]
+        muscles = sorted({m for ms in per_eq for m in ms})
+        if not muscles:
+            return []
+        code = {m: i for i, m in enumerate(muscles)}
+        counts = np.array([len(ms) for ms in per_eq], dtype=np.int64)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        flat = np.array([code[m] for ms in per_eq for m in ms], dtype=np.int64)
+        # Expand each set into one entry per muscle, keeping row order so
+        # every muscle total accumulates exactly like a sequential loop.
+        row_counts = counts[equipment.codes]
+        rows = np.repeat(np.arange(len(row_counts)), row_counts)
+        offsets = np.arange(len(rows)) - np.repeat(
+            np.cumsum(row_counts) - row_counts, row_counts
+        )
+        target = flat[starts[equipment.codes[rows]] + offsets]
+        volume = np.bincount(
+            target, weights=frame.column("volume")[rows], minlength=len(muscles)
+        )
+        sets = np.bincount(target, minlength=len(muscles))
+        return [
+            {"muscle": m, "volume": round(float(volume[i]), 2), "sets": int(sets[i])}
+            for i, m in enumerate(muscles)
+            if sets[i]
+        ]
 
     def muscle_group_usage(
         self,
@@ -576,33 +1176,26 @@ class StatisticsService:
         if self.catalog is None:
             return []
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_equipment=True,
+        frame = self._history_frame(names, start_date, end_date)
+        index = self._catalog()
+        exercises = frame.group("exercise")
+        per_ex = [index.group_for(str(ex)) for ex in exercises.keys]
+        groups = sorted({g for g in per_ex if g is not None})
+        code = {g: i for i, g in enumerate(groups)}
+        ex_group = np.array(
+            [code.get(g, -1) if g is not None else -1 for g in per_ex], dtype=np.int64
         )
-        stats: Dict[str, Dict[str, float]] = {}
-        for reps, weight, _rpe, _date, ex_name, _eq in rows:
-            canonical = self.exercise_names.canonical(ex_name)
-            detail = self.catalog.fetch_detail(canonical)
-            if detail is None:
-                continue
-            group = detail[0]
-            item = stats.setdefault(group, {"volume": 0.0, "sets": 0})
-            item["volume"] += int(reps) * float(weight)
-            item["sets"] += 1
-        result = []
-        for group in sorted(stats):
-            data = stats[group]
-            result.append(
-                {
-                    "muscle_group": group,
-                    "volume": round(data["volume"], 2),
-                    "sets": data["sets"],
-                }
-            )
-        return result
+        target = ex_group[exercises.codes]
+        mask = target >= 0
+        volume = np.bincount(
+            target[mask], weights=frame.column("volume")[mask], minlength=len(groups)
+        )
+        sets = np.bincount(target[mask], minlength=len(groups))
+        return [
+            {"muscle_group": g, "volume": round(float(volume[i]), 2), "sets": int(sets[i])}
+            for i, g in enumerate(groups)
+            if sets[i]
+        ]
 
     def muscle_engagement_3d(
         self, start_date: str | None = None, end_date: str | None = None
@@ -632,19 +1225,12 @@ class StatisticsService:
     ) -> List[Dict[str, int]]:
         """Return a distribution of RPE values for the given exercise."""
         names = self._alias_names(exercise)
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-        )
-        dist: Dict[int, int] = {}
-        for _reps, _weight, rpe, _date in rows:
-            key = int(rpe)
-            dist[key] = dist.get(key, 0) + 1
-        result = []
-        for r in sorted(dist):
-            result.append({"rpe": r, "count": dist[r]})
-        return result
+        frame = self._history_frame(names, start_date, end_date)
+        group = frame.group("rpe")
+        return [
+            {"rpe": int(k), "count": int(c)}
+            for k, c in zip(group.keys, group.count())
+        ]
 
     def reps_distribution(
         self,
@@ -654,19 +1240,12 @@ class StatisticsService:
     ) -> List[Dict[str, int]]:
         """Return a distribution of repetition counts."""
         names = self._alias_names(exercise)
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-        )
-        dist: Dict[int, int] = {}
-        for reps, _weight, _rpe, _date in rows:
-            key = int(reps)
-            dist[key] = dist.get(key, 0) + 1
-        result = []
-        for r in sorted(dist):
-            result.append({"reps": r, "count": dist[r]})
-        return result
+        frame = self._history_frame(names, start_date, end_date)
+        group = frame.group("reps")
+        return [
+            {"reps": int(k), "count": int(c)}
+            for k, c in zip(group.keys, group.count())
+        ]
 
     def intensity_distribution(
         self,
@@ -676,7 +1255,7 @@ class StatisticsService:
     ) -> List[Dict[str, float | int]]:
         """Return training volume and set count per intensity zone."""
         names = self._alias_names(exercise)
-        rows = self.sets.fetch_history_by_names(
+        rows = self._history(
             names,
             start_date=start_date,
             end_date=end_date,
@@ -743,52 +1322,24 @@ class StatisticsService:
         exercise: str,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
+        max_points: int | None = None,
     ) -> List[Dict[str, float]]:
         """Return average set velocity per day for ``exercise``."""
-        names = self._alias_names(exercise)
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_duration=True,
-        )
-        by_date: Dict[str, List[float]] = {}
-        for reps, _weight, _rpe, date, start, end in rows:
-            vel = MathTools.estimate_velocity_from_set(int(reps), start, end)
-            by_date.setdefault(date, []).append(vel)
-        result: List[Dict[str, float]] = []
-        for d in sorted(by_date):
-            vals = by_date[d]
-            avg = sum(vals) / len(vals) if vals else 0.0
-            result.append({"date": d, "velocity": round(avg, 2)})
-        return result
+        frame = self._history_frame(self._alias_names(exercise), start_date, end_date)
+        result = self._daily_means(frame, self._set_velocities(frame), "velocity")
+        return self.downsample(result, "velocity", max_points)[0]
 
     def power_history(
         self,
         exercise: str,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
+        max_points: int | None = None,
     ) -> List[Dict[str, float]]:
         """Return average power per day for ``exercise``."""
-        names = self._alias_names(exercise)
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_duration=True,
-        )
-        by_date: Dict[str, List[float]] = {}
-        for reps, weight, _rpe, date, start, end in rows:
-            power = MathTools.estimate_power_from_set(
-                int(reps), float(weight), start, end
-            )
-            by_date.setdefault(date, []).append(power)
-        result: List[Dict[str, float]] = []
-        for d in sorted(by_date):
-            vals = by_date[d]
-            avg = sum(vals) / len(vals) if vals else 0.0
-            result.append({"date": d, "power": round(avg, 2)})
-        return result
+        frame = self._history_frame(self._alias_names(exercise), start_date, end_date)
+        result = self._daily_means(frame, self._set_power(frame), "power")
+        return self.downsample(result, "power", max_points)[0]
 
     def relative_power_history(
         self,
@@ -800,25 +1351,33 @@ class StatisticsService:
         body_weight = self._current_body_weight()
         if body_weight <= 0:
             return []
-        names = self._alias_names(exercise)
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_duration=True,
+        frame = self._history_frame(self._alias_names(exercise), start_date, end_date)
+        relative = self._set_power(frame) / body_weight
+        return self._daily_means(frame, relative, "relative_power")
+
+    @staticmethod
+    def _set_velocities(frame: HistoryFrame) -> np.ndarray:
+        """Return the estimated mean velocity of every set in ``frame``."""
+        return MathTools.velocities_from_durations(
+            frame.column("reps"), frame.durations()
         )
-        by_date: Dict[str, List[float]] = {}
-        for reps, weight, _rpe, date, start, end in rows:
-            power = MathTools.estimate_power_from_set(
-                int(reps), float(weight), start, end
-            )
-            by_date.setdefault(date, []).append(power / body_weight)
-        result: List[Dict[str, float]] = []
-        for d in sorted(by_date):
-            vals = by_date[d]
-            avg = sum(vals) / len(vals) if vals else 0.0
-            result.append({"date": d, "relative_power": round(avg, 2)})
-        return result
+
+    @classmethod
+    def _set_power(cls, frame: HistoryFrame) -> np.ndarray:
+        """Return the estimated mechanical power of every set in ``frame``."""
+        return frame.column("weight") * 9.81 * cls._set_velocities(frame)
+
+    @staticmethod
+    def _daily_means(
+        frame: HistoryFrame, values: np.ndarray, label: str
+    ) -> List[Dict[str, float]]:
+        """Return ``{date, label}`` rows averaging ``values`` per day."""
+        group = frame.group("date")
+        means = group.sum(values) / group.count()
+        return [
+            {"date": str(d), label: round(float(m), 2)}
+            for d, m in zip(group.keys, means)
+        ]
 
     def overview(
         self,
@@ -827,12 +1386,11 @@ class StatisticsService:
     ) -> Dict[str, float]:
         """Return aggregated workout statistics."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
+        rows, secs = self._timed_history(
             names,
-            start_date=start_date,
-            end_date=end_date,
+            start_date,
+            end_date,
             with_equipment=True,
-            with_duration=True,
             with_workout_id=True,
         )
         if not rows:
@@ -842,15 +1400,14 @@ class StatisticsService:
         volume = 0.0
         rpe_total = 0.0
         durations: Dict[int, float] = {}
-        for reps, weight, rpe, _date, ex_name, _eq, start, end, wid in rows:
+        for row, sec in zip(rows, secs.tolist()):
+            reps, weight, rpe, _date, ex_name, _eq, _start, _end, wid = row
             workout_ids.add(wid)
             exercises.add(ex_name)
             volume += int(reps) * float(weight)
             rpe_total += int(rpe)
-            if start and end:
-                t0 = self._parse_timestamp(start)
-                t1 = self._parse_timestamp(end)
-                durations[wid] = durations.get(wid, 0.0) + (t1 - t0).total_seconds()
+            if not math.isnan(sec):
+                durations[wid] = durations.get(wid, 0.0) + sec
         avg_rpe = rpe_total / len(rows)
         total_duration = sum(durations.values())
         avg_density = MathTools.session_density(volume, total_duration)
@@ -862,6 +1419,24 @@ class StatisticsService:
             "avg_density": round(avg_density, 2),
         }
 
+    def _record_events(
+        self,
+        names: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Optional[List[tuple]]:
+        """Return indexed record events or ``None`` if the range needs a scan.
+
+        The index covers whole histories up to ``end_date``; a ``start_date``
+        after the first set of any selected exercise falls back to a scan.
+        """
+        if self.records is None or not self.records.indexed:
+            return None
+        events = self.records.fetch_events(names, end_date)
+        if start_date and events and start_date > events[0][1]:
+            return None
+        return events
+
     def personal_records(
         self,
         exercise: Optional[str] = None,
@@ -870,7 +1445,21 @@ class StatisticsService:
     ) -> List[Dict[str, float]]:
         """Return the best set for each exercise based on estimated 1RM."""
         names = self._alias_names(exercise)
-        rows = self.sets.fetch_history_by_names(
+        events = self._record_events(names, start_date, end_date)
+        if events is not None:
+            latest: Dict[str, Dict[str, float]] = {}
+            for ex_name, date, eq_name, reps, weight, rpe, est in events:
+                latest[ex_name] = {
+                    "exercise": ex_name,
+                    "date": date,
+                    "equipment": eq_name,
+                    "reps": int(reps),
+                    "weight": float(weight),
+                    "rpe": int(rpe),
+                    "est_1rm": round(est, 2),
+                }
+            return sorted(latest.values(), key=lambda x: x["exercise"])
+        rows = self._history(
             names,
             start_date=start_date,
             end_date=end_date,
@@ -900,16 +1489,25 @@ class StatisticsService:
     ) -> List[Dict[str, float]]:
         """Return chronological personal records with improvements."""
         names = self._alias_names(exercise)
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_equipment=True,
-        )
+        events = self._record_events(names, start_date, end_date)
+        if events is not None:
+            rows = [
+                (reps, weight, rpe, date, ex_name, eq_name, est)
+                for ex_name, date, eq_name, reps, weight, rpe, est in events
+            ]
+        else:
+            rows = [
+                (*row, MathTools.epley_1rm(float(row[1]), int(row[0])))
+                for row in self._history(
+                    names,
+                    start_date=start_date,
+                    end_date=end_date,
+                    with_equipment=True,
+                )
+            ]
         history: List[Dict[str, float]] = []
         best = 0.0
-        for reps, weight, rpe, date, ex_name, eq_name in rows:
-            est = MathTools.epley_1rm(float(weight), int(reps))
+        for reps, weight, rpe, date, ex_name, eq_name, est in rows:
             if est > best:
                 diff = est - best if best else 0.0
                 best = est
@@ -937,6 +1535,7 @@ class StatisticsService:
         )
         return recs[0] if recs else None
 
+    @StatsMemo.cached(*STATS_TABLES)
     def progress_insights(
         self,
         exercise: str,
@@ -951,8 +1550,10 @@ class StatisticsService:
         first = dates[0]
         ts = [(d - first).days for d in dates]
         rms = [float(p["est_1rm"]) for p in prog]
-        trend = ExercisePrescription._analyze_1rm_trends(ts, rms)
-        plateau = ExercisePrescription._pyramid_plateau_detection(ts, rms)
+        trend = self._compute(ExercisePrescription._analyze_1rm_trends, ts, rms)
+        plateau = self._compute(
+            ExercisePrescription._pyramid_plateau_detection, ts, rms
+        )
         trend["plateau_score"] = round(plateau, 2)
         return trend
 
@@ -964,7 +1565,7 @@ class StatisticsService:
     ) -> Dict[str, float]:
         """Return advanced plateau score for ``exercise``."""
         names = self._alias_names(exercise)
-        rows = self.sets.fetch_history_by_names(
+        rows = self._history(
             names,
             start_date=start_date,
             end_date=end_date,
@@ -979,11 +1580,12 @@ class StatisticsService:
         times = [(datetime.date.fromisoformat(d) - base).days for d in dates]
         perf = [MathTools.epley_1rm(w, r) for w, r in zip(weights, reps)]
         vols = [w * r for w, r in zip(weights, reps)]
-        score = ExercisePrescription._advanced_plateau_detection(
-            perf, times, rpes, vols
+        score = self._compute(
+            ExercisePrescription._advanced_plateau_detection, perf, times, rpes, vols
         )
         return {"score": round(score, 2)}
 
+    @StatsMemo.cached(*STATS_TABLES)
     def training_stress(
         self,
         start_date: Optional[str] = None,
@@ -991,73 +1593,32 @@ class StatisticsService:
     ) -> List[Dict[str, float]]:
         """Return daily training stress and cumulative fatigue values."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_duration=True,
-        )
+        rows, secs = self._timed_history(names, start_date, end_date)
         if not rows:
             return []
 
         weights: List[float] = []
         reps: List[int] = []
-        durs: List[float] = []
+        durs = np.where(np.isnan(secs), 50.0, secs).tolist()
         dates: List[str] = []
-        for r, w, _rpe, date, start, end in rows:
+        for r, w, _rpe, date, _start, _end in rows:
             weights.append(float(w))
-            reps.append(int(r))
-            if start and end:
-                t0 = self._parse_timestamp(start)
-                t1 = self._parse_timestamp(end)
-                durs.append((t1 - t0).total_seconds())
-            else:
-                durs.append(50.0)
-            dates.append(date)
-
-        uniq_dates = sorted(set(dates))
-        first = datetime.date.fromisoformat(dates[0])
-        ts_all = [(datetime.date.fromisoformat(d) - first).days for d in dates]
-
-        stress_map: Dict[str, float] = {d: 0.0 for d in uniq_dates}
-        for d, w, r, dur in zip(dates, weights, reps, durs):
-            rm = MathTools.epley_1rm(w, r)
-            val = ExercisePrescription._calculate_exercise_tss([w], [r], [dur], rm)
-            stress_map[d] += val
-
-        results: List[Dict[str, float]] = []
-        w_seen: List[float] = []
-        r_seen: List[int] = []
-        ts_seen: List[float] = []
-        dur_seen: List[float] = []
-        idx = 0
-        for d in uniq_dates:
-            while idx < len(dates) and dates[idx] == d:
-                w_seen.append(weights[idx])
-                r_seen.append(reps[idx])
-                ts_seen.append(ts_all[idx])
-                dur_seen.append(durs[idx])
-                idx += 1
-            current_rm = max(
-                [MathTools.epley_1rm(w, r) for w, r in zip(w_seen, r_seen)]
-            )
-            fatigue = ExercisePrescription._tss_adjusted_fatigue(
-                w_seen,
-                r_seen,
-                ts_seen,
-                dur_seen,
-                current_rm,
-            )
-            results.append(
-                {
-                    "date": d,
-                    "stress": round(stress_map[d], 2),
-                    "fatigue": round(fatigue, 2),
-                }
-            )
+            reps.append(int(r))
+            dates.append(date)
 
-        results.sort(key=lambda x: x["date"])
-        return results
+        first = datetime.date.fromisoformat(dates[0])
+        ts_all = [(datetime.date.fromisoformat(d) - first).days for d in dates]
+        days, stress, fatigue = ExercisePrescription._daily_tss_fatigue(
+            weights, reps, durs, ts_all
+        )
+        return [
+            {
+                "date": (first + datetime.timedelta(days=int(day))).isoformat(),
+                "stress": round(float(st), 2),
+                "fatigue": round(float(fat), 2),
+            }
+            for day, st, fat in zip(days, stress, fatigue)
+        ]
 
     def weekly_load_variability(
         self,
@@ -1065,7 +1626,7 @@ class StatisticsService:
         end_date: Optional[str] = None,
     ) -> Dict[str, object]:
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
+        rows = self._history(
             names,
             start_date=start_date,
             end_date=end_date,
@@ -1108,7 +1669,7 @@ class StatisticsService:
     ) -> Dict[str, float]:
         """Return training monotony value across the specified dates."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
+        rows = self._history(
             names,
             start_date=start_date,
             end_date=end_date,
@@ -1121,16 +1682,59 @@ class StatisticsService:
         val = ExercisePrescription._weekly_monotony(weights, reps)
         return {"monotony": round(val, 2)}
 
+    @StatsMemo.cached(*STATS_TABLES)
+    def workload_timeline(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        max_points: int | None = None,
+    ) -> List[Dict[str, float]]:
+        """Return daily load, acute:chronic ratios, monotony and strain.
+
+        Every calendar day between the first and last training day is
+        included, rest days with zero load.
+        """
+        frame = self._history_frame(self._all_names(), start_date, end_date)
+        group = frame.group("date")
+        days, loads = Workload.daily(group.keys, group.sum(frame.column("volume")))
+        curve = Workload().timeline(loads)
+        keys = ("acute", "chronic", "acwr", "rolling_acwr", "monotony", "strain")
+        columns = [curve[k].tolist() for k in keys]
+        result: List[Dict[str, float]] = []
+        for i, (day, load) in enumerate(zip(days.astype(str), loads.tolist())):
+            entry = {"date": str(day), "load": round(load, 2)}
+            for key, values in zip(keys, columns):
+                entry[key] = round(values[i], 2)
+            result.append(entry)
+        return self.downsample(result, "acwr", max_points)[0]
+
+    @staticmethod
+    def _latest_workload(timeline: List[Dict[str, float]]) -> Dict[str, float]:
+        """Return the latest ACWR, monotony and strain of ``timeline``.
+
+        Monotony needs a full week of days; shorter histories report 1.0.
+        """
+        if not timeline:
+            return {"acwr": 1.0, "monotony": 1.0, "strain": 0.0}
+        last = timeline[-1]
+        full = len(timeline) >= Workload().window
+        return {
+            "acwr": last["acwr"],
+            "monotony": last["monotony"] if full else 1.0,
+            "strain": last["strain"],
+        }
+
     def training_strain(
         self,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
     ) -> List[Dict[str, float]]:
         """Return weekly training strain values."""
-        variability = self.weekly_load_variability(start_date, end_date)
+        inputs = self.graph.resolve(self, "training_strain", start_date, end_date)
+        variability = inputs["weekly_load_variability"]
         if not variability["weeks"]:
             return []
-        monotony = self.training_monotony(start_date, end_date)["monotony"]
+        monotony = inputs["training_monotony"]["monotony"]
         var = variability["variability"]
         strain: List[Dict[str, float]] = []
         for week, volume in zip(variability["weeks"], variability["volumes"]):
@@ -1144,7 +1748,8 @@ class StatisticsService:
         end_date: Optional[str] = None,
     ) -> List[Dict[str, float]]:
         """Return week-over-week volume percentage change."""
-        variability = self.weekly_load_variability(start_date, end_date)
+        inputs = self.graph.resolve(self, "weekly_volume_change", start_date, end_date)
+        variability = inputs["weekly_load_variability"]
         weeks = variability["weeks"]
         volumes = variability["volumes"]
         if len(volumes) < 2:
@@ -1156,6 +1761,7 @@ class StatisticsService:
             result.append({"week": weeks[idx], "change": round(change, 2)})
         return result
 
+    @StatsMemo.cached(*STATS_TABLES)
     def stress_balance(
         self,
         start_date: Optional[str] = None,
@@ -1163,27 +1769,16 @@ class StatisticsService:
     ) -> List[Dict[str, float]]:
         """Return Training Stress Balance across dates."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_duration=True,
-        )
+        rows, secs = self._timed_history(names, start_date, end_date)
         if not rows:
             return []
         weights: List[float] = []
         reps: List[int] = []
-        durations: List[float] = []
+        durations = np.where(np.isnan(secs), 50.0, secs).tolist()
         dates: List[str] = []
-        for r, w, _rpe, date, start, end in rows:
+        for r, w, _rpe, date, _start, _end in rows:
             weights.append(float(w))
             reps.append(int(r))
-            if start and end:
-                t0 = self._parse_timestamp(start)
-                t1 = self._parse_timestamp(end)
-                durations.append((t1 - t0).total_seconds())
-            else:
-                durations.append(50.0)
             dates.append(date)
         base = datetime.date.fromisoformat(dates[0])
         times = [(datetime.date.fromisoformat(d) - base).days for d in dates]
@@ -1213,26 +1808,20 @@ class StatisticsService:
     ) -> List[Dict[str, float]]:
         """Return efficiency score per workout."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_duration=True,
-            with_workout_id=True,
+        rows, secs = self._timed_history(
+            names, start_date, end_date, with_workout_id=True
         )
         if not rows:
             return []
         by_workout: Dict[int, Dict[str, object]] = {}
-        for r, w, rpe, date, start, end, wid in rows:
+        for (r, w, rpe, date, _start, _end, wid), sec in zip(rows, secs.tolist()):
             entry = by_workout.setdefault(
                 wid,
                 {"date": date, "volume": 0.0, "dur": 0.0, "rpe": []},
             )
             entry["volume"] += int(r) * float(w)
-            if start and end:
-                t0 = self._parse_timestamp(start)
-                t1 = self._parse_timestamp(end)
-                entry["dur"] += (t1 - t0).total_seconds()
+            if not math.isnan(sec):
+                entry["dur"] += sec
             entry["rpe"].append(int(rpe))
         result: List[Dict[str, float]] = []
         for wid, data in sorted(by_workout.items()):
@@ -1255,25 +1844,19 @@ class StatisticsService:
     ) -> List[Dict[str, float]]:
         """Return volume per minute for each workout."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_duration=True,
-            with_workout_id=True,
+        rows, secs = self._timed_history(
+            names, start_date, end_date, with_workout_id=True
         )
         if not rows:
             return []
         by_workout: Dict[int, Dict[str, object]] = {}
-        for r, w, _rpe, date, start, end, wid in rows:
+        for (r, w, _rpe, date, _start, _end, wid), sec in zip(rows, secs.tolist()):
             entry = by_workout.setdefault(
                 wid, {"date": date, "volume": 0.0, "dur": 0.0}
             )
             entry["volume"] += int(r) * float(w)
-            if start and end:
-                t0 = self._parse_timestamp(start)
-                t1 = self._parse_timestamp(end)
-                entry["dur"] += (t1 - t0).total_seconds()
+            if not math.isnan(sec):
+                entry["dur"] += sec
         result: List[Dict[str, float]] = []
         for wid, data in sorted(by_workout.items()):
             density = MathTools.session_density(data["volume"], float(data["dur"]))
@@ -1289,23 +1872,17 @@ class StatisticsService:
     ) -> List[Dict[str, float]]:
         """Return sets per minute for each workout."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_duration=True,
-            with_workout_id=True,
+        rows, secs = self._timed_history(
+            names, start_date, end_date, with_workout_id=True
         )
         if not rows:
             return []
         by_workout: Dict[int, Dict[str, object]] = {}
-        for _r, _w, _rpe, date, start, end, wid in rows:
+        for (_r, _w, _rpe, date, _start, _end, wid), sec in zip(rows, secs.tolist()):
             entry = by_workout.setdefault(wid, {"date": date, "sets": 0, "dur": 0.0})
             entry["sets"] += 1
-            if start and end:
-                t0 = self._parse_timestamp(start)
-                t1 = self._parse_timestamp(end)
-                entry["dur"] += (t1 - t0).total_seconds()
+            if not math.isnan(sec):
+                entry["dur"] += sec
         result: List[Dict[str, float]] = []
         for wid, data in sorted(by_workout.items()):
             pace = MathTools.set_pace(int(data["sets"]), float(data["dur"]))
@@ -1321,32 +1898,27 @@ class StatisticsService:
     ) -> List[Dict[str, float]]:
         """Return average rest duration between sets per workout."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_duration=True,
-            with_workout_id=True,
+        frame = self._history_frame(names, start_date, end_date)
+        starts = frame.timestamps("start")
+        ends = frame.timestamps("end")
+        timed = ~(np.isnat(starts) | np.isnat(ends))
+        wids = frame.column("workout_id")[timed]
+        starts = starts[timed].astype(np.int64)
+        ends = ends[timed].astype(np.int64)
+        order = np.lexsort((starts, wids))
+        group = GroupBy(wids[order])
+        gaps = (starts[order][1:] - ends[order][:-1]) / 1e6
+        keep = (group.codes[1:] == group.codes[:-1]) & (gaps > 0)
+        codes = group.codes[1:][keep]
+        totals = np.bincount(codes, weights=gaps[keep], minlength=group.size)
+        counts = np.bincount(codes, minlength=group.size)
+        avg = np.divide(
+            totals, counts, out=np.zeros(group.size), where=counts > 0
         )
-        if not rows:
-            return []
-        by_workout: Dict[int, List[Tuple[str, str]]] = {}
-        for _r, _w, _rpe, _date, start, end, wid in rows:
-            if start and end:
-                by_workout.setdefault(wid, []).append((start, end))
-        result: List[Dict[str, float]] = []
-        for wid, times in sorted(by_workout.items()):
-            times_sorted = sorted(times, key=lambda t: t[0])
-            rests: List[float] = []
-            for i in range(1, len(times_sorted)):
-                prev_end = self._parse_timestamp(times_sorted[i - 1][1])
-                curr_start = self._parse_timestamp(times_sorted[i][0])
-                diff = (curr_start - prev_end).total_seconds()
-                if diff > 0:
-                    rests.append(diff)
-            avg = sum(rests) / len(rests) if rests else 0.0
-            result.append({"workout_id": wid, "avg_rest": round(avg, 2)})
-        return result
+        return [
+            {"workout_id": int(wid), "avg_rest": round(float(a), 2)}
+            for wid, a in zip(group.keys, avg)
+        ]
 
     def volume_heatmap(
         self,
@@ -1355,20 +1927,12 @@ class StatisticsService:
     ) -> List[Dict[str, float]]:
         """Return weekly training volume for heatmap charts."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-        )
-        by_week: Dict[str, float] = {}
-        for reps, weight, _rpe, date in rows:
-            d = datetime.date.fromisoformat(date)
-            key = f"{d.isocalendar()[0]}-W{d.isocalendar()[1]:02d}"
-            by_week[key] = by_week.get(key, 0.0) + int(reps) * float(weight)
-        result: List[Dict[str, float]] = []
-        for week in sorted(by_week):
-            result.append({"week": week, "volume": round(by_week[week], 2)})
-        return result
+        frame = self._history_frame(names, start_date, end_date)
+        group = frame.group("week")
+        return [
+            {"week": str(k), "volume": round(float(v), 2)}
+            for k, v in zip(group.keys, group.sum(frame.column("volume")))
+        ]
 
     def session_duration(
         self,
@@ -1377,39 +1941,26 @@ class StatisticsService:
     ) -> List[Dict[str, float]]:
         """Return total duration between first set start and last set finish."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_duration=True,
-            with_workout_id=True,
-        )
-        if not rows:
+        frame = self._history_frame(names, start_date, end_date)
+        starts = frame.timestamps("start")
+        ends = frame.timestamps("end")
+        idx = np.flatnonzero(~(np.isnat(starts) | np.isnat(ends)))
+        if not len(idx):
             return []
-        by_workout: Dict[int, Dict[str, str]] = {}
-        for _r, _w, _rpe, date, start, end, wid in rows:
-            if not start or not end:
-                continue
-            entry = by_workout.setdefault(
-                wid, {"date": date, "start": start, "end": end}
-            )
-            if start < entry["start"]:
-                entry["start"] = start
-            if end > entry["end"]:
-                entry["end"] = end
-        result: List[Dict[str, float]] = []
-        for wid, data in sorted(by_workout.items()):
-            t0 = self._parse_timestamp(data["start"])
-            t1 = self._parse_timestamp(data["end"])
-            dur = (t1 - t0).total_seconds()
-            result.append(
-                {
-                    "workout_id": wid,
-                    "date": data["date"],
-                    "duration": round(dur, 2),
-                }
+        group = GroupBy(frame.column("workout_id")[idx])
+        first_start = group.min(starts[idx].astype(np.int64))
+        last_end = group.max(ends[idx].astype(np.int64))
+        dates = frame.column("date")[idx[group.first()]]
+        return [
+            {
+                "workout_id": int(wid),
+                "date": str(date),
+                "duration": round(float(dur), 2),
+            }
+            for wid, date, dur in zip(
+                group.keys, dates, (last_end - first_start) / 1e6
             )
-        return result
+        ]
 
     def time_under_tension(
         self,
@@ -1418,34 +1969,21 @@ class StatisticsService:
     ) -> List[Dict[str, float]]:
         """Return total time under tension per workout."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_duration=True,
-            with_workout_id=True,
-        )
-        if not rows:
+        frame = self._history_frame(names, start_date, end_date)
+        secs = frame.durations()
+        idx = np.flatnonzero(~np.isnan(secs))
+        if not len(idx):
             return []
-        by_workout: Dict[int, Dict[str, float | str]] = {}
-        for _r, _w, _rpe, date, start, end, wid in rows:
-            if not start or not end:
-                continue
-            t0 = self._parse_timestamp(start)
-            t1 = self._parse_timestamp(end)
-            dur = (t1 - t0).total_seconds()
-            entry = by_workout.setdefault(wid, {"date": date, "tut": 0.0})
-            entry["tut"] += dur
-        result: List[Dict[str, float]] = []
-        for wid, data in sorted(by_workout.items()):
-            result.append(
-                {
-                    "workout_id": wid,
-                    "date": str(data["date"]),
-                    "tut": round(float(data["tut"]), 2),
-                }
-            )
-        return result
+        group = GroupBy(frame.column("workout_id")[idx])
+        dates = frame.column("date")[idx[group.first()]]
+        return [
+            {
+                "workout_id": int(wid),
+                "date": str(date),
+                "tut": round(float(tut), 2),
+            }
+            for wid, date, tut in zip(group.keys, dates, group.sum(secs[idx]))
+        ]
 
     def exercise_diversity(
         self,
@@ -1454,7 +1992,7 @@ class StatisticsService:
     ) -> List[Dict[str, float]]:
         """Return exercise diversity score per workout."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
+        rows = self._history(
             names,
             start_date=start_date,
             end_date=end_date,
@@ -1489,32 +2027,16 @@ class StatisticsService:
     ) -> List[Dict[str, float | int]]:
         """Return workout counts and volume grouped by location."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_workout_id=True,
-            with_location=True,
-        )
-        if not rows:
-            return []
-        stats: Dict[str, Dict[str, object]] = {}
-        for reps, weight, _rpe, _date, wid, location in rows:
-            loc = location or ""
-            entry = stats.setdefault(loc, {"volume": 0.0, "workouts": set()})
-            entry["volume"] += int(reps) * float(weight)
-            entry["workouts"].add(wid)
-        result: List[Dict[str, float | int]] = []
-        for loc in sorted(stats):
-            entry = stats[loc]
-            result.append(
-                {
-                    "location": loc,
-                    "workouts": len(entry["workouts"]),
-                    "volume": round(entry["volume"], 2),
-                }
+        frame = self._history_frame(names, start_date, end_date)
+        group = frame.group("location")
+        return [
+            {"location": str(k), "workouts": int(w), "volume": round(float(v), 2)}
+            for k, w, v in zip(
+                group.keys,
+                group.nunique(frame.column("workout_id")),
+                group.sum(frame.column("volume")),
             )
-        return result
+        ]
 
     def training_type_summary(
         self, start_date: Optional[str] = None, end_date: Optional[str] = None
@@ -1556,6 +2078,7 @@ class StatisticsService:
             )
         return result
 
+    @StatsMemo.cached(*STATS_TABLES)
     def stress_overview(
         self,
         start_date: Optional[str] = None,
@@ -1563,12 +2086,7 @@ class StatisticsService:
     ) -> Dict[str, float]:
         """Return overall stress and fatigue for the period."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_duration=True,
-        )
+        rows, secs = self._timed_history(names, start_date, end_date)
         if not rows:
             return {"stress": 0.0, "fatigue": 0.0}
 
@@ -1577,18 +2095,12 @@ class StatisticsService:
         reps: List[int] = []
         rpes: List[int] = []
         times: List[float] = []
-        durations: List[float] = []
-        for r, w, rpe, date, start, end in rows:
+        durations = np.where(np.isnan(secs), 50.0, secs).tolist()
+        for r, w, rpe, date, _start, _end in rows:
             weights.append(float(w))
             reps.append(int(r))
             rpes.append(int(rpe))
             times.append((datetime.date.fromisoformat(date) - base).days)
-            if start and end:
-                t0 = self._parse_timestamp(start)
-                t1 = self._parse_timestamp(end)
-                durations.append((t1 - t0).total_seconds())
-            else:
-                durations.append(50.0)
 
         current_rm = ExercisePrescription._current_1rm(weights, reps)
         stress = ExercisePrescription._stress_level(
@@ -1608,15 +2120,21 @@ class StatisticsService:
         )
         return {"stress": round(stress, 2), "fatigue": round(fatigue, 2)}
 
+    @StatsMemo.cached(*STATS_TABLES)
     def volume_forecast(
         self,
         days: int,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
+        method: str = "auto",
     ) -> List[Dict[str, float]]:
-        """Forecast daily training volume for upcoming days."""
+        """Forecast daily training volume for upcoming days.
+
+        The model is fitted once for the whole path; ``lower`` and ``upper``
+        bound the forecaster's prediction interval.
+        """
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
+        rows = self._history(
             names,
             start_date=start_date,
             end_date=end_date,
@@ -1633,52 +2151,82 @@ class StatisticsService:
         hist = [volumes[d] for d in ordered_dates]
         ts_last = (datetime.date.fromisoformat(ordered_dates[-1]) - base).days
 
+        key = (
+            "volume",
+            start_date,
+            end_date,
+            self.sets.data_version(*self.HISTORY_TABLES),
+        )
+        path = self.forecaster.forecast(hist, days, method=method, key=key)
+        use_model = (
+            self.volume_model is not None
+            and self.settings is not None
+            and self.settings.get_bool("ml_all_enabled", True)
+            and self.settings.get_bool("ml_prediction_enabled", True)
+            and self.settings.get_bool("ml_volume_prediction_enabled", True)
+        )
         vals = hist[:]
         result: List[Dict[str, float]] = []
-        for i in range(days):
-            next_arima = ExercisePrescription._arima_forecast(vals, steps=1)
-            features = vals[-3:] if len(vals) >= 3 else ([vals[-1]] * 3)
-            ml_pred = next_arima
-            if (
-                self.volume_model is not None
-                and self.settings is not None
-                and self.settings.get_bool("ml_all_enabled", True)
-                and self.settings.get_bool("ml_prediction_enabled", True)
-                and self.settings.get_bool("ml_volume_prediction_enabled", True)
-            ):
-                ml_pred = self.volume_model.predict(features, next_arima)
-            next_val = (next_arima + ml_pred) / 2
+        for i, (mean, lower, upper) in enumerate(
+            zip(path["mean"], path["lower"], path["upper"])
+        ):
+            next_val = mean
+            if use_model:
+                features = vals[-3:] if len(vals) >= 3 else ([vals[-1]] * 3)
+                next_val = (mean + self.volume_model.predict(features, mean)) / 2
             vals.append(next_val)
+            shift = next_val - mean
             day = base + datetime.timedelta(days=ts_last + i + 1)
-            result.append({"date": day.isoformat(), "volume": round(next_val, 2)})
+            result.append(
+                {
+                    "date": day.isoformat(),
+                    "volume": round(next_val, 2),
+                    "lower": round(lower + shift, 2),
+                    "upper": round(upper + shift, 2),
+                }
+            )
 
         return result
 
+    @StatsMemo.cached(*STATS_TABLES)
     def overtraining_risk(
         self,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
     ) -> Dict[str, float]:
         """Return an overtraining risk score for the period."""
-        overview = self.stress_overview(start_date, end_date)
-        variability = self.weekly_load_variability(start_date, end_date)
+        inputs = self.graph.resolve(self, "overtraining_risk", start_date, end_date)
+        overview = inputs["stress_overview"]
+        variability = inputs["weekly_load_variability"]
         risk = MathTools.overtraining_index(
             overview["stress"],
             overview["fatigue"],
             variability["variability"],
         )
-        return {"risk": round(risk, 2)}
+        workload = self._latest_workload(inputs["workload_timeline"])
+        factor = MathTools.workload_risk_factor(workload["acwr"], workload["monotony"])
+        risk = MathTools.clamp(risk * factor, 0.0, 10.0)
+        return {"risk": round(risk, 2), **workload}
+
+    def _injury_features(
+        self, start_date: Optional[str], end_date: Optional[str]
+    ) -> tuple[List[float], float, Dict[str, float]]:
+        """Return injury model features, the heuristic risk and the latest workload."""
+        inputs = self.graph.resolve(self, "injury_risk", start_date, end_date)
+        overview = inputs["stress_overview"]
+        variability = inputs["weekly_load_variability"]
+        features = [overview["stress"], overview["fatigue"], variability["variability"]]
+        base = MathTools.clamp(sum(features) / 3.0, 0.0, 10.0) / 10.0
+        return features, base, self._latest_workload(inputs["workload_timeline"])
 
+    @StatsMemo.cached(*STATS_TABLES, *MODEL_TABLES)
     def injury_risk(
         self,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
     ) -> Dict[str, float]:
         """Predict injury risk probability for the period."""
-        overview = self.stress_overview(start_date, end_date)
-        variability = self.weekly_load_variability(start_date, end_date)
-        features = [overview["stress"], overview["fatigue"], variability["variability"]]
-        base = MathTools.clamp(sum(features) / 3.0, 0.0, 10.0) / 10.0
+        features, base, workload = self._injury_features(start_date, end_date)
         risk = base
         if (
             self.injury_model is not None
@@ -1688,44 +2236,25 @@ class StatisticsService:
             and self.settings.get_bool("ml_injury_prediction_enabled", True)
         ):
             risk = self.injury_model.predict(features)
-        if (
-            self.injury_model is not None
-            and self.settings is not None
-            and self.settings.get_bool("ml_all_enabled", True)
-            and self.settings.get_bool("ml_training_enabled", True)
-            and self.settings.get_bool("ml_injury_training_enabled", True)
-        ):
-            self.injury_model.train(features, base)
-        return {"injury_risk": round(risk, 2)}
-
-    def readiness(
-        self,
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
-    ) -> List[Dict[str, float]]:
-        """Return daily readiness scores."""
+        factor = MathTools.workload_risk_factor(workload["acwr"], workload["monotony"])
+        risk = MathTools.clamp(risk * factor, 0.0, 1.0)
+        return {"injury_risk": round(risk, 2), **workload}
+
+    def _readiness_samples(
+        self, start_date: Optional[str], end_date: Optional[str]
+    ) -> List[tuple[str, float, float, float]]:
+        """Return ``(date, stress, fatigue, base readiness)`` per training day."""
         names = self._all_names()
-        rows = self.sets.fetch_history_by_names(
-            names,
-            start_date=start_date,
-            end_date=end_date,
-            with_duration=True,
-        )
-        if not rows:
-            return []
+        rows, secs = self._timed_history(names, start_date, end_date)
         by_date: Dict[str, Dict[str, list]] = {}
-        for r, w, rpe, date, start, end in rows:
+        durations = np.where(np.isnan(secs), 50.0, secs).tolist()
+        for (r, w, rpe, date, _start, _end), dur in zip(rows, durations):
             entry = by_date.setdefault(date, {"w": [], "r": [], "rpe": [], "d": []})
             entry["w"].append(float(w))
             entry["r"].append(int(r))
             entry["rpe"].append(int(rpe))
-            if start and end:
-                t0 = self._parse_timestamp(start)
-                t1 = self._parse_timestamp(end)
-                entry["d"].append((t1 - t0).total_seconds())
-            else:
-                entry["d"].append(50.0)
-        result: List[Dict[str, float]] = []
+            entry["d"].append(dur)
+        samples: List[tuple[str, float, float, float]] = []
         for d in sorted(by_date):
             data = by_date[d]
             current_rm = ExercisePrescription._current_1rm(data["w"], data["r"])
@@ -1741,31 +2270,107 @@ class StatisticsService:
                 data["w"], data["r"], list(range(len(data["w"]))), data["d"], current_rm
             )
             base_ready = MathTools.readiness_score(stress, fatigue / 1000)
-            ready_val = base_ready
-            if (
-                self.readiness_model is not None
-                and self.settings is not None
-                and self.settings.get_bool("ml_all_enabled", True)
-                and self.settings.get_bool("ml_prediction_enabled", True)
-                and self.settings.get_bool("ml_readiness_prediction_enabled", True)
-            ):
-                ready_val = self.readiness_model.predict(stress, fatigue, base_ready)
-            if (
-                self.readiness_model is not None
-                and self.settings is not None
-                and self.settings.get_bool("ml_all_enabled", True)
-                and self.settings.get_bool("ml_training_enabled", True)
-                and self.settings.get_bool("ml_readiness_training_enabled", True)
-            ):
-                self.readiness_model.train(stress, fatigue, base_ready)
-        result.append({"date": d, "readiness": round(ready_val, 2)})
-        return result
+            samples.append((d, stress, fatigue, base_ready))
+        return samples
+
+    @StatsMemo.cached(*STATS_TABLES, *MODEL_TABLES)
+    def readiness(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[Dict[str, float]]:
+        """Return daily readiness scores.
+
+        Model predictions for all days run in one batched forward pass and
+        never train the model; see :meth:`train_models`.
+        """
+        samples = self._readiness_samples(start_date, end_date)
+        values = [base for _d, _stress, _fatigue, base in samples]
+        if (
+            self.readiness_model is not None
+            and self.settings is not None
+            and self.settings.get_bool("ml_all_enabled", True)
+            and self.settings.get_bool("ml_prediction_enabled", True)
+            and self.settings.get_bool("ml_readiness_prediction_enabled", True)
+        ):
+            values = self.readiness_model.predict_many(
+                [stress for _d, stress, _f, _b in samples],
+                [fatigue for _d, _s, fatigue, _b in samples],
+                values,
+            )
+        return [
+            {"date": sample[0], "readiness": round(value, 2)}
+            for sample, value in zip(samples, values)
+        ]
+
+    def train_models(
+        self,
+        models: Iterable[str] = TRAINABLE_MODELS,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Dict[str, int]:
+        """Train the readiness and injury models on the period's history.
+
+        Returns the number of samples used per model. Models whose training
+        is disabled in the settings are skipped.
+        """
+        models = self._check_models(models)
+        if self.settings is None or not (
+            self.settings.get_bool("ml_all_enabled", True)
+            and self.settings.get_bool("ml_training_enabled", True)
+        ):
+            return {}
+        counts: Dict[str, int] = {}
+        if (
+            "readiness" in models
+            and self.readiness_model is not None
+            and self.settings.get_bool("ml_readiness_training_enabled", True)
+        ):
+            samples = self._readiness_samples(start_date, end_date)
+            counts["readiness"] = self.readiness_model.train_many(
+                (stress, fatigue, base) for _d, stress, fatigue, base in samples
+            )
+        if (
+            "injury" in models
+            and self.injury_model is not None
+            and self.settings.get_bool("ml_injury_training_enabled", True)
+        ):
+            features, base, _workload = self._injury_features(start_date, end_date)
+            counts["injury"] = self.injury_model.train_many([(features, base)])
+        return counts
+
+    def schedule_model_training(
+        self,
+        models: Iterable[str] = TRAINABLE_MODELS,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Dict[str, str]:
+        """Queue background training jobs, one per model and date range.
+
+        A job already pending for the same model and range is reused.
+        """
+        status: Dict[str, str] = {}
+        for model in self._check_models(models):
+            fresh = self.training.submit(
+                f"{model}:{start_date}:{end_date}",
+                functools.partial(self.train_models, (model,), start_date, end_date),
+            )
+            status[model] = "queued" if fresh else "pending"
+        return status
+
+    def _check_models(self, models: Iterable[str]) -> List[str]:
+        models = list(models)
+        for model in models:
+            if model not in self.TRAINABLE_MODELS:
+                raise ValueError(f"unknown model: {model}")
+        return models
 
     def readiness_stats(
         self, start_date: Optional[str] = None, end_date: Optional[str] = None
     ) -> Dict[str, float]:
         """Return average, min and max readiness for the period."""
-        history = self.readiness(start_date, end_date)
+        inputs = self.graph.resolve(self, "readiness_stats", start_date, end_date)
+        history = inputs["readiness"]
         if not history:
             return {"avg": 0.0, "min": 0.0, "max": 0.0}
         vals = [h["readiness"] for h in history]
@@ -1775,6 +2380,7 @@ class StatisticsService:
             "max": max(vals),
         }
 
+    @StatsMemo.cached(*STATS_TABLES)
     def performance_momentum(
         self,
         exercise: str,
@@ -1783,7 +2389,7 @@ class StatisticsService:
     ) -> Dict[str, float]:
         """Return a momentum score based on 1RM progression for ``exercise``."""
         names = self._alias_names(exercise)
-        rows = self.sets.fetch_history_by_names(
+        rows = self._history(
             names,
             start_date=start_date,
             end_date=end_date,
@@ -1805,15 +2411,17 @@ class StatisticsService:
         momentum = slope * (1 + change / len(ests)) * (1 + energy / 10)
         return {"momentum": round(momentum, 4)}
 
+    @StatsMemo.cached(*STATS_TABLES)
     def adaptation_index(
         self,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
     ) -> Dict[str, float]:
         """Return a multi-modal adaptation score."""
-        overview = self.stress_overview(start_date, end_date)
-        variability = self.weekly_load_variability(start_date, end_date)
-        monotony = self.training_monotony(start_date, end_date)
+        inputs = self.graph.resolve(self, "adaptation_index", start_date, end_date)
+        overview = inputs["stress_overview"]
+        variability = inputs["weekly_load_variability"]
+        monotony = inputs["training_monotony"]
         features = [
             MathTools.clamp(overview["stress"] / 10.0, 0.0, 1.0),
             MathTools.clamp(overview["fatigue"] / 10.0, 0.0, 1.0),
@@ -1846,45 +2454,34 @@ class StatisticsService:
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         unit: str = "kg",
+        max_points: int | None = None,
     ) -> List[Dict[str, float]]:
         if self.body_weights is None:
             return []
         rows = self.body_weights.fetch_history(start_date, end_date)
         factor = 2.20462 if unit == "lb" else 1.0
-        return [
+        result = [
             {"id": rid, "date": d, "weight": round(w * factor, 2)} for rid, d, w in rows
         ]
+        return self.downsample(result, "weight", max_points)[0]
 
+    @StatsMemo.cached("body_weight_logs")
     def weight_stats(
         self,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         unit: str = "kg",
     ) -> Dict[str, float]:
-        key = (start_date, end_date, unit)
-        if self.stats_cache is not None:
-            cached = self.stats_cache.fetch_weight_stats(start_date, end_date, unit)
-            if cached is not None:
-                self._cache[key] = cached
-                return cached
-        if key in self._cache:
-            return self._cache[key]
         history = self.body_weight_history(start_date, end_date, unit)
         if not history:
             result = {"avg": 0.0, "min": 0.0, "max": 0.0}
-            self._cache[key] = result
-            if self.stats_cache is not None:
-                self.stats_cache.save_weight_stats(
-                    start_date, end_date, unit, 0.0, 0.0, 0.0
-                )
-            return result
-        weights = [h["weight"] for h in history]
-        result = {
-            "avg": round(sum(weights) / len(weights), 2),
-            "min": min(weights),
-            "max": max(weights),
-        }
-        self._cache[key] = result
+        else:
+            weights = [h["weight"] for h in history]
+            result = {
+                "avg": round(sum(weights) / len(weights), 2),
+                "min": min(weights),
+                "max": max(weights),
+            }
         if self.stats_cache is not None:
             self.stats_cache.save_weight_stats(
                 start_date,
@@ -1970,23 +2567,30 @@ class StatisticsService:
             result.append({"date": d, "bmi": round(w / (height**2), 2)})
         return result
 
-    def weight_forecast(self, days: int) -> List[Dict[str, float]]:
-        """Return simple body weight forecast for ``days`` ahead."""
+    def weight_forecast(
+        self, days: int, method: str = "linear"
+    ) -> List[Dict[str, float]]:
+        """Return body weight forecast for ``days`` ahead.
+
+        ``linear`` extends the recency weighted trend from the last logged
+        weight; other :class:`Forecaster` methods are accepted as well.
+        """
         if days <= 0 or self.body_weights is None:
             return []
-        history = self.body_weight_history()
-        if len(history) < 2:
-            last = history[-1]["weight"] if history else 0.0
-            return [{"day": i, "weight": round(last, 2)} for i in range(1, days + 1)]
-        weights = [h["weight"] for h in history]
-        times = list(range(len(weights)))
-        wts = [i + 1 for i in times]
-        slope = ExercisePrescription._weighted_linear_regression(times, weights, wts)
-        last = weights[-1]
-        forecast: List[Dict[str, float]] = []
-        for i in range(1, days + 1):
-            forecast.append({"day": i, "weight": round(last + slope * i, 2)})
-        return forecast
+        weights = [h["weight"] for h in self.body_weight_history()]
+        key = ("weight", self.sets.data_version("body_weight_logs"))
+        path = self.forecaster.forecast(weights, days, method=method, key=key)
+        return [
+            {
+                "day": i,
+                "weight": round(mean, 2),
+                "lower": round(lower, 2),
+                "upper": round(upper, 2),
+            }
+            for i, (mean, lower, upper) in enumerate(
+                zip(path["mean"], path["lower"], path["upper"]), start=1
+            )
+        ]
 
     def wellness_history(
         self, start_date: str | None = None, end_date: str | None = None
@@ -2031,13 +2635,16 @@ class StatisticsService:
         }
 
     def heart_rate_history(
-        self, start_date: str | None = None, end_date: str | None = None
+        self,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        max_points: int | None = None,
     ) -> list[dict[str, int | str]]:
         """Return logged heart rate entries ordered by timestamp."""
         if self.heart_rates is None:
             return []
         rows = self.heart_rates.fetch_range(start_date, end_date)
-        return [
+        result = [
             {
                 "id": rid,
                 "workout_id": wid,
@@ -2046,29 +2653,60 @@ class StatisticsService:
             }
             for rid, wid, ts, hr in rows
         ]
+        return self.downsample(result, "heart_rate", max_points, "timestamp")[0]
 
     def heart_rate_summary(
         self, start_date: str | None = None, end_date: str | None = None
     ) -> dict[str, float]:
         """Return average, min and max heart rate for the range."""
-        history = self.heart_rate_history(start_date, end_date)
-        if not history:
+        if self.heart_rates is None:
             return {"avg": 0.0, "min": 0.0, "max": 0.0}
-        rates = [h["heart_rate"] for h in history]
+        rollups = self.heart_rates.fetch_workout_rollups(start_date, end_date)
+        if not rollups:
+            return {"avg": 0.0, "min": 0.0, "max": 0.0}
+        samples = sum(r[1] for r in rollups)
+        total = sum(r[1] * r[2] for r in rollups)
         return {
-            "avg": round(sum(rates) / len(rates), 2),
-            "min": float(min(rates)),
-            "max": float(max(rates)),
+            "avg": round(total / samples, 2),
+            "min": float(min(r[3] for r in rollups)),
+            "max": float(max(r[4] for r in rollups)),
         }
 
+    def heart_rate_workout_summary(
+        self, start_date: str | None = None, end_date: str | None = None
+    ) -> list[dict[str, float]]:
+        """Return sample count, average, min and max heart rate per workout."""
+        if self.heart_rates is None:
+            return []
+        return [
+            {
+                "workout_id": wid,
+                "samples": samples,
+                "avg": round(mean, 2),
+                "min": float(lo),
+                "max": float(hi),
+            }
+            for wid, samples, mean, lo, hi in self.heart_rates.fetch_workout_rollups(
+                start_date, end_date
+            )
+        ]
+
     def heart_rate_zones(
         self, start_date: str | None = None, end_date: str | None = None
     ) -> list[dict[str, float]]:
-        """Return distribution of heart rate measurements across intensity zones."""
-        history = self.heart_rate_history(start_date, end_date)
-        if not history:
+        """Return distribution of heart rate measurements across intensity zones.
+
+        ``count`` and ``percent`` refer to logged samples while ``seconds``
+        counts each logged minute once in the zone of its mean heart rate,
+        which keeps the time split independent of the sampling rate.
+        """
+        if self.heart_rates is None:
+            return []
+        histogram = self.heart_rates.fetch_histogram(start_date, end_date)
+        if not histogram:
             return []
-        max_hr = max(h["heart_rate"] for h in history)
+        minutes = self.heart_rates.fetch_minute_rollups(start_date, end_date)
+        max_hr = max(hr for hr, _n in histogram)
         boundaries = [0.6, 0.7, 0.8, 0.9]
         zones = []
         last = 0.0
@@ -2076,18 +2714,20 @@ class StatisticsService:
             zones.append((last, b))
             last = b
         zones.append((last, 1.01))
-        total = len(history)
+        total = sum(n for _hr, n in histogram)
         result: list[dict[str, float]] = []
         for idx, (lo, hi) in enumerate(zones, start=1):
             lo_val = lo * max_hr
             hi_val = hi * max_hr
-            count = sum(1 for h in history if lo_val <= h["heart_rate"] < hi_val)
+            count = sum(n for hr, n in histogram if lo_val <= hr < hi_val)
+            seconds = 60 * sum(1 for m in minutes if lo_val <= m[3] < hi_val)
             percent = count / total * 100.0 if total else 0.0
             result.append(
                 {
                     "zone": str(idx),
                     "count": count,
                     "percent": round(percent, 2),
+                    "seconds": seconds,
                 }
             )
         return result
@@ -2126,7 +2766,7 @@ class StatisticsService:
     ) -> list[dict[str, float]]:
         """Return weekly exercise frequency for each exercise."""
         names = self._alias_names(exercise)
-        rows = self.sets.fetch_history_by_names(
+        rows = self._history(
             names,
             start_date=start_date,
             end_date=end_date,
@@ -2223,6 +2863,31 @@ class StatisticsService:
             result.append({"date": dates[i], "moving_avg": round(avg, 2)})
         return result
 
+    def chart_key(self, kind: str, *args) -> tuple:
+        """Return the cache key of a rendered chart at the current data version."""
+        return (kind, args, self._data_version(self.STATS_TABLES))
+
+    def progression_chart(
+        self,
+        exercise: str,
+        start_date: str | None = None,
+        end_date: str | None = None,
+    ) -> tuple[bytes, str]:
+        """Return a cached PDF line chart of 1RM progression and its ETag."""
+
+        def load() -> Dict[str, object]:
+            data = self.progression(exercise, start_date, end_date)
+            return {
+                "title": f"{exercise} 1RM Progress",
+                "x": [d["date"] for d in data],
+                "y": [d["est_1rm"] for d in data],
+                "xlabel": "Date",
+                "ylabel": "Estimated 1RM",
+            }
+
+        key = self.chart_key("progression_pdf", exercise, start_date, end_date)
+        return self.charts.render(*key, load, ChartRenderer.line_pdf)
+
     def progression_chart_pdf(
         self,
         exercise: str,
@@ -2230,24 +2895,7 @@ class StatisticsService:
         end_date: str | None = None,
     ) -> bytes:
         """Return a PDF line chart of 1RM progression."""
-        data = self.progression(exercise, start_date, end_date)
-        if not data:
-            return b""
-        import matplotlib.pyplot as plt
-        from io import BytesIO
-
-        dates = [d["date"] for d in data]
-        values = [d["est_1rm"] for d in data]
-        plt.figure()
-        plt.plot(dates, values, marker="o")
-        plt.title(f"{exercise} 1RM Progress")
-        plt.xlabel("Date")
-        plt.ylabel("Estimated 1RM")
-        plt.tight_layout()
-        buf = BytesIO()
-        plt.savefig(buf, format="pdf")
-        plt.close()
-        return buf.getvalue()
+        return self.progression_chart(exercise, start_date, end_date)[0]
 
     def compare_progress(
         self,
@@ -2265,19 +2913,21 @@ class StatisticsService:
             result.append({"date": d, "difference": round(p1[d] - p2[d], 2)})
         return result
 
+    def workout_summary_chart(self, workout_id: int) -> tuple[bytes, str]:
+        """Return a cached PNG workout summary and its ETag."""
+
+        def load() -> List[str]:
+            summary = self.sets.workout_summary(workout_id)
+            return [
+                f"Workout {workout_id}",
+                f"Volume: {summary['volume']} kg",
+                f"Sets: {summary['sets']}",
+                f"Avg RPE: {summary['avg_rpe']}",
+            ]
+
+        key = self.chart_key("summary_png", workout_id)
+        return self.charts.render(*key, load, ChartRenderer.text_png)
+
     def workout_summary_image(self, workout_id: int) -> bytes:
         """Return PNG image summarizing workout volume, sets and avg RPE."""
-        summary = self.sets.workout_summary(workout_id)
-        from io import BytesIO
-        from PIL import Image, ImageDraw, ImageFont
-
-        img = Image.new("RGB", (400, 160), "white")
-        draw = ImageDraw.Draw(img)
-        font = ImageFont.load_default()
-        draw.text((10, 10), f"Workout {workout_id}", fill="black", font=font)
-        draw.text((10, 50), f"Volume: {summary['volume']} kg", fill="black", font=font)
-        draw.text((10, 80), f"Sets: {summary['sets']}", fill="black", font=font)
-        draw.text((10, 110), f"Avg RPE: {summary['avg_rpe']}", fill="black", font=font)
-        buf = BytesIO()
-        img.save(buf, format="PNG")
-        return buf.getvalue()
+        return self.workout_summary_chart(workout_id)[0]
@@ -52,6 +52,7 @@ from db import (
     SettingsRepository,
     PyramidTestRepository,
     PyramidEntryRepository,
+    PyramidTestLoader,
     GamificationRepository,
     MLModelRepository,
     MLLogRepository,
@@ -71,6 +72,7 @@ from db import (
     NotificationRepository,
     ChallengeRepository,
     StatsCacheRepository,
+    PersonalRecordRepository,
 )
 from planner_service import PlannerService
 from recommendation_service import RecommendationService
@@ -201,6 +203,8 @@ class LayoutManager:
 class GymApp:
     """Streamlit application for workout logging."""
 
+    CHART_MAX_POINTS = 500
+
     def __init__(
         self, db_path: str = "workout.db", yaml_path: str = "settings.yaml"
     ) -> None:
@@ -311,10 +315,11 @@ class GymApp:
         self.challenges_repo = ChallengeRepository(db_path)
         self.pyramid_tests = PyramidTestRepository(db_path)
         self.pyramid_entries = PyramidEntryRepository(db_path)
+        self.pyramid_loader = PyramidTestLoader(self.pyramid_tests)
         self.game_repo = GamificationRepository(db_path)
         self.ml_models = MLModelRepository(db_path)
-        self.ml_logs = MLLogRepository(db_path)
-        self.ml_status = MLModelStatusRepository(db_path)
+        self.ml_logs = MLLogRepository(db_path, buffered=True)
+        self.ml_status = MLModelStatusRepository(db_path, buffered=True)
         self.notifications_repo = NotificationRepository(db_path)
         self.autoplan_logs = AutoPlannerLogRepository(db_path)
         self.prescription_logs = ExercisePrescriptionLogRepository(db_path)
@@ -323,6 +328,7 @@ class GymApp:
         self.heart_rates = HeartRateRepository(db_path)
         self.step_counts = StepCountRepository(db_path)
         self.stats_cache_repo = StatsCacheRepository(db_path)
+        self.records_repo = PersonalRecordRepository(db_path)
         self.gamification = GamificationService(
             self.game_repo,
             self.exercises,
@@ -358,6 +364,7 @@ class GymApp:
             self.goals_repo,
             self.wellness_repo,
             prescription_log_repo=self.prescription_logs,
+            pyramid_loader=self.pyramid_loader,
         )
         self.planner = PlannerService(
             self.workouts,
@@ -392,6 +399,8 @@ class GymApp:
             self.step_counts,
             self.goals_repo,
             cache_repo=self.stats_cache_repo,
+            record_repo=self.records_repo,
+            pyramid_loader=self.pyramid_loader,
         )
         self._state_init()
 
@@ -5756,7 +5765,9 @@ class GymApp:
         )
         with over_tab:
             self._responsive_table(summary)
-            daily = self.stats.daily_volume(start_str, end_str)
+            daily = self.stats.daily_volume(
+                start_str, end_str, max_points=self.CHART_MAX_POINTS
+            )
             if daily:
                 self._line_chart(
                     {"Volume": [d["volume"] for d in daily]},
@@ -5803,8 +5814,12 @@ class GymApp:
                 st.bar_chart(df["volume"], use_container_width=True)
         with prog_tab:
             if ex_choice:
-                prog = self.stats.progression(ex_choice, start_str, end_str)
-                vel_hist = self.stats.velocity_history(ex_choice, start_str, end_str)
+                prog = self.stats.progression(
+                    ex_choice, start_str, end_str, max_points=self.CHART_MAX_POINTS
+                )
+                vel_hist = self.stats.velocity_history(
+                    ex_choice, start_str, end_str, max_points=self.CHART_MAX_POINTS
+                )
                 rel_power = self.stats.relative_power_history(
                     ex_choice, start_str, end_str
                 )
@@ -5892,7 +5907,11 @@ class GymApp:
                 data = self.stats.volume_forecast(days, start, end)
                 if data:
                     self._line_chart(
-                        {"Volume": [d["volume"] for d in data]},
+                        {
+                            "Volume": [d["volume"] for d in data],
+                            "Lower": [d["lower"] for d in data],
+                            "Upper": [d["upper"] for d in data],
+                        },
                         [d["date"] for d in data],
                     )
 
@@ -6036,7 +6055,9 @@ class GymApp:
                 ("Max", stats["max"]),
             ]
             self._metric_grid(metrics)
-        history = self.stats.body_weight_history(start_str, end_str)
+        history = self.stats.body_weight_history(
+            start_str, end_str, max_points=self.CHART_MAX_POINTS
+        )
         if history:
             with weight_hist_tab:
                 self._line_chart(
@@ -6234,7 +6255,9 @@ class GymApp:
                     [e["equipment"] for e in eq_stats],
                 )
         with st.expander("Daily Volume", expanded=True):
-            daily = self.stats.daily_volume(start_str, end_str)
+            daily = self.stats.daily_volume(
+                start_str, end_str, max_points=self.CHART_MAX_POINTS
+            )
             if daily:
                 self._line_chart(
                     {"Volume": [d["volume"] for d in daily]},
@@ -6366,13 +6389,26 @@ class GymApp:
         overtrain = self.stats.overtraining_risk(start_str, end_str)
         injury = self.stats.injury_risk(start_str, end_str)
         ready = self.stats.readiness(start_str, end_str)
+        workload = self.stats.workload_timeline(
+            start_str, end_str, max_points=self.CHART_MAX_POINTS
+        )
         with st.expander("Summary", expanded=True):
             metrics = [
                 ("Adaptation", summary["adaptation"]),
                 ("Overtraining Risk", overtrain["risk"]),
                 ("Injury Risk", injury["injury_risk"]),
+                ("ACWR", injury["acwr"]),
             ]
             self._metric_grid(metrics)
+        if workload:
+            with st.expander("Workload Ratio", expanded=False):
+                self._line_chart(
+                    {
+                        "ACWR": [w["acwr"] for w in workload],
+                        "Rolling ACWR": [w["rolling_acwr"] for w in workload],
+                    },
+                    [w["date"] for w in workload],
+                )
         if ready:
             with st.expander("Readiness Trend", expanded=False):
                 self._line_chart(
@@ -7168,6 +7204,11 @@ class GymApp:
                         prev[ex_id] = int(rpe)
                         progress.progress(i / total)
                     st.success("Model trained")
+                if st.button(
+                    "Train Readiness & Injury Models", key="train_risk_models_btn"
+                ):
+                    self.stats.schedule_model_training()
+                    st.success("Training queued")
             with st.expander("Integrations", expanded=True):
                 if st.button("Git Pull"):
                     try:
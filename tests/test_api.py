@@ -6,6 +6,8 @@ import sqlite3
 import shutil
 import subprocess
 import io
+import time
+from unittest import mock
 from fastapi.testclient import TestClient
 import yaml
 import json
@@ -1181,6 +1183,98 @@ class APITestCase(unittest.TestCase):
         self.assertEqual(history[1]["reps"], 8)
         self.assertAlmostEqual(history[-1]["est_1rm"], 139.3, places=1)
 
+    def test_personal_record_index(self) -> None:
+        self.client.post("/workouts", params={"date": "2023-01-08"})
+        self.client.post("/workouts", params={"date": "2023-01-01"})
+        self.client.post(
+            "/workouts/1/exercises",
+            params={"name": "Bench Press", "equipment": "Olympic Barbell"},
+        )
+        self.client.post(
+            "/workouts/2/exercises",
+            params={"name": "Bench Press", "equipment": "Olympic Barbell"},
+        )
+        self.client.post(
+            "/exercises/1/sets", params={"reps": 5, "weight": 100.0, "rpe": 8}
+        )
+        self.client.post(
+            "/exercises/1/sets", params={"reps": 5, "weight": 105.0, "rpe": 9}
+        )
+        rows = self.api.personal_records.fetch_all(
+            "SELECT set_id FROM personal_records ORDER BY set_id;"
+        )
+        self.assertEqual(rows, [(1,), (2,)])
+
+        self.client.post(
+            "/exercises/2/sets", params={"reps": 5, "weight": 110.0, "rpe": 9}
+        )
+        records = self.client.get("/stats/personal_records").json()
+        self.assertEqual(records[0]["date"], "2023-01-01")
+        self.assertAlmostEqual(records[0]["weight"], 110.0)
+        history = self.client.get("/stats/personal_record_history").json()
+        self.assertEqual([h["weight"] for h in history], [110.0])
+        rows = self.api.personal_records.fetch_all(
+            "SELECT set_id FROM personal_records;"
+        )
+        self.assertEqual(rows, [(3,)])
+
+        self.client.delete("/sets/3")
+        records = self.client.get("/stats/personal_records").json()
+        self.assertAlmostEqual(records[0]["weight"], 105.0)
+        self.api.personal_records.execute("DELETE FROM personal_records;")
+        self.assertEqual(self.api.personal_records.rebuild(), 1)
+        history = self.client.get("/stats/personal_record_history").json()
+        self.assertEqual([h["weight"] for h in history], [100.0, 105.0])
+
+        writer = sqlite3.connect(self.db_path)
+        writer.execute("BEGIN IMMEDIATE;")
+        try:
+            events = self.api.personal_records.fetch_events(["Bench Press"])
+        finally:
+            writer.rollback()
+            writer.close()
+        self.assertEqual([e[4] for e in events], [100.0, 105.0])
+        plan = self.api.personal_records.fetch_all(
+            "EXPLAIN QUERY PLAN SELECT MAX(est_1rm) FROM personal_records "
+            "WHERE exercise = 'Bench Press';"
+        )
+        self.assertIn("idx_personal_records_exercise_1rm", str(plan))
+
+    def test_usage_catalog_index_refresh(self) -> None:
+        self.client.post("/workouts", params={"date": "2023-01-01"})
+        self.client.post(
+            "/workouts/1/exercises",
+            params={"name": "Bench Press", "equipment": "Cable Rig"},
+        )
+        self.client.post(
+            "/exercises/1/sets", params={"reps": 5, "weight": 50.0, "rpe": 8}
+        )
+        self.assertEqual(self.client.get("/stats/muscle_usage").json(), [])
+        self.assertEqual(self.client.get("/stats/muscle_group_usage").json(), [])
+
+        self.client.post("/equipment/types", params={"name": "Cable"})
+        self.client.post(
+            "/equipment",
+            params={
+                "equipment_type": "Cable",
+                "name": "Cable Rig",
+                "muscles": "Biceps Brachii|Latissimus Dorsi",
+            },
+        )
+        self.client.post(
+            "/exercise_names/link",
+            params={"name1": "Barbell Bench Press", "name2": "Bench Press"},
+        )
+        muscles = self.client.get("/stats/muscle_usage").json()
+        self.assertEqual(
+            [m["muscle"] for m in muscles], ["Biceps Brachii", "Latissimus Dorsi"]
+        )
+        self.assertAlmostEqual(muscles[0]["volume"], 250.0)
+        groups = self.client.get("/stats/muscle_group_usage").json()
+        self.assertEqual(
+            groups, [{"muscle_group": "Chest", "volume": 250.0, "sets": 1}]
+        )
+
     def test_progress_insights(self) -> None:
         self.client.post("/workouts")
         self.client.post(
@@ -1486,6 +1580,59 @@ class APITestCase(unittest.TestCase):
         )
         self.assertEqual(len(paged2.json()), 1)
 
+    def test_history_endpoints_stream_ndjson(self) -> None:
+        d1 = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+        d2 = datetime.date.today().isoformat()
+        self.client.post("/workouts", params={"date": d1, "training_type": "strength"})
+        self.client.post("/workouts", params={"date": d2})
+        self.client.post(
+            "/workouts/1/exercises",
+            params={"name": "Bench Press", "equipment": "Olympic Barbell"},
+        )
+        for weight in (100.0, 105.0):
+            self.client.post(
+                "/exercises/1/sets",
+                params={"reps": 5, "weight": weight, "rpe": 8},
+            )
+        self.client.post("/body_weight", params={"weight": 80.0, "date": d1})
+        self.client.post("/body_weight", params={"weight": 81.0, "date": d2})
+
+        ndjson = {"Accept": "application/x-ndjson"}
+        for path, params in (
+            ("/workouts/history", {"start_date": d1, "end_date": d2}),
+            ("/stats/exercise_history", {"exercise": "Bench Press"}),
+            ("/body_weight", {}),
+            ("/heart_rate", {}),
+        ):
+            plain = self.client.get(path, params=params)
+            streamed = self.client.get(path, params=params, headers=ndjson)
+            self.assertEqual(streamed.status_code, 200)
+            self.assertEqual(
+                streamed.headers["content-type"], "application/x-ndjson"
+            )
+            rows = [json.loads(line) for line in streamed.text.splitlines()]
+            self.assertEqual(rows, plain.json())
+
+    def test_stream_does_not_block_writes(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany(
+            "INSERT INTO body_weight_logs (date, weight) VALUES (?, ?);",
+            [
+                ((datetime.date(2020, 1, 1) + datetime.timedelta(days=i)).isoformat(), 80.0)
+                for i in range(1200)
+            ],
+        )
+        conn.commit()
+        conn.close()
+        stream = self.api.body_weights.iter_history()
+        first = [next(stream) for _ in range(600)]
+        self.api.body_weights.log("2030-01-01", 81.0)
+        rest = list(stream)
+        dates = [row[1] for row in first + rest]
+        self.assertEqual(len(dates), 1201)
+        self.assertEqual(dates, sorted(dates))
+        self.assertEqual(dates[-1], "2030-01-01")
+
     def test_pyramid_tests(self) -> None:
         today = datetime.date.today().isoformat()
         resp = self.client.post(
@@ -1685,6 +1832,37 @@ class APITestCase(unittest.TestCase):
         data = resp.json()
         self.assertAlmostEqual(data["monotony"], 5.0, places=2)
 
+    def test_workload_timeline_endpoint(self) -> None:
+        self.client.post("/workouts", params={"date": "2024-01-01"})
+        self.client.post("/workouts", params={"date": "2024-01-03"})
+        for wid, weight in ((1, 100.0), (2, 150.0)):
+            self.client.post(
+                f"/workouts/{wid}/exercises",
+                params={"name": "Bench Press", "equipment": "Olympic Barbell"},
+            )
+            self.client.post(
+                f"/exercises/{wid}/sets",
+                params={"reps": 10, "weight": weight, "rpe": 8},
+            )
+
+        resp = self.client.get("/stats/workload_timeline")
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual(
+            [d["date"] for d in data], ["2024-01-01", "2024-01-02", "2024-01-03"]
+        )
+        self.assertEqual([d["load"] for d in data], [1000.0, 0.0, 1500.0])
+        self.assertEqual(data[0]["acwr"], 1.0)
+        self.assertAlmostEqual(data[2]["rolling_acwr"], 1.0, places=2)
+        self.assertEqual(data[2]["monotony"], 1.34)
+        self.assertEqual(data[2]["strain"], 3340.77)
+        risk = self.client.get("/stats/injury_risk").json()
+        self.assertEqual(risk["acwr"], data[-1]["acwr"])
+        self.assertEqual(risk["strain"], data[-1]["strain"])
+        self.assertEqual(risk["monotony"], 1.0)
+        resp = self.client.get("/stats/workload_timeline", params={"max_points": 2})
+        self.assertEqual(resp.status_code, 400)
+
     def test_stress_balance_endpoint(self) -> None:
         d1 = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
         d2 = datetime.date.today().isoformat()
@@ -2254,6 +2432,8 @@ class APITestCase(unittest.TestCase):
         self.assertEqual(len(data), 2)
         self.assertIn("volume", data[0])
         self.assertIsInstance(data[0]["volume"], float)
+        self.assertLessEqual(data[0]["lower"], data[0]["volume"])
+        self.assertGreaterEqual(data[0]["upper"], data[0]["volume"])
 
     def test_muscle_progression_endpoint(self) -> None:
         today = datetime.date.today().isoformat()
@@ -2389,6 +2569,77 @@ class APITestCase(unittest.TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertAlmostEqual(resp.json()["risk"], round(expected, 2), places=2)
 
+    def test_risk_scores_follow_workload_spike(self) -> None:
+        start = datetime.date(2024, 1, 1)
+        for i in range(10):
+            date = (start + datetime.timedelta(days=i)).isoformat()
+            self.client.post("/workouts", params={"date": date})
+            self.client.post(
+                f"/workouts/{i + 1}/exercises",
+                params={"name": "Bench Press", "equipment": "Olympic Barbell"},
+            )
+            weight = 200.0 if i == 9 else 50.0 + (i % 3) * 10
+            self.client.post(
+                f"/exercises/{i + 1}/sets",
+                params={"reps": 5, "weight": weight, "rpe": 8},
+            )
+        timeline = self.client.get("/stats/workload_timeline").json()
+        latest = timeline[-1]
+        self.assertGreater(latest["acwr"], 1.3)
+        factor = MathTools.workload_risk_factor(latest["acwr"], latest["monotony"])
+
+        overview = self.client.get("/stats/stress_overview").json()
+        variability = self.client.get("/stats/load_variability").json()
+        index = MathTools.overtraining_index(
+            overview["stress"], overview["fatigue"], variability["variability"]
+        )
+        risk = self.client.get("/stats/overtraining_risk").json()
+        self.assertEqual(risk["acwr"], latest["acwr"])
+        self.assertEqual(risk["monotony"], latest["monotony"])
+        self.assertAlmostEqual(
+            risk["risk"], round(MathTools.clamp(index * factor, 0.0, 10.0), 2)
+        )
+
+    def test_progress_forecast_uses_pyramid_tests(self) -> None:
+        stats = self.api.statistics
+        self.assertIs(stats.pyramid_loader, self.api.recommender.pyramid_loader)
+        self.client.post("/workouts", params={"date": "2024-01-01"})
+        self.client.post(
+            "/workouts/1/exercises",
+            params={"name": "Bench Press", "equipment": "Olympic Barbell"},
+        )
+        self.client.post(
+            "/exercises/1/sets",
+            params={"reps": 5, "weight": 80.0, "rpe": 8},
+        )
+        params = {"exercise": "Bench Press", "weeks": 2, "workouts": 1}
+        calls = []
+
+        def record(func, *args, **kwargs):
+            calls.append(kwargs.get("pyramid_tests"))
+            return func(*args, **kwargs)
+
+        with mock.patch.object(stats, "_compute", side_effect=record):
+            resp = self.client.get("/prediction/progress", params=params)
+            self.assertEqual(resp.status_code, 200)
+            resp = self.client.post(
+                "/pyramid_tests",
+                params={
+                    "weights": "100|120|140",
+                    "exercise_name": "Bench Press",
+                    "starting_weight": 100.0,
+                    "max_achieved": 140.0,
+                },
+            )
+            self.assertEqual(resp.status_code, 200)
+            resp = self.client.get("/prediction/progress", params=params)
+            self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(calls[0], [])
+        self.assertEqual(len(calls[1]), 1)
+        self.assertEqual(calls[1][0][1], "Bench Press")
+        self.assertEqual(calls[1][0][-1], [100.0, 120.0, 140.0])
+
     def test_injury_risk_endpoint(self) -> None:
         self.client.post("/workouts")
         self.client.post(
@@ -2434,6 +2685,34 @@ class APITestCase(unittest.TestCase):
         self.assertIsInstance(data[0]["readiness"], float)
         self.assertGreaterEqual(data[0]["readiness"], 0.0)
 
+    def test_readiness_reads_do_not_train(self) -> None:
+        for day in ("2023-01-01", "2023-01-03"):
+            self.client.post("/workouts", params={"date": day})
+        for wid in (1, 2):
+            self.client.post(
+                f"/workouts/{wid}/exercises",
+                params={"name": "Bench Press", "equipment": "Olympic Barbell"},
+            )
+            self.client.post(
+                f"/exercises/{wid}/sets",
+                params={"reps": 5, "weight": 100.0, "rpe": 8},
+            )
+        before = self.api.sets.data_version("ml_models")
+        data = self.client.get("/stats/readiness").json()
+        self.assertEqual([d["date"] for d in data], ["2023-01-01", "2023-01-03"])
+        self.client.get("/stats/injury_risk")
+        self.assertEqual(self.api.sets.data_version("ml_models"), before)
+
+        first = self.client.post("/ml/train").json()
+        self.assertEqual(first, {"readiness": "queued", "injury": "queued"})
+        self.assertTrue(self.api.statistics.training.wait(60))
+        info = self.client.get("/ml/train").json()
+        self.assertEqual(info["pending"], [])
+        self.assertEqual(info["failed"], 0)
+        self.assertGreater(self.api.sets.data_version("ml_models"), before)
+        resp = self.client.post("/ml/train", params={"models": "unknown"})
+        self.assertEqual(resp.status_code, 400)
+
     def test_readiness_stats_endpoint(self) -> None:
         self.client.post("/workouts")
         self.client.post(
@@ -2451,6 +2730,32 @@ class APITestCase(unittest.TestCase):
         self.assertIn("min", stats)
         self.assertIn("max", stats)
 
+    def test_stats_share_history_frame(self) -> None:
+        self.client.post("/workouts", params={"date": "2023-01-01"})
+        self.client.post(
+            "/workouts/1/exercises",
+            params={"name": "Bench Press", "equipment": "Olympic Barbell"},
+        )
+        self.client.post(
+            "/exercises/1/sets",
+            params={"reps": 5, "weight": 100.0, "rpe": 8},
+        )
+        stats = self.api.statistics
+        stats.clear_cache()
+        self.client.get("/stats/overview")
+        self.client.get("/stats/daily_volume")
+        self.client.get("/stats/session_duration")
+        self.client.get("/stats/readiness_stats")
+        self.assertEqual(len(stats._frames), 1)
+
+        self.client.post(
+            "/exercises/1/sets",
+            params={"reps": 5, "weight": 110.0, "rpe": 9},
+        )
+        daily = self.client.get("/stats/daily_volume").json()
+        self.assertEqual(daily[0]["sets"], 2)
+        self.assertEqual(daily[0]["volume"], 1050.0)
+
     def test_adaptation_index_endpoint(self) -> None:
         self.client.post("/workouts")
         self.client.post(
@@ -2577,6 +2882,8 @@ class APITestCase(unittest.TestCase):
             perf, times, rpes, vols
         )
         self.assertAlmostEqual(data["score"], round(expected, 2), places=2)
+        info = self.client.get("/stats/analytics").json()
+        self.assertGreaterEqual(info["completed"], 1)
 
     def test_warmup_weights_endpoint(self) -> None:
         resp = self.client.get(
@@ -2717,6 +3024,133 @@ class APITestCase(unittest.TestCase):
             self.api.stats_cache.fetch_weight_stats(d1, d2, "kg")
         )
 
+    def test_stats_memo_invalidates_on_data_change(self) -> None:
+        d1 = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+        self.client.post("/workouts", params={"date": d1})
+        self.client.post(
+            "/workouts/1/exercises",
+            params={"name": "Bench Press", "equipment": "Olympic Barbell"},
+        )
+        self.client.post(
+            "/exercises/1/sets",
+            params={"reps": 5, "weight": 100.0, "rpe": 8},
+        )
+        self.client.post("/stats/cache/clear")
+        first = self.client.get("/stats/stress_overview").json()
+        info = self.client.get("/stats/cache").json()
+        self.assertEqual(info["hits"], 0)
+        self.assertEqual(self.client.get("/stats/stress_overview").json(), first)
+        info = self.client.get("/stats/cache").json()
+        self.assertEqual(info["hits"], 1)
+        self.assertGreaterEqual(info["misses"], 1)
+
+        self.api.statistics.memo.clear()
+        self.assertEqual(self.client.get("/stats/stress_overview").json(), first)
+        self.assertEqual(self.client.get("/stats/cache").json()["store_hits"], 1)
+
+        self.client.post(
+            "/exercises/1/sets",
+            params={"reps": 5, "weight": 120.0, "rpe": 9},
+        )
+        updated = self.client.get("/stats/stress_overview").json()
+        self.assertNotEqual(updated, first)
+
+    def test_stats_batch_endpoint(self) -> None:
+        self.client.post("/workouts", params={"date": "2023-01-01"})
+        self.client.post(
+            "/workouts/1/exercises",
+            params={"name": "Bench Press", "equipment": "Olympic Barbell"},
+        )
+        self.client.post(
+            "/exercises/1/sets",
+            params={"reps": 5, "weight": 100.0, "rpe": 8},
+        )
+        body = {
+            "metrics": [
+                {"metric": "daily_volume"},
+                {
+                    "metric": "exercise_summary",
+                    "key": "bench",
+                    "params": {"exercise": "Bench Press"},
+                },
+            ],
+            "start_date": "2023-01-01",
+        }
+        resp = self.client.post("/stats/batch", json=body)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers["content-type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        self.assertEqual([item["key"] for item in lines], ["daily_volume", "bench"])
+        self.assertEqual(
+            lines[0]["result"],
+            self.client.get(
+                "/stats/daily_volume", params={"start_date": "2023-01-01"}
+            ).json(),
+        )
+        self.assertGreaterEqual(lines[1]["elapsed_ms"], 0.0)
+
+        body["stream"] = False
+        keyed = self.client.post("/stats/batch", json=body).json()
+        self.assertEqual(keyed["bench"]["metric"], "exercise_summary")
+        self.assertAlmostEqual(keyed["bench"]["result"][0]["volume"], 500.0)
+
+        resp = self.client.post(
+            "/stats/batch", json={"metrics": [{"metric": "clear_cache"}]}
+        )
+        self.assertEqual(resp.status_code, 400)
+
+        resp = self.client.post(
+            "/stats/batch", json={"metrics": ["daily_volume"], "stream": False}
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            keyed["daily_volume"]["result"], resp.json()["daily_volume"]["result"]
+        )
+        for item in (7, ["daily_volume"], {"metric": "daily_volume", "params": [1]}):
+            resp = self.client.post("/stats/batch", json={"metrics": [item]})
+            self.assertEqual(resp.status_code, 400)
+
+    def test_composite_metrics_share_inputs(self) -> None:
+        self.client.post("/workouts", params={"date": "2023-01-01"})
+        self.client.post(
+            "/workouts/1/exercises",
+            params={"name": "Bench Press", "equipment": "Olympic Barbell"},
+        )
+        self.client.post(
+            "/exercises/1/sets",
+            params={"reps": 5, "weight": 100.0, "rpe": 8},
+        )
+        self.client.post("/stats/cache/clear")
+        for path in (
+            "overtraining_risk",
+            "injury_risk",
+            "training_strain",
+            "weekly_volume_change",
+            "adaptation_index",
+        ):
+            resp = self.client.get(f"/stats/{path}")
+            self.assertEqual(resp.status_code, 200)
+        counts = self.api.statistics.graph.evaluations
+        self.assertEqual(counts["weekly_load_variability"], 1)
+        self.assertEqual(counts["stress_overview"], 1)
+        self.assertEqual(counts["training_monotony"], 1)
+
+        self.client.post(
+            "/exercises/1/sets",
+            params={"reps": 5, "weight": 120.0, "rpe": 9},
+        )
+        self.client.get("/stats/overtraining_risk")
+        self.assertEqual(counts["weekly_load_variability"], 2)
+
+        graph = self.api.statistics.graph
+        inputs = graph.resolve(self.api.statistics, "training_strain", None, None)
+        inputs["weekly_load_variability"]["weeks"].clear()
+        inputs["training_monotony"]["monotony"] = -1.0
+        again = graph.resolve(self.api.statistics, "training_strain", None, None)
+        self.assertTrue(again["weekly_load_variability"]["weeks"])
+        self.assertNotEqual(again["training_monotony"]["monotony"], -1.0)
+        self.assertEqual(counts["weekly_load_variability"], 2)
+
     def test_current_body_weight_latest_log(self) -> None:
         d1 = "2023-01-01"
         d2 = "2023-01-02"
@@ -2735,6 +3169,29 @@ class APITestCase(unittest.TestCase):
         weight = self.api.recommender._current_body_weight()
         self.assertAlmostEqual(weight, 72.5)
 
+    def test_body_weight_downsampling(self) -> None:
+        start = datetime.date(2023, 1, 1)
+        for i in range(40):
+            weight = 95.0 if i == 17 else 80.0 + (i % 3)
+            day = (start + datetime.timedelta(days=i)).isoformat()
+            self.client.post("/body_weight", params={"weight": weight, "date": day})
+
+        resp = self.client.get("/body_weight", params={"max_points": 10})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers["X-Downsampled"], "true")
+        self.assertEqual(resp.headers["X-Total-Points"], "40")
+        data = resp.json()
+        self.assertEqual(len(data), 10)
+        self.assertEqual(data[0]["date"], "2023-01-01")
+        self.assertEqual(data[-1]["date"], "2023-02-09")
+        self.assertIn(95.0, [d["weight"] for d in data])
+
+        resp = self.client.get("/body_weight", params={"max_points": 100})
+        self.assertEqual(resp.headers["X-Downsampled"], "false")
+        self.assertEqual(len(resp.json()), 40)
+        resp = self.client.get("/body_weight", params={"max_points": 2})
+        self.assertEqual(resp.status_code, 400)
+
     def test_body_weight_update_and_delete(self) -> None:
         d1 = "2023-01-01"
         resp = self.client.post("/body_weight", params={"weight": 80.0, "date": d1})
@@ -2951,6 +3408,80 @@ class APITestCase(unittest.TestCase):
         self.assertEqual(data[4]["count"], 1)
         self.assertEqual(data[4]["percent"], 50.0)
 
+    def test_heart_rate_rollups_and_retention(self) -> None:
+        self.client.post("/workouts", params={"date": "2023-01-01"})
+        items = [
+            {"timestamp": f"2023-01-01T10:00:{i:02d}", "heart_rate": 100 + i}
+            for i in range(30)
+        ]
+        items.append({"timestamp": "2023-01-01T10:01:00", "heart_rate": 180})
+        resp = self.client.post("/workouts/1/heart_rate/bulk", json=items)
+        self.assertEqual(resp.status_code, 200)
+
+        before = self.client.get("/stats/heart_rate_summary").json()
+        self.assertEqual(before["min"], 100.0)
+        self.assertEqual(before["max"], 180.0)
+        zones = self.client.get("/stats/heart_rate_zones").json()
+        self.assertEqual(sum(z["count"] for z in zones), 31)
+        self.assertEqual(sum(z["seconds"] for z in zones), 120)
+        self.assertEqual(zones[4]["seconds"], 60)
+        per_workout = self.client.get("/stats/heart_rate_workouts").json()
+        self.assertEqual(per_workout[0]["samples"], 31)
+
+        removed = self.api.heart_rates.apply_retention(
+            30, today=datetime.date(2023, 3, 1)
+        )
+        self.assertEqual(removed, 29)
+        self.assertEqual(len(self.client.get("/workouts/1/heart_rate").json()), 2)
+        after = self.client.get("/stats/heart_rate_summary").json()
+        self.assertEqual(after, before)
+        self.assertEqual(self.client.get("/stats/heart_rate_zones").json(), zones)
+
+        collapsed, raw = self.client.get("/workouts/1/heart_rate").json()
+        resp = self.client.put(
+            f"/heart_rate/{collapsed['id']}",
+            params={"timestamp": collapsed["timestamp"], "heart_rate": 115},
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.api.heart_rates.rebuild_rollups()
+        edited = self.client.get("/stats/heart_rate_summary").json()
+        self.assertEqual((edited["min"], edited["max"]), (100.0, 180.0))
+        self.assertEqual(self.client.get("/stats/heart_rate_zones").json(), zones)
+        self.client.delete(f"/heart_rate/{raw['id']}")
+        trimmed = self.client.get("/stats/heart_rate_summary").json()
+        self.assertEqual((trimmed["min"], trimmed["max"]), (100.0, 129.0))
+
+    def test_heart_rate_retention_setting(self) -> None:
+        self.client.post("/workouts", params={"date": "2023-01-01"})
+        items = [
+            {"timestamp": f"2023-01-01T10:00:{i:02d}", "heart_rate": 100 + i}
+            for i in range(30)
+        ]
+        self.client.post("/workouts/1/heart_rate/bulk", json=items)
+        resp = self.client.post(
+            "/settings/general", params={"heart_rate_retention_days": -1}
+        )
+        self.assertEqual(resp.status_code, 400)
+        resp = self.client.post(
+            "/settings/general", params={"heart_rate_retention_days": 30}
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            self.client.get("/settings/general").json()["heart_rate_retention_days"],
+            30,
+        )
+
+        self.api.start_retention()
+        scheduler = self.api.retention_scheduler
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            if len(self.client.get("/workouts/1/heart_rate").json()) == 1:
+                break
+            time.sleep(0.05)
+        scheduler.stop()
+        scheduler.join(5)
+        self.assertEqual(len(self.client.get("/workouts/1/heart_rate").json()), 1)
+
     def test_step_logging(self) -> None:
         self.client.post("/workouts", params={"date": "2023-01-01"})
         resp = self.client.post(
@@ -3488,6 +4019,70 @@ class APITestCase(unittest.TestCase):
         self.assertIn("weight", data)
         self.assertIn("reps", data)
 
+    def test_prescription_cache_reuses_unchanged_history(self) -> None:
+        self.client.post("/workouts", params={"date": "2023-01-01"})
+        self.client.post(
+            "/workouts/1/exercises",
+            params={"name": "Bench Press", "equipment": "Olympic Barbell"},
+        )
+        for weight in (100.0, 105.0, 110.0):
+            self.client.post(
+                "/exercises/1/sets",
+                params={"reps": 5, "weight": weight, "rpe": 8},
+            )
+        recommender = self.api.recommender
+        first = recommender.generate_prescription("Bench Press")
+        first["prescription"][0]["weight"] = -1.0
+        second = recommender.generate_prescription("Bench Press")
+        self.assertNotEqual(second["prescription"][0]["weight"], -1.0)
+        info = self.client.get("/prescriptions/cache").json()
+        self.assertEqual((info["hits"], info["misses"]), (1, 1))
+        self.assertEqual(info["hit_rate"], 0.5)
+
+        self.client.put("/sets/1", params={"reps": 5, "weight": 90.0, "rpe": 8})
+        third = recommender.generate_prescription("Bench Press")
+        self.assertEqual(third["weights"][0], 90.0)
+        self.assertEqual(recommender.prescriptions.misses, 2)
+
+        fingerprint = self.api.sets.history_fingerprint(["Bench Press"])
+        self.api.sets.set_start_time(2, "2023-01-01T10:05:00")
+        self.assertNotEqual(
+            self.api.sets.history_fingerprint(["Bench Press"]), fingerprint
+        )
+        recommender.generate_prescription("Bench Press")
+        self.assertEqual(recommender.prescriptions.misses, 3)
+
+        self.client.put("/sets/2", params={"reps": 5, "weight": 110.0, "rpe": 8})
+        self.client.put("/sets/3", params={"reps": 5, "weight": 105.0, "rpe": 8})
+        recommender.generate_prescription("Bench Press")
+        self.assertEqual(recommender.prescriptions.misses, 4)
+
+    def test_fast_prescription_estimator_setting(self) -> None:
+        self.client.post("/workouts", params={"date": "2023-01-01"})
+        self.client.post(
+            "/workouts/1/exercises",
+            params={"name": "Bench Press", "equipment": "Olympic Barbell"},
+        )
+        for weight in (100.0, 105.0, 110.0):
+            self.client.post(
+                "/exercises/1/sets",
+                params={"reps": 5, "weight": weight, "rpe": 8},
+            )
+        resp = self.client.post(
+            "/settings/general", params={"prescription_estimator": "turbo"}
+        )
+        self.assertEqual(resp.status_code, 400)
+        resp = self.client.post(
+            "/settings/general", params={"prescription_estimator": "fast"}
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            self.client.get("/settings/general").json()["prescription_estimator"],
+            "fast",
+        )
+        data = self.api.recommender.generate_prescription("Bench Press")
+        self.assertGreater(data["prescription"][0]["weight"], 0.0)
+
     def test_workout_consistency_endpoint(self) -> None:
         d0 = datetime.date.today() - datetime.timedelta(days=14)
         d1 = datetime.date.today() - datetime.timedelta(days=7)
@@ -3612,6 +4207,63 @@ class APITestCase(unittest.TestCase):
         sets_data = sets_resp.json()
         self.assertGreaterEqual(len(sets_data), 1)
 
+    def test_ai_plan_batches_prescriptions(self) -> None:
+        for name, equipment, base in (
+            ("Bench", "Olympic Barbell", 60.0),
+            ("Squat", "Power Rack", 100.0),
+        ):
+            for step in range(3):
+                wid = self.client.post("/workouts").json()["id"]
+                ex_id = self.client.post(
+                    f"/workouts/{wid}/exercises",
+                    params={"name": name, "equipment": equipment},
+                ).json()["id"]
+                self.client.post(
+                    f"/exercises/{ex_id}/sets",
+                    params={"reps": 5, "weight": base + 2.5 * step, "rpe": 8},
+                )
+        recommender = self.api.recommender
+        batch = recommender.generate_prescriptions(
+            ["Bench", "Squat", "Unknown"], skip_errors=True
+        )
+        self.assertEqual(list(batch), ["Bench", "Squat"])
+        with self.assertRaises(ValueError):
+            recommender.generate_prescriptions(["Bench", "Unknown"])
+        recommender.prescriptions.clear()
+        for name in ("Bench", "Squat"):
+            self.assertEqual(recommender.generate_prescription(name), batch[name])
+
+        plan_date = (datetime.date.today() + datetime.timedelta(days=1)).isoformat()
+        resp = self.client.post(
+            "/planned_workouts/auto_plan",
+            params={
+                "date": plan_date,
+                "exercises": "Bench@Olympic Barbell|Squat@Power Rack",
+            },
+        )
+        self.assertEqual(resp.status_code, 200)
+        pid = resp.json()["id"]
+        planned = self.client.get(f"/planned_workouts/{pid}/exercises").json()
+        self.assertEqual([p["name"] for p in planned], ["Bench", "Squat"])
+        for item in planned:
+            sets = self.client.get(f"/planned_exercises/{item['id']}/sets").json()
+            expected = batch[item["name"]]["prescription"]
+            self.assertEqual(len(sets), len(expected))
+            self.assertEqual(sets[0]["reps"], int(expected[0]["reps"]))
+
+        self.api.settings.set_int("rpe_scale", 1)
+        resp = self.client.post(
+            "/planned_workouts/auto_plan",
+            params={"date": plan_date, "exercises": "Bench|Squat"},
+        )
+        self.assertEqual(resp.status_code, 400)
+        conn = sqlite3.connect(self.db_path)
+        plans = conn.execute("SELECT COUNT(*) FROM planned_workouts").fetchone()[0]
+        exercises = conn.execute("SELECT COUNT(*) FROM planned_exercises").fetchone()[0]
+        conn.close()
+        self.assertEqual(plans, 1)
+        self.assertEqual(exercises, 2)
+
     def test_goal_plan_endpoint(self) -> None:
         """Goal planner should create plan from active goals."""
         # create history
@@ -4215,3 +4867,19 @@ class SummaryImageTestCase(unittest.TestCase):
         self.assertEqual(resp.headers["content-type"], "image/png")
         self.assertGreater(len(resp.content), 0)
 
+        etag = resp.headers["ETag"]
+        resp = self.client.get(
+            "/workouts/1/summary_image", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(self.client.get("/stats/charts").json()["misses"], 1)
+
+        self.client.post(
+            "/exercises/1/sets",
+            params={"reps": 5, "weight": 110.0, "rpe": 9},
+        )
+        resp = self.client.get(
+            "/workouts/1/summary_image", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp.headers["ETag"], etag)
@@ -9,7 +9,9 @@ from cli import (
     demo_data,
     import_strava,
     bulk_update_sets_csv,
+    benchmark_suite,
 )
+from benchmark_suite import BenchmarkSuite, SyntheticHistory
 from rest_api import GymAPI
 from fastapi.testclient import TestClient
 import csv
@@ -27,7 +29,14 @@ class CLIToolsTest(unittest.TestCase):
         self.client = TestClient(self.api.app)
 
     def tearDown(self) -> None:
-        for path in [self.db_path, self.yaml_path, "backup.db", "exports"]:
+        for path in [
+            self.db_path,
+            self.yaml_path,
+            "backup.db",
+            "exports",
+            "bench.json",
+            "bench_base.json",
+        ]:
             if os.path.exists(path):
                 if os.path.isdir(path):
                     for f in os.listdir(path):
@@ -79,5 +88,61 @@ class CLIToolsTest(unittest.TestCase):
         self.assertEqual(detail["reps"], 10)
         os.remove(csv_path)
 
+    def test_synthetic_history_is_deterministic(self) -> None:
+        history = SyntheticHistory(0.25, sessions_per_week=4, seed=3)
+        self.assertEqual(list(history.sessions()), list(history.sessions()))
+        counts = history.write(self.db_path)
+        self.assertEqual(counts["workouts"], 13 * 4)
+        self.assertEqual(counts["sets"], 13 * 4 * 4 * 4)
+        workouts = self.api.workouts.fetch_all_workouts()
+        self.assertEqual(len(workouts), counts["workouts"])
+        rows = self.api.sets.fetch_history_by_names(["Barbell Bench Press"])
+        self.assertEqual(len(rows), 13 * 2 * 4)
+        self.assertEqual(len(self.api.wellness.fetch_history()), counts["days"])
+
+    def test_benchmark_suite_saves_and_compares(self) -> None:
+        code = benchmark_suite([0.1], 1, "bench.json", only="repo.sets.history")
+        self.assertEqual(code, 0)
+        report = BenchmarkSuite.load("bench.json")
+        names = {r["name"] for r in report["results"]}
+        self.assertEqual(
+            names,
+            {"repo.sets.history_fingerprint", "repo.sets.history_fingerprints"},
+        )
+        for entry in report["results"]:
+            self.assertEqual(entry["scale"], "0.1y")
+            self.assertEqual(entry["runs"], 1)
+            self.assertGreater(entry["median_ms"], 0)
+        faster = {
+            **report,
+            "results": [
+                {**r, "median_ms": r["median_ms"] / 10} for r in report["results"]
+            ],
+        }
+        slower = BenchmarkSuite.compare(faster, report, threshold=0.5)
+        self.assertEqual(len(slower), 2)
+        self.assertEqual(BenchmarkSuite.compare(report, report), [])
+        BenchmarkSuite.save(faster, "bench_base.json")
+        code = benchmark_suite(
+            [0.1], 1, "bench.json", baseline="bench_base.json", only="repo.sets.history_fingerprints"
+        )
+        self.assertEqual(code, 1)
+
+    def test_benchmark_suite_reports_cold_aggregation_speedup(self) -> None:
+        report = BenchmarkSuite([0.1], repeat=1, only="aggregate.").run()
+        names = {r["name"] for r in report["results"]}
+        self.assertEqual(
+            names,
+            {
+                "aggregate.loop",
+                "aggregate.group_by[cold]",
+                "aggregate.group_by[warm]",
+            },
+        )
+        (speedup,) = BenchmarkSuite.aggregation_speedups(report)
+        self.assertEqual(speedup["scale"], "0.1y")
+        self.assertGreater(speedup["cold"], 0)
+        self.assertGreater(speedup["warm"], 0)
+
 if __name__ == "__main__":
     unittest.main()
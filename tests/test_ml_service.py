@@ -2,6 +2,7 @@ import os
 import sys
 import unittest
 import sqlite3
+import time
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
@@ -58,5 +59,85 @@ class MLServiceModelTest(unittest.TestCase):
         status = self.status_repo.fetch('readiness_model')
         self.assertIsNotNone(status['last_train'])
 
+    def test_readiness_batch_matches_single(self) -> None:
+        svc = ml_service.ReadinessModelService(self.repo, lr=0.01)
+        self.assertEqual(svc.train_many([(1.0, 2.0, 6.0), (3.0, 1.0, 7.0)]), 2)
+        batch = svc.predict_many([1.0, 3.0], [2.0, 1.0], [5.0, 6.0])
+        self.assertAlmostEqual(batch[0], svc.predict(1.0, 2.0, 5.0))
+        self.assertAlmostEqual(batch[1], svc.predict(3.0, 1.0, 6.0))
+
+    def test_training_queue_deduplicates(self) -> None:
+        queue = ml_service.ModelTrainingQueue(background=False)
+        runs: list[str] = []
+        self.assertTrue(queue.submit("a", lambda: runs.append("a1")))
+        self.assertFalse(queue.submit("a", lambda: runs.append("a2")))
+        self.assertTrue(queue.submit("b", lambda: runs.append("b")))
+        self.assertEqual(queue.run_pending(), 2)
+        self.assertEqual(runs, ["a2", "b"])
+        self.assertEqual(queue.info()["completed"], 2)
+
+    def test_buffered_telemetry_writes(self) -> None:
+        log_repo = db.MLLogRepository(self.db_path, buffered=True, max_pending=3, flush_interval=0)
+        status_repo = db.MLModelStatusRepository(self.db_path, buffered=True, flush_interval=0)
+        svc = ml_service.PerformanceModelService(
+            self.repo, self.name_repo, log_repo, status_repo, lr=0.1
+        )
+        svc.predict('Bench Press', 5, 100.0, 7)
+        svc.predict('Bench Press', 5, 100.0, 7)
+        conn = sqlite3.connect(self.db_path)
+        count = conn.execute('SELECT COUNT(*) FROM ml_logs;').fetchone()[0]
+        self.assertEqual(count, 0)
+        self.assertEqual(status_repo.buffer.pending(), 2)
+        svc.predict('Bench Press', 5, 100.0, 7)
+        deadline = time.time() + 10
+        while log_repo.buffer.pending() and time.time() < deadline:
+            time.sleep(0.01)
+        count = conn.execute('SELECT COUNT(*) FROM ml_logs;').fetchone()[0]
+        conn.close()
+        self.assertEqual(count, 3)
+        svc.predict('Bench Press', 5, 100.0, 7)
+        self.assertEqual(len(log_repo.fetch('Bench Press')), 4)
+        status = status_repo.fetch('performance_model')
+        self.assertIsNotNone(status['last_loaded'])
+        self.assertIsNotNone(status['last_predict'])
+
+    def test_buffered_rows_survive_failed_flush(self) -> None:
+        log_repo = db.MLLogRepository(self.db_path, buffered=True, flush_interval=0)
+        log_repo.add('Bench Press', 100.0, 1.0)
+        log_repo.add('Bench Press', 101.0, 1.0)
+        os.rename(self.db_path, self.db_path + '.bak')
+        log_repo.flush()
+        os.rename(self.db_path + '.bak', self.db_path)
+        self.assertEqual(log_repo.buffer.pending(), 2)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('ALTER TABLE ml_logs RENAME TO ml_logs_old;')
+        conn.commit()
+        with self.assertLogs('db', level='ERROR'):
+            log_repo.buffer._timed_flush()
+        self.assertEqual(log_repo.buffer.pending(), 2)
+        self.assertGreaterEqual(log_repo.buffer._backoff, 1.0)
+        self.assertIsNotNone(log_repo.buffer._timer)
+        conn.execute('ALTER TABLE ml_logs_old RENAME TO ml_logs;')
+        conn.commit()
+        conn.close()
+        log_repo.flush()
+        self.assertEqual(log_repo.buffer.pending(), 0)
+        self.assertEqual(len(log_repo.fetch('Bench Press')), 2)
+
+    def test_buffer_drops_oldest_rows_beyond_capacity(self) -> None:
+        log_repo = db.MLLogRepository(self.db_path, buffered=True)
+        log_repo.buffer = db.WriteBehindBuffer(
+            log_repo, max_pending=2, flush_interval=0, capacity=3
+        )
+        os.rename(self.db_path, self.db_path + '.bak')
+        for value in range(5):
+            log_repo.add('Bench Press', 100.0 + value, 1.0)
+        self.assertEqual(log_repo.buffer.pending(), 3)
+        self.assertEqual(log_repo.buffer.dropped, 2)
+        os.rename(self.db_path + '.bak', self.db_path)
+        log_repo.flush()
+        logged = sorted(row[1] for row in log_repo.fetch('Bench Press'))
+        self.assertEqual(logged, [102.0, 103.0, 104.0])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,140 @@
+import json
+import os
+import sys
+import shutil
+import threading
+import unittest
+from unittest import mock
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from rest_api import TenantRouter
+from db import Database, WriteBehindBuffer
+
+
+class TenantRouterTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.base_dir = "test_athletes"
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+        self.router = TenantRouter(self.base_dir, max_tenants=1, max_connections=8)
+        self.client = TestClient(self.router)
+
+    def tearDown(self) -> None:
+        self.router.close()
+        Database.limit_connections(None)
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_routes_athletes_to_separate_databases(self) -> None:
+        resp = self.client.post(
+            "/workouts", params={"date": "2023-01-01"}, headers={"X-Athlete-ID": "alice"}
+        )
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.post("/athletes/bob/workouts", params={"date": "2023-01-02"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(list(self.router.tenants), ["bob"])
+
+        alice = self.client.get("/athletes/alice/workouts").json()
+        bob = self.client.get("/workouts", headers={"X-Athlete-ID": "bob"}).json()
+        self.assertEqual([w["date"] for w in alice], ["2023-01-01"])
+        self.assertEqual([w["date"] for w in bob], ["2023-01-02"])
+        self.assertTrue(os.path.exists(os.path.join(self.base_dir, "alice.db")))
+        self.assertTrue(os.path.exists(os.path.join(self.base_dir, "bob.db")))
+
+    def test_rejects_missing_or_invalid_athlete(self) -> None:
+        self.assertEqual(self.client.get("/workouts").status_code, 400)
+        resp = self.client.get("/workouts", headers={"X-Athlete-ID": "../etc"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_evicted_tenants_are_shut_down(self) -> None:
+        alice = self.router.get_api("alice")
+        alice.ml_logs.add("Bench Press", 100.0, 1.0)
+        self.router.get_api("bob")
+        self.assertNotIn("alice", self.router.tenants)
+        self.assertEqual(alice.ml_logs.buffer.pending(), 0)
+        self.assertNotIn(alice.ml_logs.buffer, set(WriteBehindBuffer._instances))
+        self.assertTrue(alice.statistics.training._stopped)
+        self.assertEqual(len(alice.ml_logs.fetch("Bench Press")), 1)
+
+    def test_tenant_setup_is_lazy(self) -> None:
+        with mock.patch.object(Database, "vacuum", autospec=True) as vacuum:
+            alice = self.router.get_api("alice")
+        self.assertEqual(vacuum.call_count, 1)
+        self.assertNotIn("model", alice.volume_model.__dict__)
+        self.assertNotIn("model", alice.injury_model.__dict__)
+        self.assertIsNone(alice.retention_scheduler)
+        self.assertIs(alice.statistics.charts._pool, self.router.get_api("bob").statistics.charts._pool)
+
+        self.assertFalse(alice.volume_model.initialized)
+        self.assertIn("model", alice.volume_model.__dict__)
+        resp = self.client.post(
+            "/settings/general",
+            params={"heart_rate_retention_days": 30},
+            headers={"X-Athlete-ID": "bob"},
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertIsNotNone(self.router.tenants["bob"].retention_scheduler)
+
+    def test_nested_connections_share_a_slot(self) -> None:
+        api = self.router.get_api("alice")
+        Database.limit_connections(1)
+        rows: list = []
+
+        def nested() -> None:
+            with api.workouts._connection() as conn:
+                conn.execute("SELECT 1")
+                rows.extend(api.workouts.fetch_all("SELECT 1"))
+
+        worker = threading.Thread(target=nested, daemon=True)
+        worker.start()
+        worker.join(10)
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(rows, [(1,)])
+
+    def test_ndjson_history_streams_under_single_connection(self) -> None:
+        headers = {"X-Athlete-ID": "alice"}
+        self.client.post("/workouts", params={"date": "2023-01-01"}, headers=headers)
+        self.client.post(
+            "/workouts/1/exercises",
+            params={"name": "Bench Press", "equipment": "Olympic Barbell"},
+            headers=headers,
+        )
+        for weight in (100.0, 105.0):
+            self.client.post(
+                "/exercises/1/sets",
+                params={"reps": 5, "weight": weight, "rpe": 8},
+                headers=headers,
+            )
+        Database.limit_connections(1)
+        responses: list = []
+
+        def stream() -> None:
+            responses.append(
+                self.client.get(
+                    "/workouts/history",
+                    params={"start_date": "2023-01-01", "end_date": "2023-01-31"},
+                    headers={**headers, "Accept": "application/x-ndjson"},
+                )
+            )
+
+        worker = threading.Thread(target=stream, daemon=True)
+        worker.start()
+        worker.join(30)
+        self.assertFalse(worker.is_alive())
+        rows = [json.loads(line) for line in responses[0].text.splitlines()]
+        self.assertEqual(
+            rows,
+            [
+                {
+                    "id": 1,
+                    "date": "2023-01-01",
+                    "training_type": "strength",
+                    "volume": 1025.0,
+                    "sets": 2,
+                    "avg_rpe": 8.0,
+                }
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
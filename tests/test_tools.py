@@ -1,13 +1,27 @@
 import os
 import sys
 import math
+import time
 import unittest
+import numpy as np
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from algorithms.math_tools import MathTools
 from algorithms.exercise_prescription import ExercisePrescription
 from algorithms.weight_converter import WeightConverter
-from db import PyramidTestRepository, PyramidEntryRepository
+from algorithms.group_by import GroupBy
+from algorithms.forecaster import Forecaster
+from algorithms.downsampler import Downsampler
+from algorithms.timestamps import Timestamps
+from algorithms.workload import Workload
+from algorithms.fast_estimators import FastEstimators
+from algorithms.progress_simulator import ProgressSimulator, _HaarTail, _SeasonalTail
+from analytics_executor import (
+    AnalyticsExecutor,
+    AnalyticsBusyError,
+    AnalyticsTimeoutError,
+)
+from db import PyramidTestRepository, PyramidEntryRepository, PyramidTestLoader
 
 
 class MathToolsTestCase(unittest.TestCase):
@@ -183,6 +197,7 @@ class MathToolsTestCase(unittest.TestCase):
             body_weight=80.0,
             months_active=12,
             workouts_per_month=8,
+            pyramid_tests=repo_t.fetch_full_for_exercise(),
         )
         repo_t._delete_all("pyramid_tests")
         repo_e._delete_all("pyramid_entries")
@@ -208,7 +223,12 @@ class MathToolsTestCase(unittest.TestCase):
         tid2 = repo_t.create("2023-01-08")
         repo_e.add(tid2, 105.0)
         repo_e.add(tid2, 115.0)
-        ts, rms, wts, mets = ExercisePrescription._process_pyramid_tests()
+        self.assertEqual(
+            repo_t.fetch_full_for_exercise(), repo_t.fetch_full_with_weights(repo_e)
+        )
+        ts, rms, wts, mets = ExercisePrescription._process_pyramid_tests(
+            tests=repo_t.fetch_full_for_exercise()
+        )
         self.assertEqual(len(ts), 2)
         self.assertIn("strength_reserve", mets[0])
         fatigue = ExercisePrescription._pyramid_enhanced_fatigue(ts, rms, wts, mets, 1000.0, ts[-1])
@@ -233,6 +253,31 @@ class MathToolsTestCase(unittest.TestCase):
         }
         self.assertFalse(ExercisePrescription._validate_pyramid_test(invalid_test))
 
+    def test_daily_tss_fatigue_matches_prefix_recompute(self) -> None:
+        weights = [100.0, 80.0, 0.0, 120.0, 90.0, 125.0]
+        reps = [5, 10, 8, 3, 15, 1]
+        durations = [40.0, 0.0, 50.0, 65.0, 90.0, 30.0]
+        times = [0, 0, 2, 3, 3, 10]
+        days, stress, fatigue = ExercisePrescription._daily_tss_fatigue(
+            weights, reps, durations, times
+        )
+        self.assertEqual(list(days), [0, 2, 3, 10])
+        for i, day in enumerate(days):
+            n = sum(1 for t in times if t <= day)
+            rm = ExercisePrescription._current_1rm(weights[:n], reps[:n])
+            expected = ExercisePrescription._tss_adjusted_fatigue(
+                weights[:n], reps[:n], times[:n], durations[:n], rm
+            )
+            self.assertAlmostEqual(fatigue[i], expected, places=9)
+            own = sum(
+                ExercisePrescription._calculate_exercise_tss(
+                    [w], [r], [d], MathTools.epley_1rm(w, r)
+                )
+                for w, r, d, t in zip(weights, reps, durations, times)
+                if t == day
+            )
+            self.assertAlmostEqual(stress[i], own, places=9)
+
 
 class WeightConverterTestCase(unittest.TestCase):
     def test_basic_conversion(self) -> None:
@@ -240,6 +285,397 @@ class WeightConverterTestCase(unittest.TestCase):
         self.assertAlmostEqual(WeightConverter.lb_to_kg(2.2), 1.0, places=1)
 
 
+class GroupByTestCase(unittest.TestCase):
+    def test_aggregates_match_python_loops(self) -> None:
+        keys = ["b", "a", "b", "c", "a", "b"]
+        values = [0.1, 2.0, 0.2, 5.0, 2.0, 0.3]
+        group = GroupBy(keys)
+        self.assertEqual(list(group.keys), ["a", "b", "c"])
+        self.assertEqual(list(group.count()), [2, 3, 1])
+        self.assertEqual(list(group.sum(values)), [4.0, 0.1 + 0.2 + 0.3, 5.0])
+        self.assertEqual(list(group.mean(values)), [2.0, (0.1 + 0.2 + 0.3) / 3, 5.0])
+        self.assertEqual(list(group.max(values)), [2.0, 0.3, 5.0])
+        self.assertEqual(list(group.argmax(values)), [1, 5, 3])
+        self.assertEqual(list(group.nunique([1, 1, 2, 7, 3, 1])), [2, 2, 1])
+
+    def test_iso_week_labels(self) -> None:
+        group = GroupBy.by_iso_week(
+            np.asarray(["2023-01-01", "2023-01-02", "2024-12-30"], dtype=str)
+        )
+        self.assertEqual(list(group.keys), ["2022-W52", "2023-W01", "2025-W01"])
+        self.assertEqual(list(GroupBy([]).count()), [])
+
+
+class ForecasterTestCase(unittest.TestCase):
+    def test_single_fit_path_matches_one_step_arima(self) -> None:
+        values = [500.0 * (1 + 0.1 * ((i * 7) % 5)) for i in range(20)]
+        forecaster = Forecaster()
+        path = forecaster.forecast(values, 5, method="arima", key="series")
+        self.assertEqual(path["method"], "arima")
+        self.assertEqual(len(path["mean"]), 5)
+        self.assertAlmostEqual(
+            path["mean"][0], ExercisePrescription._arima_forecast(values)
+        )
+        for low, mid, high in zip(path["lower"], path["mean"], path["upper"]):
+            self.assertLessEqual(low, mid)
+            self.assertLessEqual(mid, high)
+        again = forecaster.forecast(values, 3, method="arima", key="series")
+        self.assertEqual(again["mean"], path["mean"][:3])
+
+    def test_closed_form_methods(self) -> None:
+        values = [10.0, 12.0, 14.0, 16.0]
+        holt = Forecaster().forecast(values, 3, method="holt")
+        self.assertEqual([round(v, 6) for v in holt["mean"]], [18.0, 20.0, 22.0])
+        ewma = Forecaster(alpha=1.0).forecast(values, 2, method="ewma")
+        self.assertEqual(ewma["mean"], [16.0, 16.0])
+        self.assertEqual(Forecaster().forecast([5.0], 2)["mean"], [5.0, 5.0])
+        self.assertEqual(Forecaster().forecast(values, 4, method="auto")["method"], "holt")
+        with self.assertRaises(ValueError):
+            Forecaster().forecast(values, 1, method="prophet")
+
+
+class DownsamplerTestCase(unittest.TestCase):
+    def test_lttb_keeps_endpoints_and_peaks(self) -> None:
+        x = np.arange(1000, dtype=float)
+        y = np.sin(x / 50.0)
+        y[333] = 10.0
+        idx = Downsampler.lttb(x, y, 50)
+        self.assertEqual(len(idx), 50)
+        self.assertEqual(idx[0], 0)
+        self.assertEqual(idx[-1], 999)
+        self.assertIn(333, idx)
+        self.assertTrue(np.all(np.diff(idx) > 0))
+        self.assertEqual(list(Downsampler.lttb(x[:5], y[:5], 10)), [0, 1, 2, 3, 4])
+        with self.assertRaises(ValueError):
+            Downsampler.lttb(x, y, 2)
+
+    def test_sample_rows_by_date(self) -> None:
+        rows = [
+            {"date": f"2024-01-{d:02d}", "v": float(d % 4)} for d in range(1, 31)
+        ]
+        sampled, applied = Downsampler.sample(rows, "date", "v", 8)
+        self.assertTrue(applied)
+        self.assertEqual(len(sampled), 8)
+        self.assertIs(sampled[0], rows[0])
+        self.assertEqual(Downsampler.sample(rows, "date", "v", None), (rows, False))
+
+
+class PyramidTestLoaderTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = "test_pyramid_loader.db"
+        if os.path.exists(self.db):
+            os.remove(self.db)
+        self.tests = PyramidTestRepository(self.db)
+        self.entries = PyramidEntryRepository(self.db)
+
+    def tearDown(self) -> None:
+        if os.path.exists(self.db):
+            os.remove(self.db)
+
+    def test_loads_one_exercise_and_refreshes_on_change(self) -> None:
+        squat = self.tests.create("2023-01-01", "Squat")
+        self.entries.add(squat, 100.0)
+        self.entries.add(squat, 110.0)
+        bench = self.tests.create("2023-01-02", "Bench Press")
+        self.entries.add(bench, 80.0)
+        loader = PyramidTestLoader(self.tests)
+        rows = loader("Squat")
+        self.assertEqual([(r[0], r[1], r[-1]) for r in rows], [(squat, "Squat", [100.0, 110.0])])
+        self.assertIs(loader("Squat"), rows)
+        self.assertEqual(loader("Deadlift"), [])
+        self.entries.add(squat, 115.0)
+        self.assertEqual(loader("Squat")[0][-1], [100.0, 110.0, 115.0])
+        self.assertEqual(len(loader()), 2)
+
+
+class TimestampsTestCase(unittest.TestCase):
+    def test_parse_and_seconds_between(self) -> None:
+        start = Timestamps.parse(["2024-01-01T10:00:00", None, "2024-01-01T10:00:00.5"])
+        end = Timestamps.parse(["2024-01-01T10:00:30", "2024-01-01T10:00:00", ""])
+        self.assertTrue(np.isnat(start[1]))
+        self.assertTrue(np.isnat(end[2]))
+        secs = Timestamps.seconds_between(start, end)
+        self.assertEqual(secs[0], 30.0)
+        self.assertTrue(np.isnan(secs[1]))
+        self.assertTrue(np.isnan(secs[2]))
+
+    def test_offsets_are_converted_to_utc(self) -> None:
+        parsed = Timestamps.parse(["2024-01-01T12:00:00+02:00", "2024-01-01T10:00:05"])
+        self.assertEqual(str(parsed[0]), "2024-01-01T10:00:00.000000")
+        self.assertEqual(Timestamps.seconds_between(parsed[:1], parsed[1:])[0], 5.0)
+
+    def test_group_first_and_min(self) -> None:
+        group = GroupBy(np.array([3, 1, 3, 2, 1]))
+        self.assertEqual(group.first().tolist(), [1, 3, 0])
+        self.assertEqual(group.min(np.array([5.0, 2.0, 4.0, 7.0, 1.0])).tolist(), [1.0, 7.0, 4.0])
+
+    def test_velocities_from_durations(self) -> None:
+        vel = MathTools.velocities_from_durations(
+            np.array([10, 0, 5, 5]), np.array([20.0, 10.0, 0.0, np.nan])
+        )
+        self.assertEqual(vel.tolist(), [0.25, 0.0, 0.0, 0.0])
+        self.assertAlmostEqual(
+            vel[0],
+            MathTools.estimate_velocity_from_set(
+                10, "2024-01-01T10:00:00", "2024-01-01T10:00:20"
+            ),
+        )
+
+
+class WorkloadTestCase(unittest.TestCase):
+    def test_daily_fills_rest_days(self) -> None:
+        days, loads = Workload.daily(
+            ["2024-01-01", "2024-01-04", "2024-01-01"], [100.0, 50.0, 20.0]
+        )
+        self.assertEqual(str(days[0]), "2024-01-01")
+        self.assertEqual(str(days[-1]), "2024-01-04")
+        self.assertEqual(loads.tolist(), [120.0, 0.0, 0.0, 50.0])
+
+    def test_timeline_matches_window_loop(self) -> None:
+        rng = np.random.default_rng(3)
+        loads = rng.uniform(0, 1000, 90) * (rng.random(90) > 0.4)
+        curve = Workload().timeline(loads)
+        acute = ExercisePrescription._ewma(loads, span=7)
+        chronic = ExercisePrescription._ewma(loads, span=28)
+        for i in range(len(loads)):
+            week = loads[max(0, i - 6) : i + 1]
+            month = loads[max(0, i - 27) : i + 1]
+            self.assertAlmostEqual(curve["acwr"][i], acute[i] / chronic[i])
+            self.assertAlmostEqual(
+                curve["rolling_acwr"][i], week.mean() / month.mean()
+            )
+            monotony = week.mean() / week.std() if week.std() else 1.0
+            self.assertAlmostEqual(curve["monotony"][i], monotony, places=6)
+            self.assertAlmostEqual(
+                curve["strain"][i], week.sum() * monotony, places=3
+            )
+
+    def test_constant_load_has_unit_monotony(self) -> None:
+        curve = Workload().timeline([300.0] * 10)
+        self.assertEqual(curve["monotony"].tolist(), [1.0] * 10)
+        self.assertEqual(curve["acwr"].tolist(), [1.0] * 10)
+
+    def test_prescription_scalars_use_timeline(self) -> None:
+        weights = [100.0, 120.0, 80.0, 150.0, 90.0]
+        reps = [5, 5, 8, 3, 10]
+        vol = np.array(weights) * np.array(reps)
+        acute = ExercisePrescription._ewma(vol, span=7)[-1]
+        chronic = ExercisePrescription._ewma(vol, span=28)[-1]
+        self.assertAlmostEqual(
+            ExercisePrescription._ac_ratio(weights, reps), acute / chronic
+        )
+        self.assertAlmostEqual(
+            ExercisePrescription._weekly_monotony(weights, reps),
+            vol.mean() / vol.std(),
+        )
+        self.assertEqual(ExercisePrescription._weekly_monotony([80.0] * 4, [5] * 4), 1.0)
+
+    def test_workload_risk_factor(self) -> None:
+        self.assertEqual(MathTools.workload_risk_factor(1.0, 1.5), 1.0)
+        self.assertAlmostEqual(MathTools.workload_risk_factor(1.8, 1.0), 1.5)
+        self.assertAlmostEqual(MathTools.workload_risk_factor(1.0, 3.0), 1.5)
+
+
+class FastEstimatorsTestCase(unittest.TestCase):
+    """Accuracy regression between the fast and full estimator backends."""
+
+    @staticmethod
+    def _history(seed: int, n: int) -> tuple:
+        rng = np.random.default_rng(seed)
+        weights = list(np.round(60 + np.arange(n) * 0.8 + rng.normal(0, 3, n), 1))
+        reps = [int(r) for r in rng.integers(3, 11, n)]
+        rpe = [int(r) for r in rng.integers(6, 10, n)]
+        volumes = list(np.round(rng.uniform(1500, 4000, max(n // 4, 1)), 1))
+        return weights, reps, list(range(n)), rpe, volumes
+
+    def test_closed_forms_match_statsmodels(self) -> None:
+        import warnings
+        import pywt
+        from statsmodels.tsa.ar_model import AutoReg
+        from statsmodels.tsa.seasonal import seasonal_decompose
+        from statsmodels.tsa.vector_ar.var_model import VAR
+
+        rng = np.random.default_rng(7)
+        for n in (5, 14, 15, 31, 90):
+            y = rng.normal(100, 10, n) + np.arange(n)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                phi = AutoReg(y, lags=1).fit().params[1]
+                var = VAR(np.c_[y, rng.integers(3, 10, n)]).fit(maxlags=1, trend="n")
+                if n >= 14:
+                    dec = seasonal_decompose(
+                        y, period=7, two_sided=False, extrapolate_trend=6
+                    )
+            self.assertAlmostEqual(FastEstimators.ar1(y), phi, places=9)
+            np.testing.assert_allclose(
+                FastEstimators.var1(var.endog, 2),
+                var.forecast(var.endog, steps=2)[-1],
+                rtol=1e-9,
+            )
+            if n >= 14:
+                trend, seasonal = FastEstimators.decompose(y, 7)
+                np.testing.assert_allclose(trend, dec.trend, rtol=1e-9)
+                np.testing.assert_allclose(seasonal, dec.seasonal, atol=1e-9)
+            level = min(2, pywt.dwt_max_level(n, 2))
+            expected = [
+                float(np.sum(np.square(c))) for c in pywt.wavedec(y, "db1", level=level)
+            ]
+            np.testing.assert_allclose(
+                FastEstimators.haar_energy(y, level), expected, rtol=1e-9
+            )
+        with self.assertRaises(ValueError):
+            FastEstimators.decompose(np.arange(10.0), 7)
+
+    def test_ar_decay_backends_agree(self) -> None:
+        rng = np.random.default_rng(3)
+        for n in (5, 12, 40):
+            values = list(100 + rng.normal(0, 5, n).cumsum())
+            decay = {}
+            for backend in ExercisePrescription.ESTIMATORS:
+                with ExercisePrescription.estimator_backend(backend):
+                    decay[backend] = ExercisePrescription._ar_decay(values)
+            self.assertNotEqual(decay["full"], 1.0)
+            self.assertAlmostEqual(decay["fast"], decay["full"], places=9)
+
+    def test_fast_prescriptions_track_full_backend(self) -> None:
+        for n in (6, 20, 60):
+            for seed in range(2):
+                weights, reps, times, rpe, volumes = self._history(seed, n)
+                results = {}
+                for backend in ExercisePrescription.ESTIMATORS:
+                    with ExercisePrescription.estimator_backend(backend):
+                        results[backend] = ExercisePrescription.exercise_prescription(
+                            weights,
+                            reps,
+                            times,
+                            rpe,
+                            body_weight=80.0,
+                            months_active=12,
+                            workouts_per_month=8,
+                            session_volumes=volumes,
+                        )["prescription"]
+                full, fast = results["full"], results["fast"]
+                self.assertEqual(len(fast), len(full))
+                for a, b in zip(full, fast):
+                    self.assertEqual(a["reps"], b["reps"])
+                    self.assertAlmostEqual(b["weight"], a["weight"], delta=0.05 * a["weight"])
+
+    def test_backend_is_scoped(self) -> None:
+        with ExercisePrescription.estimator_backend("fast"):
+            self.assertTrue(ExercisePrescription._fast())
+        self.assertFalse(ExercisePrescription._fast())
+        with self.assertRaises(ValueError):
+            with ExercisePrescription.estimator_backend("turbo"):
+                pass
+
+
+class ProgressSimulatorTestCase(unittest.TestCase):
+    def test_steps_match_full_prescriptions(self) -> None:
+        kwargs = dict(body_weight=80.0, months_active=12, workouts_per_month=8)
+        for backend in ExercisePrescription.ESTIMATORS:
+            for n in (4, 30):
+                weights, reps, times, rpe, _ = FastEstimatorsTestCase._history(n, n)
+                with ExercisePrescription.estimator_backend(backend):
+                    sim = ProgressSimulator(weights, reps, times, rpe, **kwargs)
+                    for _ in range(12):
+                        expected = ExercisePrescription.exercise_prescription(
+                            weights, reps, times, rpe, **kwargs
+                        )["prescription"][0]
+                        self.assertEqual(sim.step(), expected)
+                        weights.append(float(expected["weight"]))
+                        reps.append(int(expected["reps"]))
+                        times.append(times[-1] + 1)
+                        rpe.append(int(round(expected["target_rpe"])))
+                self.assertAlmostEqual(
+                    sim.one_rm, ExercisePrescription._current_1rm(weights, reps)
+                )
+        with self.assertRaises(ValueError):
+            ProgressSimulator([], [], [], [], **kwargs)
+
+    def test_steps_match_prescriptions_with_pyramid_tests(self) -> None:
+        kwargs = dict(body_weight=80.0, months_active=12, workouts_per_month=8)
+        pyramid = []
+        for i, (day, rm) in enumerate(((1, 95.0), (8, 97.5), (15, 101.0))):
+            row = (i + 1, "Bench", f"2024-01-{day:02d}", None, 60.0, None, rm)
+            pyramid.append(row + (30, 120, None, None, None, None, None, [60.0, 70.0, rm]))
+        pyramid.append(pyramid[0][:1] + ("Squat",) + pyramid[0][2:])
+        pyr = dict(exercise_name="Bench", pyramid_tests=pyramid)
+        weights, reps, times, rpe, _ = FastEstimatorsTestCase._history(20, 20)
+        sim = ProgressSimulator(weights, reps, times, rpe, **pyr, **kwargs)
+        plain = ProgressSimulator(weights, reps, times, rpe, **kwargs).next_set()
+        for _ in range(4):
+            expected = ExercisePrescription.exercise_prescription(
+                weights, reps, times, rpe, **pyr, **kwargs
+            )["prescription"][0]
+            self.assertEqual(sim.step(), expected)
+            weights.append(float(expected["weight"]))
+            reps.append(int(expected["reps"]))
+            times.append(times[-1] + 1)
+            rpe.append(int(round(expected["target_rpe"])))
+        first = ProgressSimulator(
+            weights[:20], reps[:20], times[:20], rpe[:20], **pyr, **kwargs
+        ).next_set()
+        self.assertNotEqual(first, plain)
+
+    def test_running_components_match_batch(self) -> None:
+        values = np.random.default_rng(5).normal(100, 10, 40)
+        season, haar = _SeasonalTail(7), _HaarTail()
+        for n, value in enumerate(values, start=1):
+            season.add(value)
+            haar.add(value)
+            trend, seasonal = season.components()
+            if n >= 14:
+                full_trend, full_seasonal = FastEstimators.decompose(values[:n], 7)
+                self.assertAlmostEqual(trend, full_trend[-1], places=9)
+                self.assertAlmostEqual(seasonal, full_seasonal[-1], places=9)
+            else:
+                self.assertEqual((trend, seasonal), (value, 0.0))
+            level = min(2, n.bit_length() - 1)
+            expected = FastEstimators.haar_energy(values[:n], level) if n > 1 else []
+            np.testing.assert_allclose(
+                haar.energies(), (expected + [0.0, 0.0, 0.0])[:3], rtol=1e-9
+            )
+
+
+class AnalyticsExecutorTestCase(unittest.TestCase):
+    def test_pool_runs_kernels_and_aborts_slow_jobs(self) -> None:
+        executor = AnalyticsExecutor(workers=1, max_pending=2, timeout=1.0)
+        self.addCleanup(executor.shutdown)
+        executor.start()
+        self.assertAlmostEqual(
+            executor.run(MathTools.epley_1rm, 100.0, 5),
+            MathTools.epley_1rm(100.0, 5),
+        )
+        with self.assertRaises(AnalyticsTimeoutError):
+            executor.run(time.sleep, 3)
+        info = executor.info()
+        self.assertEqual(info["completed"], 1)
+        self.assertEqual(info["timed_out"], 1)
+
+    def test_bounded_queue_rejects_and_cancels(self) -> None:
+        executor = AnalyticsExecutor(workers=1, max_pending=4, timeout=5.0)
+        self.addCleanup(executor.shutdown)
+        jobs = [executor.submit(time.sleep, 0.3) for _ in range(4)]
+        with self.assertRaises(AnalyticsBusyError):
+            executor.submit(time.sleep, 0.3)
+        self.assertTrue(executor.cancel(jobs[-1]))
+        for job in jobs[:-1]:
+            job.result()
+        self.assertEqual(
+            executor.run(MathTools.epley_1rm, 100.0, 1), MathTools.epley_1rm(100.0, 1)
+        )
+        info = executor.info()
+        self.assertEqual(info["rejected"], 1)
+        self.assertEqual(info["cancelled"], 1)
+
+    def test_inline_mode(self) -> None:
+        executor = AnalyticsExecutor(workers=0, max_pending=1)
+        self.assertEqual(executor.run(sum, [1, 2, 3]), 6)
+        with self.assertRaises(ZeroDivisionError):
+            executor.run(divmod, 1, 0)
+        self.assertEqual(executor.info()["failed"], 1)
+
+
 if __name__ == "__main__":
     unittest.main()
 